@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark interrupt ingestion: one POST per event vs /api/trigger-batch
+Runs in-process against the Flask app; no server needed
+"""
+
+import argparse
+import time
+
+import run
+
+SENSORS = ['Brake', 'Collision', 'Speed']
+
+def wait_for_drain(controller):
+    """Let the dispatch thread finish queued ISRs so runs do not overlap"""
+    while controller.get_statistics()['pending_interrupts']:
+        time.sleep(0.01)
+
+def bench_single(client, events):
+    """One /api/trigger-sensor request per event"""
+    start = time.perf_counter()
+    for i in range(events):
+        client.post(f'/api/trigger-sensor/{SENSORS[i % len(SENSORS)]}')
+    return time.perf_counter() - start
+
+def bench_batch(client, events, batch_size):
+    """Events sent in /api/trigger-batch requests of batch_size records"""
+    base = int(time.time() * 1_000_000)
+    records = [
+        {'sensor': SENSORS[i % len(SENSORS)], 'timestamp': base + i, 'payload': {'speed': 60 + i % 40}}
+        for i in range(events)
+    ]
+    start = time.perf_counter()
+    for offset in range(0, events, batch_size):
+        client.post('/api/trigger-batch', json=records[offset:offset + batch_size])
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=3000, help='events per run')
+    parser.add_argument('--batch-size', type=int, action='append',
+                        help='batch size to measure (repeatable, default 10, 100, 1000)')
+    parser.add_argument('--isr-us', type=int, default=run.InterruptController.ISR_DURATION_US,
+                        help='simulated ISR body time; 0 measures pure ingestion overhead')
+    args = parser.parse_args()
+    
+    run.interrupt_controller.ISR_DURATION_US = args.isr_us
+    run.default_waiter.calibrate()
+    run.start_dispatcher()
+    run.start_scheduler()
+    client = run.app.test_client()
+    
+    print(f"{args.events} events, ISR body {args.isr_us} μs")
+    print(f"{'mode':<16}{'seconds':>10}{'events/s':>12}{'speedup':>10}")
+    
+    # Room for a whole run, so the measurement never hits 429 back-pressure
+    run.interrupt_controller.max_pending = args.events
+    single_s = bench_single(client, args.events)
+    print(f"{'single':<16}{single_s:>10.3f}{args.events / single_s:>12.0f}{1.0:>10.1f}")
+    
+    for batch_size in args.batch_size or [10, 100, 1000]:
+        wait_for_drain(run.interrupt_controller)
+        run.logger.clear()
+        batch_s = bench_batch(client, args.events, batch_size)
+        print(f"{f'batch x{batch_size}':<16}{batch_s:>10.3f}"
+              f"{args.events / batch_s:>12.0f}{single_s / batch_s:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-call cost of logging: synchronous store vs deferred ring
+Runs in-process on standalone Logger instances; no server needed
+"""
+
+import argparse
+import threading
+import time
+
+from event_store import EventKind
+from logger import Logger
+
+def call_log_event(logger, calls):
+    """Scheduler-style structured events with an explicit timestamp"""
+    log_event = logger.log_event
+    for i in range(calls):
+        log_event(EventKind.TASK_START, "BrakeTask", 7, timestamp_us=i)
+
+def call_log_event_now(logger, calls):
+    """Structured events timestamped by the logger"""
+    log_event = logger.log_event
+    for _ in range(calls):
+        log_event(EventKind.ISR_ENTRY, "Brake_ISR")
+
+def call_log(logger, calls):
+    """Legacy pre-formatted messages"""
+    log = logger.log
+    for i in range(calls):
+        log(f"[SYSTEM] Periodic release {i} of LidarTask")
+
+def run_producer(workload, logger, calls, cpu_ns):
+    """Run a workload, recording the CPU time this thread spent in it"""
+    start = time.thread_time_ns()
+    workload(logger, calls)
+    cpu_ns.append(time.thread_time_ns() - start)
+
+WORKLOADS = {
+    'log_event(ts)': call_log_event,
+    'log_event()': call_log_event_now,
+    'log(message)': call_log,
+}
+
+def measure(workload, deferred, calls, threads):
+    """Per call: CPU ns on the calling thread, and wall ns until every record is stored.
+    
+    CPU time is what a logging call costs the ISR or scheduler thread that
+    makes it; the writer's work runs on its own thread and is not included.
+    """
+    logger = Logger(max_logs=calls * threads, deferred=deferred, ring_slots=1 << 16)
+    writer = None
+    if deferred:
+        writer = threading.Thread(target=logger.run_writer, daemon=True)
+        writer.start()
+    
+    cpu_ns = []
+    producers = [threading.Thread(target=run_producer, args=(workload, logger, calls, cpu_ns))
+                 for _ in range(threads)]
+    start = time.perf_counter_ns()
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    
+    # Wall time until everything handed off is stored
+    logger.flush()
+    stored_ns = (time.perf_counter_ns() - start) / (calls * threads)
+    assert logger.count_events() == calls * threads
+    return sum(cpu_ns) / (calls * threads), stored_ns
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200000, help='logging calls per producer thread')
+    parser.add_argument('--threads', type=int, action='append',
+                        help='producer threads to measure (repeatable, default 1 and 4)')
+    args = parser.parse_args()
+    
+    print(f"{args.calls} calls per thread")
+    print("caller: CPU ns per call on the logging thread; stored: wall ns per record until stored")
+    print(f"{'workload':<16}{'threads':>8}{'caller sync':>13}{'deferred':>10}{'speedup':>9}"
+          f"{'stored sync':>13}{'deferred':>10}")
+    for threads in args.threads or [1, 4]:
+        for name, workload in WORKLOADS.items():
+            sync_ns, sync_stored_ns = measure(workload, False, args.calls, threads)
+            deferred_ns, deferred_stored_ns = measure(workload, True, args.calls, threads)
+            print(f"{name:<16}{threads:>8}{sync_ns:>13.0f}{deferred_ns:>10.0f}"
+                  f"{sync_ns / deferred_ns:>9.1f}{sync_stored_ns:>13.0f}{deferred_stored_ns:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark indexed event queries against a full scan of a large event store
+Runs in-process on a standalone EventStore; no server needed
+"""
+
+import argparse
+import random
+import time
+
+from event_store import EventStore, EventKind, NO_PRIORITY
+
+TASKS = [('BrakeTask', 7), ('CollisionTask', 6), ('SpeedTask', 5)] + [(f'LidarTask{i}', 4) for i in range(20)]
+KINDS = [EventKind.TASK_START, EventKind.TASK_END, EventKind.TASK_PREEMPT, EventKind.TASK_RESUME]
+
+def fill(store, events, seed):
+    """Scheduler-like traffic: wall-clock task events with demo-timeline
+    interrupts interleaved, so timestamps are not monotonic"""
+    rng = random.Random(seed)
+    now_us = 1_700_000_000_000_000
+    for i in range(events):
+        if i % 50 == 0:
+            store.append(1_000_000 + i, EventKind.INTERRUPT, 'Brake', 7, 'INT0')
+            continue
+        now_us += rng.randint(1, 20)
+        name, priority = rng.choice(TASKS)
+        store.append(now_us, rng.choice(KINDS), name, priority)
+    return now_us
+
+def scan(store, kinds=None, subject=None, priority=None, since_us=None, until_us=None, limit=100):
+    """Reference answer: check every live record"""
+    results = []
+    for seq in range(store.first_seq, store.next_seq):
+        record = store.record(seq)
+        if kinds is not None and EventKind[record['kind']] not in kinds:
+            continue
+        if subject is not None and record['subject'] != subject:
+            continue
+        if priority is not None and (record['priority'] if record['priority'] is not None else NO_PRIORITY) != priority:
+            continue
+        if since_us is not None and record['timestamp_us'] < since_us:
+            continue
+        if until_us is not None and record['timestamp_us'] > until_us:
+            continue
+        results.append(seq)
+        if len(results) == limit:
+            break
+    return results
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=1_000_000, help='events in the store')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query (best is reported)')
+    parser.add_argument('--no-scan', action='store_true', help='skip the full-scan comparison')
+    args = parser.parse_args()
+    
+    store = EventStore(capacity=args.events)
+    start = time.perf_counter()
+    end_us = fill(store, args.events, args.seed)
+    print(f"{args.events} events stored in {time.perf_counter() - start:.1f}s")
+    
+    mid_us = end_us - (end_us - 1_700_000_000_000_000) // 2
+    queries = {
+        'kind': dict(kinds={EventKind.TASK_PREEMPT}),
+        'task': dict(subject='LidarTask3'),
+        'kind+task': dict(kinds={EventKind.TASK_START}, subject='BrakeTask'),
+        'priority': dict(priority=6),
+        'time 1 ms': dict(since_us=mid_us, until_us=mid_us + 1000),
+        'time+kind+task': dict(kinds={EventKind.TASK_END}, subject='SpeedTask',
+                               since_us=mid_us, until_us=mid_us + 100_000),
+        'demo timeline': dict(kinds={EventKind.INTERRUPT}, since_us=1_500_000, until_us=1_600_000),
+        'rare in range': dict(priority=7, since_us=mid_us, until_us=end_us),
+    }
+    print(f"{'query':<18}{'matches':>9}{'indexed ms':>12}{'scan ms':>10}")
+    for name, filters in queries.items():
+        (seqs, _), indexed_ms = timed(lambda: store.search(**filters, limit=100), args.repeat)
+        line = f"{name:<18}{len(seqs):>9}{indexed_ms:>12.2f}"
+        if not args.no_scan:
+            expected, scan_ms = timed(lambda: scan(store, **filters, limit=100), 1)
+            assert seqs == expected, f"{name}: indexed result differs from scan"
+            line += f"{scan_ms:>10.0f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
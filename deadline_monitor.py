@@ -5,66 +5,195 @@ Tracks and monitors task deadlines
 
 import time
 import threading
+from collections import deque
+from event_store import EventKind
+from metrics import LatencyHistogram
+from rt_mutex import base_priority
+from timer_wheel import TimerWheel
+
+LOG = 'log'
+ABORT = 'abort'
+DEMOTE = 'demote'
+OVERRUN_POLICIES = (LOG, ABORT, DEMOTE)
 
 class DeadlineMonitor:
-    def __init__(self, logger, rtos):
+    """Checks interrupt-to-completion response times against per-task deadlines.
+    
+    Every completed job is recorded in a per-task response-time histogram
+    and met/missed counter, so memory stays fixed however long the system
+    runs; only the most recent misses are kept in detail.
+    
+    The watchdog arms a timer-wheel timer for every released job and
+    cancels it on completion, so an overrun is reported the moment the
+    deadline passes while the job is still READY, RUNNING or WAITING. The
+    overrun policy then logs only, aborts the job, or demotes the task to
+    DEMOTED_PRIORITY until that job finishes (only for tasks in
+    `demotable_tasks`).
+    """
+    
+    RECENT_MISSES = 20
+    DEMOTED_PRIORITY = 1
+    
+    def __init__(self, logger, rtos, policy=LOG, tick_us=1000):
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {policy}")
         self.logger = logger
         self.rtos = rtos
-        self.deadlines = {
-            'BrakeTask': 50,        # 50 microseconds
-            'CollisionTask': 40,    # 40 microseconds
-            'SpeedTask': 30         # 30 microseconds
-        }
-        self.deadline_misses = []
-        self.verified_tasks = []
+        self.policy = policy
+        # Relative deadlines from the task specs, measured from the job's release
+        self.deadlines = {name: task.spec.deadline_us for name, task in rtos.tasks.items()}
+        self.response_times = {name: LatencyHistogram() for name in self.deadlines}
+        self.met_counts = dict.fromkeys(self.deadlines, 0)
+        self.miss_counts = dict.fromkeys(self.deadlines, 0)
+        self.recent_misses = deque(maxlen=self.RECENT_MISSES)
         self.monitor_lock = threading.Lock()
+        
+        self.timer_wheel = TimerWheel(tick_us=tick_us)
+        self.tick_s = tick_us / 1_000_000
+        self.demotable_tasks = {'SpeedTask'}
+        self.demoted = {}  # task name -> base priority before demotion
+        self.overruns = 0
+        self.aborts = 0
+        self.demotions = 0
+        
+        rtos.add_job_release_listener(self.arm)
+        rtos.add_completion_listener(self.on_job_complete)
+        rtos.add_abort_listener(self.on_job_abort)
     
     def set_deadline(self, task_name, deadline_us):
         """Set deadline for a task"""
         if task_name in self.deadlines:
             self.deadlines[task_name] = deadline_us
             timestamp = int(time.time_ns() // 1000)
-            self.logger.log(f"[{timestamp}] DEADLINE_SET: {task_name} deadline = {deadline_us}μs")
+            self.logger.log_event(EventKind.DEADLINE_SET, task_name, detail=f"{deadline_us}μs",
+                                  timestamp_us=timestamp)
     
-    def check_deadline(self, task_name, start_time_us, end_time_us):
-        """Check if task met its deadline"""
+    def add_task(self, task_name, deadline_us):
+        """Start monitoring a newly registered task"""
+        with self.monitor_lock:
+            self.response_times[task_name] = LatencyHistogram()
+            self.met_counts[task_name] = 0
+            self.miss_counts[task_name] = 0
+            self.deadlines[task_name] = deadline_us
+    
+    def set_policy(self, policy):
+        """Select what happens when the watchdog catches an overrun"""
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {policy} (expected {', '.join(OVERRUN_POLICIES)})")
+        self.policy = policy
+    
+    def arm(self, job):
+        """RTOSSimulator job-release listener: start the job's deadline timer"""
+        deadline = self.deadlines.get(job.task.name)
+        if deadline is not None:
+            job.deadline_timer = self.timer_wheel.schedule(job.release_ns + deadline * 1000, job)
+    
+    def on_job_complete(self, job, release_us, end_us, execution_us):
+        """RTOSSimulator completion listener"""
+        if job.deadline_timer is not None:
+            self.timer_wheel.cancel(job.deadline_timer)
+        self.check_deadline(job.task.name, release_us, end_us, already_reported=job.overrun)
+        if job.overrun:
+            self.restore(job.task)
+    
+    def on_job_abort(self, job):
+        """RTOSSimulator abort listener: disarm the job's timer and undo its demotion"""
+        if job.deadline_timer is not None:
+            self.timer_wheel.cancel(job.deadline_timer)
+        if job.overrun:
+            self.restore(job.task)
+    
+    def on_overrun(self, job):
+        """Watchdog expiry: report a job still in the system past its deadline"""
+        task = job.task
+        if job.aborted or task.name not in self.deadlines:
+            return
+        job.overrun = True
+        deadline = self.deadlines[task.name]
+        elapsed = (time.perf_counter_ns() - job.release_ns) // 1000
+        
+        with self.monitor_lock:
+            self.overruns += 1
+            self.miss_counts[task.name] += 1
+            self.recent_misses.append({
+                'task': task.name,
+                'elapsed': elapsed,
+                'deadline': deadline,
+                'state': task.state,
+                'action': self.policy
+            })
+        self.logger.log_event(
+            EventKind.DEADLINE_MISS, task.name,
+            detail=f"Overrun while {task.state}: {elapsed}μs elapsed, Deadline: {deadline}μs"
+        )
+        
+        if self.policy == ABORT:
+            self.aborts += 1
+            self.rtos.abort_job(job)
+        elif self.policy == DEMOTE and task.name in self.demotable_tasks:
+            self.demote(task)
+    
+    def demote(self, task):
+        """Drop an overrunning task to DEMOTED_PRIORITY"""
+        with self.monitor_lock:
+            if task.name in self.demoted:
+                return
+            self.demoted[task.name] = base_priority(task)
+            self.demotions += 1
+        self.rtos.set_base_priority(task, self.DEMOTED_PRIORITY)
+    
+    def restore(self, task):
+        """Give a demoted task back its base priority"""
+        with self.monitor_lock:
+            priority = self.demoted.pop(task.name, None)
+        if priority is not None:
+            self.rtos.set_base_priority(task, priority)
+    
+    def check_deadline(self, task_name, release_time_us, end_time_us, already_reported=False):
+        """Record a job's response time and check it against the task's deadline.
+        
+        already_reported marks a job the watchdog flagged while it ran; its
+        miss is counted and logged once, at expiry.
+        """
         if task_name not in self.deadlines:
             return True
         
-        execution_time = end_time_us - start_time_us
+        response_time = end_time_us - release_time_us
         deadline = self.deadlines[task_name]
+        self.response_times[task_name].record(response_time)
         
-        met_deadline = execution_time <= deadline
+        met_deadline = response_time <= deadline
+        if already_reported:
+            return met_deadline
         
         with self.monitor_lock:
             if met_deadline:
-                self.verified_tasks.append({
-                    'task': task_name,
-                    'execution': execution_time,
-                    'deadline': deadline
-                })
+                self.met_counts[task_name] += 1
             else:
-                self.deadline_misses.append({
+                self.miss_counts[task_name] += 1
+                self.recent_misses.append({
                     'task': task_name,
-                    'execution': execution_time,
+                    'response': response_time,
                     'deadline': deadline,
-                    'overage': execution_time - deadline
+                    'overage': response_time - deadline
                 })
-                timestamp = int(time.time_ns() // 1000)
-                self.logger.log(
-                    f"[{timestamp}] DEADLINE_MISS: {task_name} - "
-                    f"Execution: {execution_time}μs, Deadline: {deadline}μs, "
-                    f"Overage: {execution_time - deadline}μs"
+                # Stamp the miss at the task's end time so simulated runs stay on their own timeline
+                self.logger.log_event(
+                    EventKind.DEADLINE_MISS, task_name,
+                    detail=(f"Response: {response_time}μs, Deadline: {deadline}μs, "
+                            f"Overage: {response_time - deadline}μs"),
+                    timestamp_us=end_time_us
                 )
         
         return met_deadline
     
     def monitor_deadlines(self):
-        """Background monitoring of deadlines"""
+        """Watchdog loop: advance the timer wheel each tick and handle expired deadlines"""
         while True:
             try:
-                time.sleep(0.1)
-                # Periodic check can be added here
+                time.sleep(self.tick_s)
+                for job in self.timer_wheel.advance():
+                    self.on_overrun(job)
             except Exception as e:
                 self.logger.log(f"[ERROR] Deadline monitor error: {str(e)}")
     
@@ -72,7 +201,36 @@ class DeadlineMonitor:
         """Get deadline statistics"""
         with self.monitor_lock:
             return {
-                'misses': len(self.deadline_misses),
-                'verified': len(self.verified_tasks),
-                'miss_details': self.deadline_misses[-5:] if self.deadline_misses else []
+                'misses': sum(self.miss_counts.values()),
+                'verified': sum(self.met_counts.values()),
+                'miss_details': list(self.recent_misses)[-5:]
+            }
+    
+    def get_watchdog_statistics(self):
+        """Overrun policy, timer-wheel occupancy and actions taken"""
+        with self.monitor_lock:
+            demoted = sorted(self.demoted)
+        return {
+            'policy': self.policy,
+            'demotable_tasks': sorted(self.demotable_tasks),
+            'overruns': self.overruns,
+            'aborts': self.aborts,
+            'demotions': self.demotions,
+            'demoted': demoted,
+            'timers': self.timer_wheel.get_statistics()
+        }
+    
+    def get_task_statistics(self):
+        """Per-task deadline, met/missed counts and response-time percentiles"""
+        with self.monitor_lock:
+            counts = {name: (self.met_counts[name], self.miss_counts[name])
+                      for name in self.deadlines}
+        return {
+            name: {
+                'deadline_us': self.deadlines[name],
+                'deadlines_met': met,
+                'deadline_misses': missed,
+                'response': self.response_times[name].snapshot()
             }
+            for name, (met, missed) in counts.items()
+        }
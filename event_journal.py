@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Event Journal - Persistent Binary Event Log
+Append-only segments of fixed-width event records, read back through mmap
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from event_store import EventKind, render_event
+
+# seq, timestamp_us, kind, priority, subject offset, subject length,
+# detail length, detail offset; strings live in the segment's string heap
+RECORD = struct.Struct('<qqBbxxIHHI')
+NO_DETAIL = 0xFFFFFFFF
+MAX_STRING_BYTES = 0xFFFF
+
+class Segment:
+    """One journal segment: NNNN.rec (records), NNNN.str (string heap), NNNN.meta once closed"""
+    __slots__ = ('base', 'first_seq', 'last_seq', 'min_us', 'max_us', 'records', 'bytes')
+    
+    def __init__(self, base, first_seq):
+        self.base = base
+        self.first_seq = first_seq
+        self.last_seq = first_seq - 1
+        self.min_us = None
+        self.max_us = None
+        self.records = 0
+        self.bytes = 0
+    
+    def add(self, seq, timestamp_us, size):
+        self.last_seq = seq
+        self.min_us = timestamp_us if self.min_us is None else min(self.min_us, timestamp_us)
+        self.max_us = timestamp_us if self.max_us is None else max(self.max_us, timestamp_us)
+        self.records += 1
+        self.bytes += size
+    
+    def overlaps(self, since_us, until_us):
+        if self.min_us is None:
+            return False
+        return ((since_us is None or self.max_us >= since_us)
+                and (until_us is None or self.min_us <= until_us))
+    
+    def to_dict(self):
+        return {
+            'first_seq': self.first_seq,
+            'last_seq': self.last_seq,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'records': self.records,
+            'bytes': self.bytes
+        }
+
+class EventJournal:
+    """Append-only on-disk event journal with segment rotation and retention.
+    
+    Events are written sequentially as fixed-width records, so record i of
+    a segment is at offset i * RECORD.size; subject and detail strings go
+    to the segment's string heap (subjects are written once per segment).
+    A segment is closed when it reaches segment_bytes, and its summary
+    (sequence and timestamp range) is saved next to it so time-range reads
+    skip non-overlapping segments without opening them. The oldest closed
+    segments are deleted beyond max_segments or max_bytes.
+    
+    Reads map segment files with mmap and decode one record at a time, so
+    exporting a long history never loads whole files into memory. Journal
+    sequence numbers continue across restarts. A read-only journal (the
+    CLI) never writes, so it can read a directory the server is appending to.
+    """
+    
+    def __init__(self, directory, segment_bytes=8 * 1024 * 1024, max_segments=16, max_bytes=None,
+                 readonly=False):
+        self.directory = directory
+        self.readonly = readonly
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.segments = []
+        self.rotations = 0
+        self.deleted_segments = 0
+        self.rec_file = self.str_file = None
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.rec'):
+                self.segments.append(self.load_segment(name[:-4]))
+        if not self.segments or os.path.exists(self.path(self.segments[-1].base, '.meta')):
+            # Empty, or the last segment was closed cleanly: start a fresh one
+            first_seq = self.segments[-1].last_seq + 1 if self.segments else 0
+            self.segments.append(Segment(f"{first_seq:016d}", first_seq))
+        self.next_seq = self.segments[-1].last_seq + 1
+        if not readonly:
+            self.open_active()
+    
+    def path(self, base, suffix):
+        return os.path.join(self.directory, base + suffix)
+    
+    def load_segment(self, base):
+        """Summary of an existing segment: from its .meta, or by scanning it"""
+        meta_path = self.path(base, '.meta')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            segment = Segment(base, meta['first_seq'])
+            for field in ('last_seq', 'min_us', 'max_us', 'records', 'bytes'):
+                setattr(segment, field, meta[field])
+            return segment
+        
+        # Unclosed (active at shutdown): drop a torn trailing record and rescan
+        rec_path = self.path(base, '.rec')
+        size = os.path.getsize(rec_path)
+        if size % RECORD.size and not self.readonly:
+            with open(rec_path, 'r+b') as f:
+                f.truncate(size - size % RECORD.size)
+        segment = Segment(base, int(base))
+        str_bytes = os.path.getsize(self.path(base, '.str')) if os.path.exists(self.path(base, '.str')) else 0
+        with open(rec_path, 'rb') as rec_file:
+            for seq, timestamp_us, *_ in self.scan_records(rec_file):
+                segment.add(seq, timestamp_us, RECORD.size)
+        segment.bytes += str_bytes
+        return segment
+    
+    def open_active(self):
+        """Open the newest segment for appending"""
+        active = self.segments[-1]
+        self.rec_file = open(self.path(active.base, '.rec'), 'ab')
+        self.str_file = open(self.path(active.base, '.str'), 'ab')
+        self.str_offset = self.str_file.tell()
+        self.subject_refs = {}
+    
+    def write_string(self, text):
+        """Append text to the string heap; returns (offset, length)"""
+        data = text.encode('utf-8')[:MAX_STRING_BYTES]
+        offset = self.str_offset
+        self.str_file.write(data)
+        self.str_offset += len(data)
+        return offset, len(data)
+    
+    def append(self, events):
+        """Append (timestamp_us, kind, subject, priority, detail) tuples"""
+        with self.lock:
+            active = self.segments[-1]
+            for timestamp_us, kind, subject, priority, detail in events:
+                heap_start = self.str_offset
+                subject = subject or ''
+                subject_ref = self.subject_refs.get(subject)
+                if subject_ref is None:
+                    subject_ref = self.subject_refs[subject] = self.write_string(subject)
+                if detail is None:
+                    detail_offset, detail_length = NO_DETAIL, 0
+                else:
+                    detail_offset, detail_length = self.write_string(str(detail))
+                
+                seq = self.next_seq
+                self.rec_file.write(RECORD.pack(seq, timestamp_us, kind, priority, subject_ref[0],
+                                                subject_ref[1], detail_length, detail_offset))
+                self.next_seq += 1
+                active.add(seq, timestamp_us, RECORD.size + self.str_offset - heap_start)
+                
+                if active.bytes >= self.segment_bytes:
+                    self.rotate()
+                    active = self.segments[-1]
+            self.rec_file.flush()
+            self.str_file.flush()
+    
+    def rotate(self):
+        """Close the active segment, start a new one and apply retention"""
+        active = self.segments[-1]
+        self.rec_file.close()
+        self.str_file.close()
+        with open(self.path(active.base, '.meta'), 'w') as f:
+            json.dump(active.to_dict(), f)
+        self.rotations += 1
+        
+        self.segments.append(Segment(f"{self.next_seq:016d}", self.next_seq))
+        self.open_active()
+        
+        closed = self.segments[:-1]
+        while closed and (len(closed) > self.max_segments - 1 or
+                          (self.max_bytes is not None and
+                           sum(segment.bytes for segment in self.segments) > self.max_bytes)):
+            oldest = closed.pop(0)
+            self.segments.remove(oldest)
+            for suffix in ('.rec', '.str', '.meta'):
+                try:
+                    os.remove(self.path(oldest.base, suffix))
+                except FileNotFoundError:
+                    pass
+            self.deleted_segments += 1
+    
+    @staticmethod
+    def scan_records(rec_file):
+        """Yield raw record tuples of an open segment file through mmap"""
+        if os.fstat(rec_file.fileno()).st_size < RECORD.size:
+            return
+        with mmap.mmap(rec_file.fileno(), 0, access=mmap.ACCESS_READ) as records:
+            end = len(records) - len(records) % RECORD.size
+            for offset in range(0, end, RECORD.size):
+                yield RECORD.unpack_from(records, offset)
+    
+    def read(self, since_us=None, until_us=None, kinds=None, subject=None):
+        """Yield (seq, timestamp_us, kind, subject, priority, detail) in journal order.
+        
+        Segments whose timestamp range misses [since_us, until_us] are skipped;
+        the rest are read through mmap one record at a time.
+        """
+        with self.lock:
+            if not self.readonly:
+                self.rec_file.flush()
+                self.str_file.flush()
+            segments = [segment for segment in self.segments if segment.overlaps(since_us, until_us)]
+            last_seq = self.next_seq - 1
+        
+        for segment in segments:
+            # Both files stay readable once open, even if retention deletes
+            # them meanwhile; a segment already deleted is skipped
+            try:
+                rec_file = open(self.path(segment.base, '.rec'), 'rb')
+            except FileNotFoundError:
+                continue
+            try:
+                str_file = open(self.path(segment.base, '.str'), 'rb')
+            except FileNotFoundError:
+                rec_file.close()
+                continue
+            with rec_file, str_file:
+                strings = (mmap.mmap(str_file.fileno(), 0, access=mmap.ACCESS_READ)
+                           if os.fstat(str_file.fileno()).st_size else b'')
+                try:
+                    for (seq, timestamp_us, kind, priority, subject_offset, subject_length,
+                         detail_length, detail_offset) in self.scan_records(rec_file):
+                        if seq > last_seq:
+                            break
+                        if since_us is not None and timestamp_us < since_us:
+                            continue
+                        if until_us is not None and timestamp_us > until_us:
+                            continue
+                        if kinds is not None and kind not in kinds:
+                            continue
+                        name = strings[subject_offset:subject_offset + subject_length].decode('utf-8', 'replace')
+                        if subject is not None and name != subject:
+                            continue
+                        detail = (None if detail_offset == NO_DETAIL else
+                                  strings[detail_offset:detail_offset + detail_length].decode('utf-8', 'replace'))
+                        yield seq, timestamp_us, kind, name or None, priority, detail
+                finally:
+                    if strings:
+                        strings.close()
+    
+    def render(self, since_us=None, until_us=None, kinds=None, subject=None):
+        """Yield journal events in the classic log text format"""
+        for _, timestamp_us, kind, name, priority, detail in self.read(since_us, until_us, kinds, subject):
+            yield render_event(timestamp_us, kind, name, priority, detail)
+    
+    def close(self):
+        with self.lock:
+            if not self.readonly:
+                self.rec_file.close()
+                self.str_file.close()
+    
+    def get_statistics(self):
+        with self.lock:
+            return {
+                'directory': self.directory,
+                'segments': len(self.segments),
+                'records': sum(segment.records for segment in self.segments),
+                'bytes': sum(segment.bytes for segment in self.segments),
+                'first_seq': self.segments[0].first_seq,
+                'next_seq': self.next_seq,
+                'rotations': self.rotations,
+                'deleted_segments': self.deleted_segments
+            }
+
+def main():
+    parser = argparse.ArgumentParser(description="Render events from an event journal directory")
+    parser.add_argument('directory', help='journal directory (JOURNAL_DIR in run.py)')
+    parser.add_argument('--since-us', type=int, help='first timestamp to include (μs)')
+    parser.add_argument('--until-us', type=int, help='last timestamp to include (μs)')
+    parser.add_argument('--kind', action='append', choices=EventKind.__members__,
+                        help='event kind to include (repeatable)')
+    parser.add_argument('--subject', help='task or ISR name')
+    parser.add_argument('--stats', action='store_true', help='print segment statistics instead')
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.directory):
+        parser.error(f"no journal at {args.directory}")
+    journal = EventJournal(args.directory, readonly=True)
+    try:
+        if args.stats:
+            print(json.dumps(journal.get_statistics(), indent=2))
+            return
+        kinds = {EventKind[kind] for kind in args.kind} if args.kind else None
+        for line in journal.render(args.since_us, args.until_us, kinds, args.subject):
+            sys.stdout.write(line + '\n')
+    except BrokenPipeError:
+        pass
+    finally:
+        journal.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Event Store - Structured Event Log
+Typed event records in columnar ring arrays with per-kind and per-task indexes
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from enum import IntEnum
+
+class EventKind(IntEnum):
+    """Kinds of events recorded by the RTOS simulator"""
+    MESSAGE = 0
+    INTERRUPT = 1
+    ISR_ENTRY = 2
+    ISR_EXIT = 3
+    TASK_START = 4
+    TASK_END = 5
+    TASK_PREEMPT = 6
+    TASK_RESUME = 7
+    SCHEDULER_START = 8
+    SCHEDULER_ERROR = 9
+    INTERRUPT_ENABLE = 10
+    INTERRUPT_DISABLE = 11
+    DEADLINE_SET = 12
+    DEADLINE_MISS = 13
+    VERIFICATION_COMPLETE = 14
+    TASK_ABORT = 15
+    TASK_BLOCK = 16
+    PRIORITY_CHANGE = 17
+
+# Text layout per kind, rendered only when a consumer asks for text
+EVENT_FORMATS = {
+    EventKind.INTERRUPT: "{subject} ({detail}) - Priority: {priority}",
+    EventKind.ISR_ENTRY: "{subject}",
+    EventKind.ISR_EXIT: "{subject} - Task Signaled",
+    EventKind.TASK_START: "{subject} - Priority: {priority}",
+    EventKind.TASK_END: "{subject}",
+    EventKind.TASK_PREEMPT: "{subject} preempted by {detail}",
+    EventKind.TASK_RESUME: "{subject}",
+    EventKind.DEADLINE_SET: "{subject} deadline = {detail}",
+    EventKind.DEADLINE_MISS: "{subject} - {detail}",
+    EventKind.TASK_ABORT: "{subject} aborted by {detail}",
+    EventKind.TASK_BLOCK: "{subject} blocked on {detail}",
+    EventKind.PRIORITY_CHANGE: "{subject} priority = {priority} ({detail})",
+}
+
+NO_PRIORITY = -1
+# Highest priority the signed-byte priority columns (store and journal) can hold
+MAX_PRIORITY = 127
+NO_SUBJECT = 0
+
+_PREFIXED_MESSAGE = re.compile(r'^\[(\d+)\] ([A-Z_]+): (.*)$')
+
+# Records per time-index block
+TIME_BLOCK = 4096
+
+def render_event(timestamp_us, kind, subject, priority, detail):
+    """Render one event in the classic log text format"""
+    if kind == EventKind.MESSAGE:
+        return detail
+    
+    fmt = EVENT_FORMATS.get(kind)
+    if fmt is None:
+        body = detail or ''
+    else:
+        body = fmt.format(subject=subject, priority=priority, detail=detail)
+    return f"[{timestamp_us}] {EventKind(kind).name}: {body}"
+
+def postings_from(seqs, seq):
+    """Iterate an ascending posting array from the first sequence number >= seq"""
+    for i in range(bisect_left(seqs, seq), len(seqs)):
+        yield seqs[i]
+
+class TimeBlock:
+    """Timestamps of TIME_BLOCK consecutive records.
+    
+    Event timestamps are not monotonic (demo timelines are logged next to
+    wall-clock events), so there is no single sorted order to bisect.
+    Instead each full block is sealed with its timestamps sorted, and a
+    time-range lookup bisects every block whose [min_us, max_us] overlaps.
+    The open block only collects timestamps and is scanned.
+    """
+    __slots__ = ('first_seq', 'times', 'min_us', 'max_us', 'sorted_times', 'sorted_offsets')
+    
+    def __init__(self, first_seq):
+        self.first_seq = first_seq
+        self.times = array('q')
+        self.min_us = None
+        self.max_us = None
+        self.sorted_times = None
+        self.sorted_offsets = None
+    
+    def __len__(self):
+        return len(self.times) if self.sorted_times is None else len(self.sorted_times)
+    
+    def seal(self):
+        """Sort the full block's timestamps for bisection"""
+        times = self.times
+        order = sorted(range(len(times)), key=times.__getitem__)
+        self.sorted_times = array('q', [times[i] for i in order])
+        self.sorted_offsets = array('H', order)
+        self.min_us = self.sorted_times[0]
+        self.max_us = self.sorted_times[-1]
+        self.times = None
+    
+    def overlaps(self, since_us, until_us):
+        if self.sorted_times is None:
+            if not self.times:
+                return False
+            min_us, max_us = min(self.times), max(self.times)
+        else:
+            min_us, max_us = self.min_us, self.max_us
+        return (since_us is None or max_us >= since_us) and (until_us is None or min_us <= until_us)
+    
+    def span(self, since_us, until_us):
+        """Index range of sealed sorted_times within [since_us, until_us]"""
+        lo = 0 if since_us is None else bisect_left(self.sorted_times, since_us)
+        hi = len(self.sorted_times) if until_us is None else bisect_right(self.sorted_times, until_us)
+        return lo, hi
+    
+    def count(self, since_us, until_us):
+        """Records in the time range (an upper bound for the open block)"""
+        if self.sorted_times is None:
+            return len(self.times)
+        if not self.overlaps(since_us, until_us):
+            return 0
+        lo, hi = self.span(since_us, until_us)
+        return max(hi - lo, 0)
+    
+    def seqs(self, since_us, until_us):
+        """Sequence numbers of records in the time range, ascending"""
+        first_seq = self.first_seq
+        if self.sorted_times is None:
+            return [first_seq + offset for offset, timestamp_us in enumerate(self.times)
+                    if (since_us is None or timestamp_us >= since_us)
+                    and (until_us is None or timestamp_us <= until_us)]
+        lo, hi = self.span(since_us, until_us)
+        return [first_seq + offset for offset in sorted(self.sorted_offsets[lo:hi])]
+
+class EventStore:
+    """Fixed-capacity event store with O(1) append and indexed queries.
+    
+    Records live in preallocated columnar arrays used as a ring buffer and are
+    addressed by a monotonically increasing sequence number. Per-kind,
+    per-subject and per-priority posting lists are ascending arrays of
+    sequence numbers, and a block-sorted time index answers timestamp
+    ranges, so queries touch only candidate events. Evicted entries are
+    skipped by bisecting from first_seq and trimmed whenever a whole time
+    block is evicted.
+    """
+    
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.timestamps = array('q', bytes(8 * capacity))
+        self.kinds = array('B', bytes(capacity))
+        self.subjects = array('H', bytes(2 * capacity))
+        self.priorities = array('b', bytes(capacity))
+        self.details = [None] * capacity
+        
+        # Subject id 0 is reserved for "no task/ISR"
+        self.subject_names = ['']
+        self.subject_ids = {'': NO_SUBJECT}
+        
+        self.next_seq = 0
+        self.first_seq = 0
+        self.kind_index = {kind: array('q') for kind in EventKind}
+        self.subject_index = {}
+        self.priority_index = {}
+        self.time_blocks = deque()
+        self.open_block = None
+        self.pair_counts = Counter()
+    
+    def __len__(self):
+        return self.next_seq - self.first_seq
+    
+    def intern_subject(self, name):
+        """Map a task/ISR name to its compact subject id"""
+        if not name:
+            return NO_SUBJECT
+        subject_id = self.subject_ids.get(name)
+        if subject_id is None:
+            subject_id = len(self.subject_names)
+            self.subject_names.append(name)
+            self.subject_ids[name] = subject_id
+            self.subject_index[subject_id] = array('q')
+        return subject_id
+    
+    def append(self, timestamp_us, kind, subject=None, priority=NO_PRIORITY, detail=None):
+        """Append an event and return its sequence number.
+        
+        A field that does not fit its column raises before any index is
+        touched, so a rejected event leaves the store consistent.
+        """
+        seq = self.next_seq
+        if seq - self.first_seq == self.capacity:
+            self._evict_oldest()
+        
+        subject_id = self.intern_subject(subject)
+        slot = seq % self.capacity
+        self.timestamps[slot] = timestamp_us
+        self.kinds[slot] = kind
+        self.subjects[slot] = subject_id
+        self.priorities[slot] = priority
+        self.details[slot] = detail
+        
+        self.kind_index[kind].append(seq)
+        if subject_id != NO_SUBJECT:
+            self.subject_index[subject_id].append(seq)
+        if priority != NO_PRIORITY:
+            by_priority = self.priority_index.get(priority)
+            if by_priority is None:
+                by_priority = self.priority_index[priority] = array('q')
+            by_priority.append(seq)
+        self.pair_counts[(kind, subject_id)] += 1
+        
+        block = self.open_block
+        if block is None:
+            block = self.open_block = TimeBlock(seq)
+            self.time_blocks.append(block)
+        times = block.times
+        times.append(timestamp_us)
+        if len(times) == TIME_BLOCK:
+            block.seal()
+            self.open_block = None
+        self.next_seq = seq + 1
+        return seq
+    
+    def _evict_oldest(self):
+        """Drop the oldest record; posting lists are trimmed a time block at a time"""
+        slot = self.first_seq % self.capacity
+        kind = EventKind(self.kinds[slot])
+        subject_id = self.subjects[slot]
+        
+        self.pair_counts[(kind, subject_id)] -= 1
+        self.details[slot] = None
+        self.first_seq += 1
+        
+        if self.time_blocks[0].first_seq + TIME_BLOCK <= self.first_seq:
+            self.time_blocks.popleft()
+            first_seq = self.first_seq
+            for index in (self.kind_index, self.subject_index, self.priority_index):
+                for seqs in index.values():
+                    del seqs[:bisect_left(seqs, first_seq)]
+    
+    def live(self, seqs):
+        """Number of live records in a posting array"""
+        return len(seqs) - bisect_left(seqs, self.first_seq)
+    
+    def clear(self):
+        """Drop all records; sequence numbers keep increasing"""
+        for posting in self.kind_index.values():
+            del posting[:]
+        for posting in self.subject_index.values():
+            del posting[:]
+        self.priority_index.clear()
+        self.time_blocks.clear()
+        self.open_block = None
+        self.pair_counts.clear()
+        self.details = [None] * self.capacity
+        self.first_seq = self.next_seq
+    
+    def record(self, seq):
+        """Get the structured record for a sequence number"""
+        slot = seq % self.capacity
+        return {
+            'seq': seq,
+            'timestamp_us': self.timestamps[slot],
+            'kind': EventKind(self.kinds[slot]).name,
+            'subject': self.subject_names[self.subjects[slot]] or None,
+            'priority': self.priorities[slot] if self.priorities[slot] != NO_PRIORITY else None,
+            'detail': self.details[slot]
+        }
+    
+    def fields(self, seq):
+        """Raw (seq, kind, subject, priority, detail) tuple of a record"""
+        slot = seq % self.capacity
+        return (seq, self.kinds[slot], self.subject_names[self.subjects[slot]],
+                self.priorities[slot], self.details[slot])
+    
+    def render(self, seq):
+        """Render a record in the classic log text format"""
+        slot = seq % self.capacity
+        return render_event(self.timestamps[slot], self.kinds[slot],
+                            self.subject_names[self.subjects[slot]], self.priorities[slot],
+                            self.details[slot])
+    
+    def count(self, kind=None, subject=None):
+        """Count live events of a kind and/or subject in O(1) (O(log n) per posting list)"""
+        if subject is not None:
+            subject_id = self.subject_ids.get(subject)
+            if subject_id is None:
+                return 0
+            if kind is None:
+                return self.live(self.subject_index[subject_id])
+            return self.pair_counts[(kind, subject_id)]
+        if kind is not None:
+            return self.live(self.kind_index[kind])
+        return len(self)
+    
+    def query(self, kind=None, subject=None, since_us=None, limit=None):
+        """Return sequence numbers of matching events, oldest first.
+        
+        Walks the shortest applicable posting list, so the cost is bounded by
+        the number of events of the requested kind/subject rather than the
+        size of the whole log.
+        """
+        candidates = None
+        if kind is not None:
+            candidates = self.kind_index[kind]
+        if subject is not None:
+            subject_id = self.subject_ids.get(subject)
+            if subject_id is None:
+                return []
+            by_subject = self.subject_index[subject_id]
+            if candidates is None or len(by_subject) < len(candidates):
+                candidates = by_subject
+        if candidates is None:
+            candidates = range(self.first_seq, self.next_seq)
+        else:
+            candidates = postings_from(candidates, self.first_seq)
+        
+        subject_id = self.subject_ids.get(subject) if subject is not None else None
+        results = []
+        for seq in candidates:
+            slot = seq % self.capacity
+            if kind is not None and self.kinds[slot] != kind:
+                continue
+            if subject_id is not None and self.subjects[slot] != subject_id:
+                continue
+            if since_us is not None and self.timestamps[slot] < since_us:
+                continue
+            results.append(seq)
+        if limit is not None:
+            results = results[-limit:]
+        return results
+    
+    def time_range(self, since_us, until_us, lower):
+        """Sequence numbers >= lower with a timestamp in the range, ascending"""
+        for block in self.time_blocks:
+            if block.first_seq + len(block) <= lower or not block.overlaps(since_us, until_us):
+                continue
+            for seq in block.seqs(since_us, until_us):
+                if seq >= lower:
+                    yield seq
+    
+    def search(self, kinds=None, subject=None, priority=None, since_us=None, until_us=None,
+               after_seq=None, limit=100):
+        """Find events matching every given filter, oldest first.
+        
+        Returns (seqs, more): up to `limit` sequence numbers after after_seq,
+        and whether more matches follow. The smallest candidate set (the
+        kinds', subject's or priority's posting lists, or the time index)
+        drives the scan and the other filters are checked on the columns,
+        so the cost follows the most selective filter, not the log size.
+        """
+        lower = self.first_seq if after_seq is None else max(self.first_seq, after_seq + 1)
+        subject_id = None
+        if subject is not None:
+            subject_id = self.subject_ids.get(subject)
+            if subject_id is None:
+                return [], False
+        
+        # (candidate count, ascending candidate iterator factory)
+        drivers = [(self.next_seq - lower, lambda: iter(range(lower, self.next_seq)))]
+        if kinds is not None:
+            postings = [self.kind_index[kind] for kind in kinds]
+            drivers.append((sum(map(self.live, postings)),
+                            lambda: heapq.merge(*(postings_from(posting, lower) for posting in postings))))
+        if subject_id is not None:
+            by_subject = self.subject_index[subject_id]
+            drivers.append((self.live(by_subject), lambda: postings_from(by_subject, lower)))
+        if priority is not None:
+            by_priority = self.priority_index.get(priority)
+            if by_priority is None:
+                return [], False
+            drivers.append((self.live(by_priority), lambda: postings_from(by_priority, lower)))
+        if since_us is not None or until_us is not None:
+            drivers.append((sum(block.count(since_us, until_us) for block in self.time_blocks),
+                            lambda: self.time_range(since_us, until_us, lower)))
+        candidates = min(drivers, key=lambda driver: driver[0])[1]()
+        
+        results = []
+        for seq in candidates:
+            slot = seq % self.capacity
+            if kinds is not None and self.kinds[slot] not in kinds:
+                continue
+            if subject_id is not None and self.subjects[slot] != subject_id:
+                continue
+            if priority is not None and self.priorities[slot] != priority:
+                continue
+            timestamp_us = self.timestamps[slot]
+            if since_us is not None and timestamp_us < since_us:
+                continue
+            if until_us is not None and timestamp_us > until_us:
+                continue
+            if len(results) == limit:
+                return results, True
+            results.append(seq)
+        return results, False
+    
+    def parse_message(self, message, default_timestamp_us):
+        """Split a legacy pre-formatted message into (timestamp, kind, detail)"""
+        match = _PREFIXED_MESSAGE.match(message)
+        if match and match.group(2) in EventKind.__members__:
+            kind = EventKind[match.group(2)]
+            if kind not in EVENT_FORMATS:
+                return int(match.group(1)), kind, match.group(3)
+        if message.startswith('[') and ']' in message:
+            return default_timestamp_us, EventKind.MESSAGE, message
+        return default_timestamp_us, EventKind.MESSAGE, f"[{default_timestamp_us}] {message}"
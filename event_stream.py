@@ -0,0 +1,170 @@
+"""
+Event Stream - Server-Sent Events Broadcaster
+Fans out sensor data, new log events and stats deltas to connected clients
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+class StreamClient:
+    """Per-client outbox with a bounded event buffer and coalesced state topics"""
+    
+    def __init__(self, max_events):
+        self.events = deque(maxlen=max_events)
+        self.next_seq = None
+        self.dropped = 0
+        self.latest = {}  # topic -> newest payload; older updates are merged away
+        self.ready = threading.Condition()
+        self.closed = False
+    
+    def has_pending(self):
+        return bool(self.events) or bool(self.latest) or self.dropped > 0
+    
+    def push_events(self, lines, next_seq):
+        with self.ready:
+            overflow = len(self.events) + len(lines) - self.events.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self.events.extend(lines)
+            self.next_seq = next_seq
+            self.ready.notify()
+    
+    def push_state(self, topic, payload, merge=False):
+        with self.ready:
+            if merge and topic in self.latest:
+                self.latest[topic].update(payload)
+            else:
+                self.latest[topic] = dict(payload)
+            self.ready.notify()
+    
+    def drain(self):
+        """Take everything queued for this client as a list of (topic, payload)"""
+        with self.ready:
+            messages = list(self.latest.items())
+            self.latest = {}
+            if self.events or self.dropped:
+                messages.append(('events', {
+                    'events': list(self.events),
+                    'first_seq': self.next_seq - len(self.events),
+                    'next_seq': self.next_seq,
+                    'dropped': self.dropped
+                }))
+                self.events.clear()
+                self.dropped = 0
+            return messages
+
+class Broadcaster:
+    """Single producer that pushes system updates to every SSE client.
+    
+    Log events are read once per batch through the logger's sequence cursor
+    and rendered once for all clients. Sensor data and stats are coalesced
+    per client: a slow client only ever holds the newest sensor snapshot and
+    the merged stats delta, plus at most `max_events` log lines.
+    """
+    
+    def __init__(self, logger, shared_resources, stats_provider=None,
+                 max_events=500, stats_interval_s=1.0, min_flush_interval_s=0.05):
+        self.logger = logger
+        self.shared_resources = shared_resources
+        self.stats_provider = stats_provider
+        self.max_events = max_events
+        self.stats_interval_s = stats_interval_s
+        self.min_flush_interval_s = min_flush_interval_s
+        
+        self.clients = set()
+        self.clients_lock = threading.Lock()
+        self.last_stats = {}
+        self.running = False
+        
+        shared_resources.add_listener(self.publish_sensor_data)
+    
+    def subscribe(self):
+        """Register a new client, seeded with the current sensor data and stats"""
+        client = StreamClient(self.max_events)
+        client.push_state('sensor', self.sensor_payload(self.shared_resources.snapshot()))
+        if self.last_stats:
+            client.push_state('stats', self.last_stats)
+        with self.clients_lock:
+            self.clients.add(client)
+        return client
+    
+    def unsubscribe(self, client):
+        with self.clients_lock:
+            self.clients.discard(client)
+        with client.ready:
+            client.closed = True
+            client.ready.notify()
+    
+    def client_count(self):
+        with self.clients_lock:
+            return len(self.clients)
+    
+    def _snapshot_clients(self):
+        with self.clients_lock:
+            return list(self.clients)
+    
+    @staticmethod
+    def sensor_payload(snapshot):
+        return {**snapshot.data, 'version': snapshot.version}
+    
+    def publish_sensor_data(self, snapshot):
+        """SharedResources listener: coalesce to the newest snapshot per client"""
+        payload = self.sensor_payload(snapshot)
+        for client in self._snapshot_clients():
+            client.push_state('sensor', payload)
+    
+    def publish_stats(self):
+        """Compute stats once and push only the keys that changed"""
+        if self.stats_provider is None:
+            return
+        stats = self.stats_provider()
+        delta = {key: value for key, value in stats.items() if self.last_stats.get(key) != value}
+        self.last_stats = stats
+        if not delta:
+            return
+        for client in self._snapshot_clients():
+            client.push_state('stats', delta, merge=True)
+    
+    def run(self):
+        """Broadcaster loop: follow the event log and refresh stats periodically"""
+        self.running = True
+        cursor = self.logger.get_logs_since(limit=0)['next_seq']
+        next_stats = time.monotonic()
+        
+        while self.running:
+            try:
+                wait_s = max(0.0, next_stats - time.monotonic())
+                batch = self.logger.get_logs_since(cursor, self.max_events, wait_s)
+                cursor = batch['next_seq']
+                if batch['events']:
+                    for client in self._snapshot_clients():
+                        client.push_events(batch['events'], cursor)
+                
+                if time.monotonic() >= next_stats:
+                    self.publish_stats()
+                    next_stats = time.monotonic() + self.stats_interval_s
+            except Exception as e:
+                self.logger.log(f"[ERROR] Event stream broadcaster error: {str(e)}")
+                time.sleep(self.stats_interval_s)
+    
+    def stream(self, client, heartbeat_s=15.0):
+        """Generator of SSE frames for one client; ends when the client goes away"""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                with client.ready:
+                    client.ready.wait_for(lambda: client.closed or client.has_pending(), timeout=heartbeat_s)
+                    if client.closed:
+                        return
+                messages = client.drain()
+                if not messages:
+                    yield ": keep-alive\n\n"
+                    continue
+                for topic, payload in messages:
+                    yield f"event: {topic}\ndata: {json.dumps(payload)}\n\n"
+                # Let fast updates pile up briefly so they go out coalesced
+                time.sleep(self.min_flush_interval_s)
+        finally:
+            self.unsubscribe(client)
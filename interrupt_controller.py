@@ -3,14 +3,33 @@ Interrupt Controller - Fixed Version
 Handles virtual interrupt simulation with proper nesting support
 """
 
-import queue
+import heapq
+import itertools
 import time
 import threading
+from event_store import EventKind, MAX_PRIORITY
+from message_ring import validate_frame
+from metrics import RateWindow
+from timing import wait_us
+
+class InterruptQueueFull(Exception):
+    """Raised when the pending-interrupt queue is at its bound"""
 
 class InterruptController:
-    def __init__(self, logger):
+    # Actual ISR body execution time
+    ISR_DURATION_US = 1000
+    
+    def __init__(self, logger, max_pending=1000):
         self.logger = logger
-        self.interrupt_queue = queue.PriorityQueue()
+        # Pending interrupts: heap of
+        # (-priority, seq, int_number, sensor_name, timestamp, arrival_ns, payload),
+        # drained by the dispatch thread in run_dispatcher(). arrival_ns is the
+        # perf_counter_ns() at trigger time, from which task response is measured
+        self.interrupt_queue = []
+        self.queue_condition = threading.Condition()
+        self.interrupt_seq = itertools.count()
+        self.max_pending = max_pending
+        self.rejected_count = 0
         self.rtos = None
         self.interrupt_count = 0
         self.interrupt_lock = threading.Lock()
@@ -24,6 +43,18 @@ class InterruptController:
             'Speed': (2, 5)       # INT2, Priority 5
         }
         
+        # Incremental statistics, updated on every trigger
+        self.sensor_counts = {name: 0 for name in self.interrupt_map}
+        self.interrupt_rate = RateWindow(window_s=60)
+        
+        # ISR names and the task each ISR signals
+        self.isr_names = {0: "Brake_ISR", 1: "Collision_ISR", 2: "Speed_ISR"}
+        self.isr_tasks = {0: "BrakeTask", 1: "CollisionTask", 2: "SpeedTask"}
+        
+        # Message queue that receives a record's payload before its ISR runs
+        self.isr_queues = {0: 'brake_queue', 1: 'collision_queue', 2: 'speed_queue'}
+        self.payloads_dropped = 0
+        
         # ISR handlers
         self.isrs = {
             0: self.brake_isr,
@@ -31,66 +62,239 @@ class InterruptController:
             2: self.speed_isr
         }
     
+    def register_sensor(self, sensor_name, priority, task_name):
+        """Add an interrupt line for a sensor whose ISR signals task_name"""
+        if isinstance(priority, bool) or not isinstance(priority, int) or not 0 <= priority <= MAX_PRIORITY:
+            raise ValueError(f"Sensor priority must be an integer from 0 to {MAX_PRIORITY}")
+        with self.interrupt_lock:
+            if sensor_name in self.interrupt_map:
+                raise ValueError(f"Sensor already registered: {sensor_name}")
+            int_number = max(self.isr_names) + 1
+            self.isr_names[int_number] = f"{sensor_name}_ISR"
+            self.isr_tasks[int_number] = task_name
+            self.isrs[int_number] = self.registered_isr
+            self.sensor_counts[sensor_name] = 0
+            self.interrupt_map[sensor_name] = (int_number, priority)
+        return int_number
+    
     def set_rtos(self, rtos):
         self.rtos = rtos
     
     def set_interrupt_enabled(self, enabled):
         """FIX: Enable/disable interrupts"""
-        self.interrupt_enabled = enabled
+        with self.queue_condition:
+            self.interrupt_enabled = enabled
+            self.queue_condition.notify()
         if enabled:
-            self.logger.log(f"[{int(time.time_ns() // 1000)}] INTERRUPT_ENABLE: Interrupts enabled")
+            self.logger.log_event(EventKind.INTERRUPT_ENABLE, detail="Interrupts enabled",
+                                  timestamp_us=int(time.time_ns() // 1000))
         else:
-            self.logger.log(f"[{int(time.time_ns() // 1000)}] INTERRUPT_DISABLE: Interrupts disabled")
+            self.logger.log_event(EventKind.INTERRUPT_DISABLE, detail="Interrupts disabled",
+                                  timestamp_us=int(time.time_ns() // 1000))
     
     def trigger_interrupt(self, sensor_name):
-        """Trigger interrupt from sensor name"""
+        """Queue an interrupt for the dispatch thread and return immediately.
+        
+        Raises InterruptQueueFull when max_pending interrupts are waiting.
+        """
         if not self.interrupt_enabled:
             return {'status': 'disabled', 'message': 'Interrupts disabled'}
         
         if sensor_name not in self.interrupt_map:
             raise ValueError(f"Unknown sensor: {sensor_name}")
         
-        int_number, priority = self.interrupt_map[sensor_name]
         # Use demo-style timestamp (current time in microseconds)
         timestamp = int(time.time() * 1_000_000)
+        arrival_ns = time.perf_counter_ns()
         
-        self.interrupt_count += 1
+        with self.queue_condition:
+            if len(self.interrupt_queue) >= self.max_pending:
+                self.rejected_count += 1
+                raise InterruptQueueFull(f"{self.max_pending} interrupts pending")
+            int_number, priority = self.record_interrupt(sensor_name, timestamp)
+            heapq.heappush(self.interrupt_queue,
+                           (-priority, next(self.interrupt_seq), int_number, sensor_name, timestamp,
+                            arrival_ns, None))
+            self.queue_condition.notify()
         
-        # Log in exact demo format
-        self.logger.log(f"[{timestamp}] INTERRUPT: {sensor_name} (INT{int_number}) - Priority: {priority}")
+        return {"int_number": int_number, "priority": priority, "timestamp": timestamp}
+    
+    def trigger_batch(self, records):
+        """Trigger interrupts for many sensor records at once.
+        
+        Each record is a dict with 'sensor' and optional 'timestamp' (μs) and
+        'payload' (dict delivered to the task's message queue). Valid records
+        are counted, logged and enqueued with one acquisition of each lock for
+        the dispatch thread. Records beyond the free queue space get status
+        'busy'. Returns one result per record.
+        """
+        if not self.interrupt_enabled:
+            return [{'status': 'disabled', 'message': 'Interrupts disabled'} for _ in records]
+        
+        now = int(time.time() * 1_000_000)
+        arrival_ns = time.perf_counter_ns()
+        results = []
+        accepted = []
+        for record in records:
+            try:
+                sensor_name, timestamp, payload = self.parse_record(record, now)
+            except ValueError as e:
+                results.append({'status': 'error', 'message': str(e)})
+                continue
+            int_number, priority = self.interrupt_map[sensor_name]
+            accepted.append((len(results), int_number, priority, sensor_name, timestamp, payload))
+            results.append({'status': 'queued', 'int_number': int_number,
+                            'priority': priority, 'timestamp': timestamp})
+        
+        if not accepted:
+            return results
+        
+        with self.queue_condition:
+            free = max(0, self.max_pending - len(self.interrupt_queue))
+            accepted, refused = accepted[:free], accepted[free:]
+            self.rejected_count += len(refused)
+            
+            if accepted:
+                with self.interrupt_lock:
+                    self.interrupt_count += len(accepted)
+                    for _, _, _, sensor_name, _, _ in accepted:
+                        self.sensor_counts[sensor_name] += 1
+                self.interrupt_rate.add(len(accepted), now=now / 1_000_000)
+                
+                self.logger.log_events(
+                    (EventKind.INTERRUPT, sensor_name, priority, f"INT{int_number}", timestamp)
+                    for _, int_number, priority, sensor_name, timestamp, _ in accepted
+                )
+                for _, int_number, priority, sensor_name, timestamp, payload in accepted:
+                    heapq.heappush(self.interrupt_queue,
+                                   (-priority, next(self.interrupt_seq), int_number,
+                                    sensor_name, timestamp, arrival_ns, payload))
+                self.queue_condition.notify()
+        
+        for index, *_ in refused:
+            results[index] = {'status': 'busy', 'message': 'Interrupt queue full'}
+        return results
+    
+    def parse_record(self, record, default_timestamp):
+        """Validate a batch record; returns (sensor_name, timestamp, payload)"""
+        if not isinstance(record, dict):
+            raise ValueError("Record must be an object")
+        sensor_name = record.get('sensor')
+        if sensor_name not in self.interrupt_map:
+            raise ValueError(f"Unknown sensor: {sensor_name}")
+        
+        timestamp = record.get('timestamp', default_timestamp)
+        if isinstance(timestamp, bool) or not isinstance(timestamp, int) or timestamp < 0:
+            raise ValueError("timestamp must be a non-negative integer (μs)")
+        
+        payload = record.get('payload')
+        if payload is not None:
+            if not isinstance(payload, dict):
+                raise ValueError("payload must be an object")
+            validate_frame(payload)
+        return sensor_name, timestamp, payload
+    
+    def record_interrupt(self, sensor_name, timestamp):
+        """Count and log an interrupt arrival; returns (int_number, priority)"""
+        int_number, priority = self.interrupt_map[sensor_name]
         
         with self.interrupt_lock:
-            self.interrupt_queue.put((-priority, int_number, sensor_name, timestamp))
+            self.interrupt_count += 1
+            self.sensor_counts[sensor_name] += 1
+        self.interrupt_rate.add(now=timestamp / 1_000_000)
         
-        self.process_interrupts()
+        # Log in exact demo format
+        self.logger.log_event(EventKind.INTERRUPT, sensor_name, priority, f"INT{int_number}", timestamp)
+        return int_number, priority
+    
+    def get_statistics(self):
+        """Get interrupt counters without touching the event log"""
+        with self.interrupt_lock:
+            sensor_counts = dict(self.sensor_counts)
+            total = self.interrupt_count
+        with self.queue_condition:
+            pending = len(self.interrupt_queue)
+            rejected = self.rejected_count
         
-        return {"int_number": int_number, "priority": priority, "timestamp": timestamp}
+        return {
+            'sensor_counts': sensor_counts,
+            'total_interrupts': total,
+            'interrupts_per_sec': round(self.interrupt_rate.rate(10), 2),
+            'interrupts_per_min': round(self.interrupt_rate.rate(60) * 60, 2),
+            'payloads_dropped': self.payloads_dropped,
+            'pending_interrupts': pending,
+            'max_pending_interrupts': self.max_pending,
+            'rejected_interrupts': rejected
+        }
     
-    def process_interrupts(self):
-        """Process all queued interrupts in priority order"""
-        while not self.interrupt_queue.empty() and self.interrupt_enabled:
+    def reset_sensor_counts(self):
+        """Reset per-sensor event counters"""
+        with self.interrupt_lock:
+            for name in self.sensor_counts:
+                self.sensor_counts[name] = 0
+    
+    def run_dispatcher(self):
+        """Interrupt dispatch loop: run ISRs in priority order as interrupts arrive"""
+        while True:
+            with self.queue_condition:
+                self.queue_condition.wait_for(lambda: self.interrupt_queue and self.interrupt_enabled)
+                item = heapq.heappop(self.interrupt_queue)
             try:
-                item = self.interrupt_queue.get_nowait()
-                _, int_number, sensor_name, timestamp = item
-                
-                if int_number in self.isrs:
-                    # FIX: Save current ISR context
-                    self.isr_stack.append({
-                        'int_number': int_number,
-                        'timestamp': timestamp,
-                        'sensor_name': sensor_name
-                    })
-                    
-                    self.isrs[int_number](sensor_name, timestamp)
-                    
-                    # FIX: Restore previous ISR context
-                    if self.isr_stack:
-                        self.isr_stack.pop()
-                        
-            except queue.Empty:
-                break
-    
-    def brake_isr(self, sensor_name=None, entry_timestamp=None):
+                self.dispatch_interrupt(item)
+            except Exception as e:
+                self.logger.log(f"[ERROR] Interrupt dispatch failed: {str(e)}")
+    
+    def process_interrupts(self):
+        """Process all queued interrupts in priority order on the calling thread"""
+        while True:
+            with self.queue_condition:
+                if not self.interrupt_queue or not self.interrupt_enabled:
+                    break
+                item = heapq.heappop(self.interrupt_queue)
+            self.dispatch_interrupt(item)
+    
+    def dispatch_interrupt(self, item):
+        """Run the ISR for one dequeued interrupt"""
+        _, _, int_number, sensor_name, timestamp, arrival_ns, payload = item
+        if int_number in self.isrs:
+            # FIX: Save current ISR context
+            self.isr_stack.append({
+                'int_number': int_number,
+                'timestamp': timestamp,
+                'sensor_name': sensor_name
+            })
+            
+            if payload is not None:
+                self.isr_stack[-1]['message_seq'] = self.deliver_payload(int_number, payload)
+            self.isrs[int_number](sensor_name, timestamp, arrival_ns)
+            
+            # FIX: Restore previous ISR context
+            if self.isr_stack:
+                self.isr_stack.pop()
+    
+    def deliver_payload(self, int_number, payload):
+        """Post a record's payload to the message queue of the task its ISR signals.
+        
+        Returns the message's sequence number in the queue, or None if it was dropped.
+        """
+        if self.rtos is None:
+            return None
+        queue_name = self.isr_queues.get(int_number)
+        message_seq = None
+        if queue_name is not None:
+            message_seq = self.rtos.shared_resources.send_message(queue_name, payload)
+        if message_seq is None:
+            with self.interrupt_lock:
+                self.payloads_dropped += 1
+        return message_seq
+    
+    def current_message_seq(self):
+        """Sequence number of the message posted by the interrupt being serviced, if any"""
+        if not self.isr_stack:
+            return None
+        return self.isr_stack[-1].get('message_seq')
+    
+    def brake_isr(self, sensor_name=None, entry_timestamp=None, arrival_ns=None):
         """Brake sensor ISR - highest priority - Fast response (1-2 seconds)"""
         if entry_timestamp is None:
             entry_timestamp = int(time.time() * 1_000_000)
@@ -99,21 +303,17 @@ class InterruptController:
         isr_entry_timestamp = entry_timestamp + (1 * 1_000_000)  # 1 second after interrupt
         isr_exit_timestamp = isr_entry_timestamp + (1 * 1_000_000)  # 1 second ISR duration
         
-        self.logger.log(f"[{isr_entry_timestamp}] ISR_ENTRY: Brake_ISR")
+        self.logger.log_event(EventKind.ISR_ENTRY, "Brake_ISR", timestamp_us=isr_entry_timestamp)
         
         # Simulate ISR execution time
-        start_time = time.perf_counter()
-        isr_duration_s = 0.001  # 1 millisecond actual execution
-        
-        while time.perf_counter() - start_time < isr_duration_s:
-            pass  # Busy wait for accuracy
+        wait_us(self.ISR_DURATION_US)  # 1 millisecond actual execution
         
         if self.rtos:
-            self.rtos.signal_task("BrakeTask")
+            self.rtos.signal_task("BrakeTask", arrival_ns, self.current_message_seq())
         
-        self.logger.log(f"[{isr_exit_timestamp}] ISR_EXIT: Brake_ISR - Task Signaled")
+        self.logger.log_event(EventKind.ISR_EXIT, "Brake_ISR", timestamp_us=isr_exit_timestamp)
     
-    def collision_isr(self, sensor_name=None, entry_timestamp=None):
+    def collision_isr(self, sensor_name=None, entry_timestamp=None, arrival_ns=None):
         """Collision sensor ISR - high priority - Medium response (2-3 seconds)"""
         if entry_timestamp is None:
             entry_timestamp = int(time.time() * 1_000_000)
@@ -122,20 +322,16 @@ class InterruptController:
         isr_entry_timestamp = entry_timestamp + (2 * 1_000_000)  # 2 seconds after interrupt
         isr_exit_timestamp = isr_entry_timestamp + (1 * 1_000_000)  # 1 second ISR duration
         
-        self.logger.log(f"[{isr_entry_timestamp}] ISR_ENTRY: Collision_ISR")
-        
-        start_time = time.perf_counter()
-        isr_duration_s = 0.001  # 1 millisecond actual execution
+        self.logger.log_event(EventKind.ISR_ENTRY, "Collision_ISR", timestamp_us=isr_entry_timestamp)
         
-        while time.perf_counter() - start_time < isr_duration_s:
-            pass
+        wait_us(self.ISR_DURATION_US)  # 1 millisecond actual execution
         
         if self.rtos:
-            self.rtos.signal_task("CollisionTask")
+            self.rtos.signal_task("CollisionTask", arrival_ns, self.current_message_seq())
         
-        self.logger.log(f"[{isr_exit_timestamp}] ISR_EXIT: Collision_ISR - Task Signaled")
+        self.logger.log_event(EventKind.ISR_EXIT, "Collision_ISR", timestamp_us=isr_exit_timestamp)
     
-    def speed_isr(self, sensor_name=None, entry_timestamp=None):
+    def speed_isr(self, sensor_name=None, entry_timestamp=None, arrival_ns=None):
         """Speed sensor ISR - medium priority - Slower response (3-5 seconds)"""
         if entry_timestamp is None:
             entry_timestamp = int(time.time() * 1_000_000)
@@ -144,15 +340,23 @@ class InterruptController:
         isr_entry_timestamp = entry_timestamp + (3 * 1_000_000)  # 3 seconds after interrupt
         isr_exit_timestamp = isr_entry_timestamp + (2 * 1_000_000)  # 2 seconds ISR duration
         
-        self.logger.log(f"[{isr_entry_timestamp}] ISR_ENTRY: Speed_ISR")
-        
-        start_time = time.perf_counter()
-        isr_duration_s = 0.001  # 1 millisecond actual execution
+        self.logger.log_event(EventKind.ISR_ENTRY, "Speed_ISR", timestamp_us=isr_entry_timestamp)
         
-        while time.perf_counter() - start_time < isr_duration_s:
-            pass
+        wait_us(self.ISR_DURATION_US)  # 1 millisecond actual execution
         
         if self.rtos:
-            self.rtos.signal_task("SpeedTask")
+            self.rtos.signal_task("SpeedTask", arrival_ns, self.current_message_seq())
         
-        self.logger.log(f"[{isr_exit_timestamp}] ISR_EXIT: Speed_ISR - Task Signaled")
+        self.logger.log_event(EventKind.ISR_EXIT, "Speed_ISR", timestamp_us=isr_exit_timestamp)
+    
+    def registered_isr(self, sensor_name, entry_timestamp=None, arrival_ns=None):
+        """ISR for a sensor added with register_sensor(): signal its bound task"""
+        int_number, _ = self.interrupt_map[sensor_name]
+        isr_name = self.isr_names[int_number]
+        
+        self.logger.log_event(EventKind.ISR_ENTRY, isr_name)
+        wait_us(self.ISR_DURATION_US)
+        if self.rtos:
+            self.rtos.signal_task(self.isr_tasks[int_number], arrival_ns,
+                                  self.current_message_seq())
+        self.logger.log_event(EventKind.ISR_EXIT, isr_name)
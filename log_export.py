@@ -0,0 +1,106 @@
+"""
+Log Export - Streaming Event Export
+Renders event tuples as text, CSV or NDJSON in bounded chunks, optionally gzipped
+"""
+
+import csv
+import io
+import json
+import zlib
+from event_store import EventKind, NO_PRIORITY, render_event
+
+# Flush a chunk to the response once it holds about this many characters
+CHUNK_CHARS = 64 * 1024
+
+CSV_COLUMNS = ('seq', 'timestamp_us', 'kind', 'subject', 'priority', 'detail')
+
+def text_chunks(events):
+    """Classic log lines, as written by the original export"""
+    lines = []
+    size = 0
+    for _, timestamp_us, kind, subject, priority, detail in events:
+        line = render_event(timestamp_us, kind, subject, priority, detail)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_CHARS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+            size = 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def csv_chunks(events):
+    """One CSV row per event under a header row; no priority is an empty cell"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(CSV_COLUMNS)
+    for seq, timestamp_us, kind, subject, priority, detail in events:
+        writer.writerow((seq, timestamp_us, EventKind(kind).name, subject or '',
+                         '' if priority == NO_PRIORITY else priority, '' if detail is None else detail))
+        if buffer.tell() >= CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def ndjson_chunks(events):
+    """One JSON object per line, with the same fields as /api/event-log records"""
+    lines = []
+    size = 0
+    for seq, timestamp_us, kind, subject, priority, detail in events:
+        line = json.dumps({
+            'seq': seq,
+            'timestamp_us': timestamp_us,
+            'kind': EventKind(kind).name,
+            'subject': subject or None,
+            'priority': priority if priority != NO_PRIORITY else None,
+            'detail': detail
+        }, ensure_ascii=False)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_CHARS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+            size = 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+# format name -> (chunk generator, mimetype, file extension)
+EXPORT_FORMATS = {
+    'text': (text_chunks, 'text/plain', 'txt'),
+    'csv': (csv_chunks, 'text/csv', 'csv'),
+    'ndjson': (ndjson_chunks, 'application/x-ndjson', 'ndjson'),
+}
+
+def parse_kinds(names):
+    """Event kind names (repeated and/or comma-separated) -> set of kinds, or None for all"""
+    kinds = set()
+    for value in names:
+        for name in value.split(','):
+            name = name.strip().upper()
+            if not name:
+                continue
+            if name not in EventKind.__members__:
+                raise ValueError(f"Unknown event kind: {name}")
+            kinds.add(EventKind[name])
+    return kinds or None
+
+def gzip_chunks(chunks, level=6):
+    """Compress text chunks into a gzip stream as they are produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_chunks(events, fmt='text', compress=False):
+    """Encoded response chunks for an iterable of
+    (seq, timestamp_us, kind, subject, priority, detail) event tuples"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    chunks = EXPORT_FORMATS[fmt][0](events)
+    if compress:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
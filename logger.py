@@ -5,44 +5,336 @@ Comprehensive event logging with microsecond precision
 
 import threading
 import time
-from collections import deque
+from event_store import EventStore, NO_PRIORITY
+from log_ring import LogRing
 
 class Logger:
-    def __init__(self, max_logs=10000):
-        self.logs = deque(maxlen=max_logs)
+    """Event log over an EventStore.
+    
+    With deferred=True the logging calls only hand a record tuple
+    (kind, subject, priority, detail, timestamp_us, monotonic_ns) to a
+    lock-free LogRing; the writer thread (run_writer) timestamps, parses
+    and stores it, and appends the rendered line to persist_path if one is
+    given. Every read drains the ring first, so a caller always sees the
+    events it logged itself. Deferred calls return None instead of the
+    event's sequence number.
+    
+    With a `journal` (EventJournal) every stored event is also appended to
+    the on-disk journal, which outlives the in-memory store's capacity.
+    """
+    
+    def __init__(self, max_logs=10000, deferred=False, ring_slots=65536, persist_path=None, journal=None):
+        self.store = EventStore(capacity=max_logs)
         self.log_lock = threading.Lock()
+        self.new_events = threading.Condition(self.log_lock)
         self.log_levels = {'DEBUG': 0, 'INFO': 1, 'WARNING': 2, 'ERROR': 3}
         self.current_level = 'DEBUG'
         self.start_time = time.time()
+        
+        # Wall-clock μs = (monotonic ns + offset) // 1000, for deferred records
+        self.clock_offset_ns = time.time_ns() - time.monotonic_ns()
+        self.ring = LogRing(self.write_records, ring_slots) if deferred else None
+        self.persist_file = open(persist_path, 'a', encoding='utf-8') if persist_path else None
+        self.journal = journal
+        
+        # Deferred records the store refused (e.g. a priority outside its column)
+        self.rejected_records = 0
+        self.last_rejection = None
+    
+    def set_journal(self, journal):
+        """Append every event stored from now on to an EventJournal"""
+        self.flush()
+        with self.log_lock:
+            self.journal = journal
     
     def log(self, message, level='INFO'):
         """Log message with microsecond timestamp"""
+        if self.ring is not None:
+            self.ring.put((None, None, NO_PRIORITY, message, None, time.monotonic_ns()))
+            return None
+        
         # Use current time in microseconds for demo consistency
         timestamp = int(time.time() * 1_000_000)  # Convert to microseconds
         
         with self.log_lock:
             # If message already has timestamp, use it; otherwise add one
-            if message.startswith('[') and ']' in message:
-                formatted_msg = message
-            else:
-                formatted_msg = f"[{timestamp}] {message}"
-            
-            self.logs.append(formatted_msg)
+            timestamp, kind, detail = self.store.parse_message(message, timestamp)
+            seq = self.store.append(timestamp, kind, detail=detail)
+            if self.journal is not None:
+                self.journal.append(((timestamp, kind, None, NO_PRIORITY, detail),))
+            self.new_events.notify_all()
+        return seq
+    
+    def log_event(self, kind, subject=None, priority=NO_PRIORITY, detail=None, timestamp_us=None):
+        """Log a structured event; text is rendered only when requested"""
+        if self.ring is not None:
+            self.ring.put((kind, subject, priority, detail, timestamp_us,
+                           time.monotonic_ns() if timestamp_us is None else None))
+            return None
+        
+        if timestamp_us is None:
+            timestamp_us = int(time.time() * 1_000_000)
+        
+        with self.log_lock:
+            seq = self.store.append(timestamp_us, kind, subject, priority, detail)
+            if self.journal is not None:
+                self.journal.append(((timestamp_us, kind, subject, priority, detail),))
+            self.new_events.notify_all()
+        return seq
+    
+    def log_events(self, events):
+        """Log many structured events under one lock acquisition.
+        
+        `events` is an iterable of (kind, subject, priority, detail, timestamp_us)
+        tuples; a timestamp_us of None means now. Returns the sequence number
+        of the first one.
+        """
+        if self.ring is not None:
+            put = self.ring.put
+            for kind, subject, priority, detail, timestamp_us in events:
+                put((kind, subject, priority, detail, timestamp_us,
+                     time.monotonic_ns() if timestamp_us is None else None))
+            return None
+        
+        now_us = int(time.time() * 1_000_000)
+        with self.log_lock:
+            first_seq = self.store.next_seq
+            rows = [] if self.journal is not None else None
+            try:
+                for kind, subject, priority, detail, timestamp_us in events:
+                    if timestamp_us is None:
+                        timestamp_us = now_us
+                    self.store.append(timestamp_us, kind, subject, priority, detail)
+                    if rows is not None:
+                        rows.append((timestamp_us, kind, subject, priority, detail))
+            finally:
+                # Events stored before a bad one still reach the journal
+                if rows:
+                    self.journal.append(rows)
+                self.new_events.notify_all()
+        return first_seq
+    
+    def write_records(self, records):
+        """LogRing consumer: store handed-off records, then journal and persist them.
+        
+        The ring calls this with its drain lock held, so batches reach the
+        journal in order even though the file I/O runs outside log_lock.
+        A record the store refuses is dropped and counted on its own; the
+        rest of the batch is stored, journaled and persisted as usual.
+        """
+        clock_offset_ns = self.clock_offset_ns
+        rows = [] if self.journal is not None else None
+        with self.log_lock:
+            store = self.store
+            first_seq = store.next_seq
+            for kind, subject, priority, detail, timestamp_us, monotonic_ns in records:
+                try:
+                    if timestamp_us is None:
+                        timestamp_us = (monotonic_ns + clock_offset_ns) // 1000
+                    if kind is None:
+                        timestamp_us, kind, detail = store.parse_message(detail, timestamp_us)
+                    store.append(timestamp_us, kind, subject, priority, detail)
+                except Exception as e:
+                    self.rejected_records += 1
+                    self.last_rejection = f"{kind!r} {subject!r} priority {priority!r}: {str(e)}"
+                    continue
+                if rows is not None:
+                    rows.append((timestamp_us, kind, subject, priority, detail))
+            self.new_events.notify_all()
+            if self.persist_file is not None:
+                lines = [store.render(seq) for seq in range(max(first_seq, store.first_seq), store.next_seq)]
+        
+        try:
+            if rows:
+                self.journal.append(rows)
+        finally:
+            if self.persist_file is not None and lines:
+                self.persist_file.write('\n'.join(lines) + '\n')
+                self.persist_file.flush()
+    
+    def flush(self):
+        """Store every record handed off so far; returns how many were pending"""
+        if self.ring is None:
+            return 0
+        return self.ring.drain()
+    
+    def run_writer(self, interval_s=0.001):
+        """Background writer loop for deferred mode: drain the ring every interval_s.
+        
+        Draining in batches keeps the writer from contending with logging
+        threads for the GIL on every record; it only skips the sleep while
+        the ring is more than half full.
+        """
+        half_full = self.ring.size // 2
+        while True:
+            try:
+                if self.flush() < half_full:
+                    time.sleep(interval_s)
+            except Exception as e:
+                # Logging the failure through the ring could fail the same way
+                print(f"[ERROR] Log writer failed: {str(e)}")
+                time.sleep(interval_s)
+    
+    def get_writer_statistics(self):
+        """Ring counters in deferred mode; None when logging is synchronous"""
+        if self.ring is None:
+            return None
+        return {
+            **self.ring.get_statistics(),
+            'persist': self.persist_file is not None,
+            'rejected_records': self.rejected_records,
+            'last_rejection': self.last_rejection
+        }
+    
+    def get_version(self):
+        """Sequence number of the next event; changes whenever an event is stored"""
+        self.flush()
+        return self.store.next_seq
     
     def get_logs(self):
         """Get all logs"""
+        self.flush()
+        with self.log_lock:
+            store = self.store
+            return [store.render(seq) for seq in range(store.first_seq, store.next_seq)]
+    
+    def get_logs_since(self, since=None, limit=None, wait_s=0):
+        """Get rendered events after a sequence cursor.
+        
+        With since=None the newest `limit` events are returned. Otherwise
+        events with seq >= since are returned oldest first, at most `limit`
+        of them; if none are available yet, block up to wait_s seconds for
+        new events. The returned next_seq is the cursor for the next call.
+        """
+        self.flush()
+        with self.new_events:
+            store = self.store
+            if since is not None and since > store.next_seq:
+                # Cursor from a previous server run - restart from the tail
+                since = None
+            
+            if since is not None and wait_s > 0 and since >= store.next_seq:
+                self.new_events.wait_for(lambda: store.next_seq > since, timeout=wait_s)
+            
+            if since is None:
+                start = store.first_seq if limit is None else max(store.first_seq, store.next_seq - limit)
+                end = store.next_seq
+                dropped = 0
+            else:
+                start = max(since, store.first_seq)
+                end = store.next_seq if limit is None else min(store.next_seq, start + limit)
+                dropped = start - since
+            
+            return {
+                'events': [store.render(seq) for seq in range(start, end)],
+                'first_seq': start,
+                'next_seq': end,
+                'dropped': dropped
+            }
+    
+    def get_records_since(self, since, limit=None, wait_s=0):
+        """Get raw event tuples after a sequence cursor, for incremental consumers.
+        
+        Like get_logs_since() but nothing is rendered: records are
+        (seq, kind, subject, priority, detail) tuples. Returns
+        (records, next_seq, dropped), where dropped counts events evicted
+        before the consumer saw them.
+        """
+        self.flush()
+        with self.new_events:
+            store = self.store
+            if since > store.next_seq:
+                since = store.next_seq
+            if wait_s > 0 and since >= store.next_seq:
+                self.new_events.wait_for(lambda: store.next_seq > since, timeout=wait_s)
+            
+            start = max(since, store.first_seq)
+            end = store.next_seq if limit is None else min(store.next_seq, start + limit)
+            return [store.fields(seq) for seq in range(start, end)], end, start - since
+    
+    def iter_events(self, since_us=None, until_us=None, kinds=None, subject=None, batch_size=1000):
+        """Yield (seq, timestamp_us, kind, subject, priority, detail) for matching
+        in-memory events, oldest first.
+        
+        The lock is held for one batch at a time, never while the caller
+        consumes events, so a slow export does not stall logging. Events
+        evicted between batches are skipped.
+        """
+        self.flush()
+        cursor = None
+        while True:
+            batch = []
+            with self.log_lock:
+                store = self.store
+                cursor = store.first_seq if cursor is None else max(cursor, store.first_seq)
+                end = min(store.next_seq, cursor + batch_size)
+                for seq in range(cursor, end):
+                    _, kind, name, priority, detail = store.fields(seq)
+                    timestamp_us = store.timestamps[seq % store.capacity]
+                    if since_us is not None and timestamp_us < since_us:
+                        continue
+                    if until_us is not None and timestamp_us > until_us:
+                        continue
+                    if kinds is not None and kind not in kinds:
+                        continue
+                    if subject is not None and name != subject:
+                        continue
+                    batch.append((seq, timestamp_us, kind, name or None, priority, detail))
+                cursor = end
+                done = end == store.next_seq
+            yield from batch
+            if done:
+                return
+    
+    def count_events(self, kind=None, subject=None):
+        """Count events of a kind and/or task/ISR without scanning the log"""
+        self.flush()
+        with self.log_lock:
+            return self.store.count(kind, subject)
+    
+    def query_events(self, kind=None, subject=None, since_us=None, limit=None):
+        """Get structured records matching kind/subject/time filters"""
+        self.flush()
+        with self.log_lock:
+            seqs = self.store.query(kind, subject, since_us, limit)
+            return [self.store.record(seq) for seq in seqs]
+    
+    def search_events(self, kinds=None, subject=None, priority=None, since_us=None, until_us=None,
+                      after_seq=None, limit=100):
+        """One page of structured records matching the filters (see EventStore.search).
+        
+        next_after is the cursor for the following page, or None on the last one.
+        """
+        self.flush()
+        with self.log_lock:
+            store = self.store
+            seqs, more = store.search(kinds, subject, priority, since_us, until_us, after_seq, limit)
+            return {
+                'events': [store.record(seq) for seq in seqs],
+                'next_after': seqs[-1] if more else None,
+                'first_seq': store.first_seq,
+                'next_seq': store.next_seq
+            }
+    
+    def render_events(self, kind=None, subject=None, since_us=None, limit=None):
+        """Get text lines for events matching kind/subject/time filters"""
+        self.flush()
         with self.log_lock:
-            return list(self.logs)
+            seqs = self.store.query(kind, subject, since_us, limit)
+            return [self.store.render(seq) for seq in seqs]
     
     def clear(self):
         """Clear all logs"""
+        self.flush()
         with self.log_lock:
-            self.logs.clear()
+            self.store.clear()
     
     def export_logs(self, filename='event_log.txt'):
         """Export logs to file"""
+        self.flush()
         with self.log_lock:
             with open(filename, 'w') as f:
-                for log in self.logs:
-                    f.write(log + '\n')
+                store = self.store
+                for seq in range(store.first_seq, store.next_seq):
+                    f.write(store.render(seq) + '\n')
         return filename
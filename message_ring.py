@@ -0,0 +1,190 @@
+"""
+Message Ring - ISR-to-Task Message Queues
+Preallocated fixed-slot SPSC ring buffers carrying packed sensor frames
+"""
+
+import struct
+import threading
+
+# Sensor frame layout: present-field mask, speed, temperature, two status strings
+FRAME_FIELDS = ('speed', 'temperature', 'collision_status', 'brake_status')
+FRAME = struct.Struct('<Bdd16s16s')
+STATUS_BYTES = 16
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+def validate_frame(payload):
+    """Raise ValueError unless payload fits the fixed sensor frame"""
+    for field, value in payload.items():
+        if field not in FRAME_FIELDS:
+            raise ValueError(f"Unknown payload field: {field} (expected {', '.join(FRAME_FIELDS)})")
+        if field in ('speed', 'temperature'):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"payload.{field} must be a number")
+        elif not isinstance(value, str) or len(value.encode()) > STATUS_BYTES:
+            raise ValueError(f"payload.{field} must be a string of at most {STATUS_BYTES} bytes")
+
+def pack_frame(buffer, offset, payload):
+    """Pack a payload dict into buffer at offset"""
+    mask = 0
+    for bit, field in enumerate(FRAME_FIELDS):
+        if field in payload:
+            mask |= 1 << bit
+    FRAME.pack_into(
+        buffer, offset, mask,
+        payload.get('speed', 0), payload.get('temperature', 0),
+        payload.get('collision_status', '').encode(), payload.get('brake_status', '').encode()
+    )
+
+def unpack_frame(buffer, offset):
+    """Unpack the frame at offset back into a dict of the fields it carries"""
+    mask, speed, temperature, collision, brake = FRAME.unpack_from(buffer, offset)
+    values = (speed, temperature,
+              collision.rstrip(b'\0').decode(), brake.rstrip(b'\0').decode())
+    return {field: value for bit, (field, value) in enumerate(zip(FRAME_FIELDS, values))
+            if mask & (1 << bit)}
+
+class MessageRing:
+    """Single-producer/single-consumer ring of fixed-size frame slots.
+    
+    Frames are packed straight into one preallocated buffer through a
+    memoryview, so steady-state traffic allocates no per-message storage.
+    The producer only advances `tail` and the consumer only advances
+    `head`; with drop-newest or block no lock is taken on the data path.
+    Drop-oldest lets the producer advance `head` too, so in that mode both
+    sides serialize on `lock`.
+    """
+    
+    def __init__(self, name, slots=64, policy=DROP_OLDEST, block_timeout_s=0.05):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.name = name
+        self.slots = slots
+        self.policy = policy
+        self.block_timeout_s = block_timeout_s
+        self.slot_size = FRAME.size
+        self.buffer = memoryview(bytearray(slots * self.slot_size))
+        self.head = 0
+        self.tail = 0
+        self.lock = threading.Lock()
+        # Conditions are only touched when the other side is actually waiting
+        self.not_empty = threading.Condition()
+        self.not_full = threading.Condition()
+        self.consumer_waiting = False
+        self.producer_waiting = False
+        
+        self.sent = 0
+        self.received = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.blocked = 0
+        self.skipped = 0
+        self.high_watermark = 0
+    
+    def __len__(self):
+        return self.tail - self.head
+    
+    def put(self, payload):
+        """Enqueue a frame; returns False if it was dropped"""
+        if self.tail - self.head >= self.slots:
+            if self.policy == DROP_NEWEST:
+                self.dropped_newest += 1
+                return False
+            if self.policy == BLOCK:
+                self.blocked += 1
+                with self.not_full:
+                    self.producer_waiting = True
+                    has_room = self.not_full.wait_for(lambda: self.tail - self.head < self.slots,
+                                                      self.block_timeout_s)
+                    self.producer_waiting = False
+                if not has_room:
+                    self.dropped_newest += 1
+                    return False
+        
+        if self.policy == DROP_OLDEST:
+            with self.lock:
+                if self.tail - self.head >= self.slots:
+                    self.head += 1
+                    self.dropped_oldest += 1
+                self._write(payload)
+        else:
+            self._write(payload)
+        
+        if self.consumer_waiting:
+            with self.not_empty:
+                self.not_empty.notify()
+        return True
+    
+    def _write(self, payload):
+        pack_frame(self.buffer, (self.tail % self.slots) * self.slot_size, payload)
+        self.tail += 1
+        self.sent += 1
+        self.high_watermark = max(self.high_watermark, self.tail - self.head)
+    
+    def get(self, timeout=0):
+        """Dequeue the oldest frame as a dict, or None if none arrives in time"""
+        if self.tail == self.head and timeout > 0:
+            with self.not_empty:
+                self.consumer_waiting = True
+                self.not_empty.wait_for(lambda: self.tail != self.head, timeout)
+                self.consumer_waiting = False
+        
+        if self.policy == DROP_OLDEST:
+            with self.lock:
+                return self._read()
+        payload = self._read()
+        if payload is not None and self.producer_waiting:
+            with self.not_full:
+                self.not_full.notify()
+        return payload
+    
+    def take(self, seq):
+        """Dequeue the frame with sequence number seq (the count of frames
+        put before it) as a dict.
+        
+        Older frames still queued are discarded as skipped. Returns None if
+        frame seq was dropped or never put.
+        """
+        if self.policy == DROP_OLDEST:
+            with self.lock:
+                return self._take(seq)
+        payload = self._take(seq)
+        if self.producer_waiting:
+            with self.not_full:
+                self.not_full.notify()
+        return payload
+    
+    def _take(self, seq):
+        if seq >= self.tail:
+            return None
+        if seq < self.head:
+            return None
+        self.skipped += seq - self.head
+        self.head = seq
+        return self._read()
+    
+    def _read(self):
+        if self.tail == self.head:
+            return None
+        payload = unpack_frame(self.buffer, (self.head % self.slots) * self.slot_size)
+        self.head += 1
+        self.received += 1
+        return payload
+    
+    def get_statistics(self):
+        return {
+            'policy': self.policy,
+            'slots': self.slots,
+            'slot_bytes': self.slot_size,
+            'depth': self.tail - self.head,
+            'high_watermark': self.high_watermark,
+            'sent': self.sent,
+            'received': self.received,
+            'dropped_oldest': self.dropped_oldest,
+            'dropped_newest': self.dropped_newest,
+            'blocked': self.blocked,
+            'skipped': self.skipped
+        }
@@ -0,0 +1,153 @@
+"""
+Metrics - Incremental Counters
+Fixed-size rate windows for O(1) statistics reporting
+"""
+
+import threading
+import time
+
+class RateWindow:
+    """Sliding event-rate window made of one-second buckets.
+    
+    Events are added to the bucket for the current second; buckets older than
+    the window are recycled in place, so memory and query cost are fixed by
+    the window length rather than by the number of events.
+    """
+    
+    def __init__(self, window_s=60, clock=time.time):
+        self.window_s = window_s
+        self.clock = clock
+        self.counts = [0] * window_s
+        self.seconds = [-1] * window_s
+        self.total = 0
+        self.lock = threading.Lock()
+    
+    def add(self, count=1, now=None):
+        """Record events in the current one-second bucket"""
+        second = int(self.clock() if now is None else now)
+        slot = second % self.window_s
+        
+        with self.lock:
+            if self.seconds[slot] != second:
+                self.seconds[slot] = second
+                self.counts[slot] = 0
+            self.counts[slot] += count
+            self.total += count
+    
+    def rate(self, seconds=None, now=None):
+        """Average events per second over the last `seconds` seconds"""
+        seconds = min(seconds or self.window_s, self.window_s)
+        current = int(self.clock() if now is None else now)
+        oldest = current - seconds + 1
+        
+        with self.lock:
+            events = sum(
+                count for count, second in zip(self.counts, self.seconds)
+                if oldest <= second <= current
+            )
+        return events / seconds
+    
+    def reset(self):
+        """Forget all recorded events"""
+        with self.lock:
+            self.counts = [0] * self.window_s
+            self.seconds = [-1] * self.window_s
+            self.total = 0
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (HDR-style) in integer microseconds.
+    
+    Values below 2**sub_bucket_bits are counted exactly; above that each
+    power-of-two range is split into 2**sub_bucket_bits equal sub-buckets,
+    bounding the relative error (about 6% with the default 4 bits) while
+    keeping memory fixed regardless of how many samples are recorded.
+    """
+    
+    def __init__(self, sub_bucket_bits=4, max_exponent=40):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.counts = [0] * ((max_exponent + 2) << sub_bucket_bits)
+        self.max_value = (1 << (max_exponent + sub_bucket_bits)) - 1
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+    
+    def _index(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits - 1
+        return ((shift + 1) << self.sub_bucket_bits) + (value >> shift) - self.sub_bucket_count
+    
+    def _bucket_bounds(self, index):
+        """Inclusive [low, high] value range of a bucket"""
+        if index < self.sub_bucket_count:
+            return index, index
+        shift = (index >> self.sub_bucket_bits) - 1
+        mantissa = (index & (self.sub_bucket_count - 1)) + self.sub_bucket_count
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+    
+    def record(self, value_us):
+        """Add one sample (negative values clamp to 0)"""
+        value = min(max(int(value_us), 0), self.max_value)
+        with self.lock:
+            self.counts[self._index(value)] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+            self.min = value if self.min is None else min(self.min, value)
+    
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the given percentile"""
+        with self.lock:
+            return self._percentile(percent)
+    
+    def _percentile(self, percent):
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._bucket_bounds(index)[1], self.max)
+        return self.max
+    
+    def count_above(self, value_us):
+        """Samples in buckets wholly above value_us; samples sharing its bucket are not counted"""
+        index = self._index(min(max(int(value_us), 0), self.max_value))
+        with self.lock:
+            return sum(self.counts[index + 1:])
+    
+    def snapshot(self):
+        """Summary statistics: count, min, mean, p50/p90/p99/p99.9, max"""
+        with self.lock:
+            if self.count == 0:
+                return {'count': 0}
+            return {
+                'count': self.count,
+                'min_us': self.min,
+                'mean_us': round(self.total / self.count, 2),
+                'p50_us': self._percentile(50),
+                'p90_us': self._percentile(90),
+                'p99_us': self._percentile(99),
+                'p999_us': self._percentile(99.9),
+                'max_us': self.max
+            }
+    
+    def buckets(self):
+        """Non-empty buckets as [low_us, high_us, count]"""
+        with self.lock:
+            return [
+                [*self._bucket_bounds(index), bucket_count]
+                for index, bucket_count in enumerate(self.counts) if bucket_count
+            ]
+    
+    def reset(self):
+        with self.lock:
+            self.counts = [0] * len(self.counts)
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = 0
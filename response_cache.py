@@ -0,0 +1,103 @@
+"""
+Response Cache - Versioned Responses for Polling Endpoints
+Serialized bodies keyed on state version counters, with ETags and request coalescing
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter
+
+class CachedResponse:
+    """One serialized response body and the state version it was built from"""
+    __slots__ = ('version', 'body', 'etag', 'started_ns')
+    
+    def __init__(self, version, body, etag, started_ns):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.started_ns = started_ns
+
+class ResponseCache:
+    """Caches each endpoint's latest body until its version changes or ttl_s passes.
+    
+    `version` is any comparable value the caller derives cheaply from the
+    state the body depends on (snapshot version, event sequence, metrics
+    counters). The TTL bounds how stale time-dependent fields such as
+    uptime may get while the version stands still.
+    
+    Rebuilds are serialized per endpoint: requests that arrive while a body
+    is being built wait for it and reuse the next body started after they
+    arrived, so N simultaneous clients cost at most two builds however
+    often the state changes.
+    
+    The ETag is a hash of the body, so a rebuild after the TTL that
+    refreshes uptime or rates gets a new ETag even while the version
+    stands still.
+    """
+    
+    def __init__(self, ttl_s=0.5):
+        self.ttl_ns = int(ttl_s * 1e9)
+        self.entries = {}
+        self.build_locks = {}
+        self.lock = threading.Lock()
+        self.counts = {}
+    
+    def count(self, name, outcome):
+        with self.lock:
+            counts = self.counts.get(name)
+            if counts is None:
+                counts = self.counts[name] = Counter()
+            counts[outcome] += 1
+    
+    def build_lock(self, name):
+        lock = self.build_locks.get(name)
+        if lock is None:
+            with self.lock:
+                lock = self.build_locks.setdefault(name, threading.Lock())
+        return lock
+    
+    def is_fresh(self, entry, version, now_ns):
+        return entry is not None and entry.version == version and now_ns - entry.started_ns < self.ttl_ns
+    
+    def get(self, name, version, build):
+        """Return (body, etag) for an endpoint; build() returns the body as bytes"""
+        requested_ns = time.monotonic_ns()
+        entry = self.entries.get(name)
+        if self.is_fresh(entry, version, requested_ns):
+            self.count(name, 'hits')
+            return entry.body, entry.etag
+        
+        with self.build_lock(name):
+            entry = self.entries.get(name)
+            if entry is not None and entry.started_ns >= requested_ns:
+                # Built by a concurrent request while this one waited
+                self.count(name, 'coalesced')
+                return entry.body, entry.etag
+            if self.is_fresh(entry, version, time.monotonic_ns()):
+                self.count(name, 'hits')
+                return entry.body, entry.etag
+            
+            started_ns = time.monotonic_ns()
+            body = build()
+            etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            self.entries[name] = CachedResponse(version, body, etag, started_ns)
+            self.count(name, 'misses')
+            return body, etag
+    
+    def get_statistics(self):
+        """Per-endpoint hits, coalesced waits, rebuilds and 304 answers"""
+        with self.lock:
+            counts = {name: dict(counts) for name, counts in self.counts.items()}
+        stats = {}
+        for name, counts in counts.items():
+            served = counts.get('hits', 0) + counts.get('coalesced', 0)
+            total = served + counts.get('misses', 0)
+            stats[name] = {
+                'hits': counts.get('hits', 0),
+                'coalesced': counts.get('coalesced', 0),
+                'misses': counts.get('misses', 0),
+                'not_modified': counts.get('not_modified', 0),
+                'hit_rate': round(served / total, 4) if total else None
+            }
+        return {'ttl_ms': self.ttl_ns / 1e6, 'endpoints': stats}
@@ -0,0 +1,192 @@
+"""
+RT Mutex - Priority-Inheritance Mutexes
+Task-owned mutexes with contention metrics and a wait-for graph
+"""
+
+import threading
+import time
+from metrics import LatencyHistogram
+
+def base_priority(task):
+    """Priority a task was created with, before any inheritance boost"""
+    if not hasattr(task, 'base_priority'):
+        task.base_priority = task.priority
+    return task.base_priority
+
+class PriorityInheritanceMutex:
+    """Mutex owned by a task rather than a thread.
+    
+    Acquisition is cooperative: acquire() is a generator that yields the
+    mutex itself while another task holds it, so a job running on the
+    scheduler thread can be parked instead of blocking the whole scheduler.
+    While a higher-priority task waits, the owner runs at that task's
+    priority; on release it drops back to the highest priority still owed
+    to it by waiters on other mutexes it holds.
+    """
+    
+    def __init__(self, name, monitor):
+        self.name = name
+        self.monitor = monitor
+        self.condition = threading.Condition()
+        self.owner = None
+        self.waiters = {}  # task -> perf_counter_ns when it started waiting
+        self.acquired_ns = 0
+        
+        self.acquisitions = 0
+        self.contentions = 0
+        self.boosts = 0
+        self.wait_time = LatencyHistogram()
+        self.hold_time = LatencyHistogram()
+    
+    def try_acquire(self, task):
+        """Take the mutex if free; otherwise register task as a waiter"""
+        now_ns = time.perf_counter_ns()
+        with self.condition:
+            if self.owner is task:
+                raise RuntimeError(f"{task.name} already owns {self.name}")
+            if self.owner is None:
+                waited_since = self.waiters.pop(task, None)
+                if waited_since is not None:
+                    self.wait_time.record((now_ns - waited_since) // 1000)
+                self.owner = task
+                self.acquired_ns = now_ns
+                self.acquisitions += 1
+                return True
+            
+            if task not in self.waiters:
+                self.waiters[task] = now_ns
+                self.contentions += 1
+            owner = self.owner
+        
+        if task.priority > owner.priority:
+            # Priority inheritance: the owner runs at the waiter's priority
+            base_priority(owner)
+            owner.priority = task.priority
+            self.boosts += 1
+        return False
+    
+    def acquire(self, task):
+        """Generator: yields this mutex until task owns it.
+        
+        If the generator is closed while waiting (job aborted, demoted or
+        shut down), the task stops being a waiter.
+        """
+        owned = False
+        try:
+            while not self.try_acquire(task):
+                yield self
+            owned = True
+        finally:
+            if not owned:
+                self.withdraw(task)
+    
+    def withdraw(self, task):
+        """Stop task waiting and drop the priority its wait lent the owner"""
+        with self.condition:
+            if self.waiters.pop(task, None) is None:
+                return
+            owner = self.owner
+        if owner is not None:
+            owner.priority = max([base_priority(owner)] + self.monitor.owed_priorities(owner))
+    
+    def release(self, task):
+        """Give up ownership, restore the owner's priority and wake waiters"""
+        with self.condition:
+            if self.owner is not task:
+                raise RuntimeError(f"{task.name} released {self.name} without owning it")
+            self.owner = None
+            self.hold_time.record((time.perf_counter_ns() - self.acquired_ns) // 1000)
+            self.condition.notify_all()
+        
+        task.priority = max([base_priority(task)] + self.monitor.owed_priorities(task))
+        self.monitor.notify_release(self)
+    
+    def wait_until_free(self, timeout=None):
+        """Block the calling thread until the mutex has no owner"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.owner is None, timeout)
+    
+    def get_statistics(self):
+        with self.condition:
+            owner = self.owner.name if self.owner else None
+            waiters = [task.name for task in self.waiters]
+        return {
+            'owner': owner,
+            'waiters': waiters,
+            'acquisitions': self.acquisitions,
+            'contentions': self.contentions,
+            'priority_boosts': self.boosts,
+            'wait_time': self.wait_time.snapshot(),
+            'hold_time': self.hold_time.snapshot()
+        }
+
+class LockMonitor:
+    """Registry of mutexes that derives the task wait-for graph"""
+    
+    def __init__(self):
+        self.mutexes = {}
+        self.release_listeners = []
+    
+    def create(self, name):
+        mutex = PriorityInheritanceMutex(name, self)
+        self.mutexes[name] = mutex
+        return mutex
+    
+    def add_release_listener(self, callback):
+        """Register a callback invoked with a mutex after every release"""
+        self.release_listeners.append(callback)
+    
+    def notify_release(self, mutex):
+        for callback in self.release_listeners:
+            callback(mutex)
+    
+    def owed_priorities(self, task):
+        """Priorities of tasks waiting on mutexes that `task` still owns"""
+        owed = []
+        for mutex in self.mutexes.values():
+            with mutex.condition:
+                if mutex.owner is task:
+                    owed.extend(waiter.priority for waiter in mutex.waiters)
+        return owed
+    
+    def wait_for_graph(self):
+        """Edges waiter -> owner, by task name"""
+        graph = {}
+        for mutex in self.mutexes.values():
+            with mutex.condition:
+                if mutex.owner is None:
+                    continue
+                for waiter in mutex.waiters:
+                    graph.setdefault(waiter.name, set()).add(mutex.owner.name)
+        return {waiter: sorted(owners) for waiter, owners in graph.items()}
+    
+    def find_cycle(self):
+        """A deadlock cycle in the wait-for graph as a list of task names, or None"""
+        graph = self.wait_for_graph()
+        visiting, done = set(), set()
+        path = []
+        
+        def visit(node):
+            visiting.add(node)
+            path.append(node)
+            for owner in graph.get(node, ()):
+                if owner in visiting:
+                    return path[path.index(owner):] + [owner]
+                if owner not in done:
+                    cycle = visit(owner)
+                    if cycle:
+                        return cycle
+            visiting.discard(node)
+            done.add(node)
+            path.pop()
+            return None
+        
+        for node in graph:
+            if node not in done:
+                cycle = visit(node)
+                if cycle:
+                    return cycle
+        return None
+    
+    def get_statistics(self):
+        return {name: mutex.get_statistics() for name, mutex in self.mutexes.items()}
@@ -3,55 +3,195 @@ RTOS Simulator - Fixed Version
 Fixed Preemption, Context Switching, and Timing
 """
 
+import heapq
+import itertools
 import threading
 import time
-import queue
+from event_store import EventKind
+from metrics import LatencyHistogram
+from scheduling_policy import FixedPriorityPolicy
+from task_registry import BUILTIN_TASKS
 from tasks.brake_task import BrakeTask
 from tasks.collision_task import CollisionTask
 from tasks.speed_task import SpeedTask
 
+class TaskJob:
+    """One release of a task: its step generator, measured times and demo log timing.
+    
+    release_ns is the perf_counter_ns() of the interrupt that released the
+    job and message_seq the sequence number of the message that interrupt
+    posted to the task's queue (None if it carried no payload). steps stays
+    None until the scheduler first dispatches it. The deadline watchdog sets
+    `overrun` when the job outlives its deadline and `aborted` to have the scheduler drop it at its next preemption point.
+    """
+    __slots__ = ('task', 'seq', 'release_ns', 'steps', 'exec_ns',
+                 'start_timestamp', 'duration_us', 'deadline_timer', 'overrun', 'aborted',
+                 'message_seq')
+    
+    def __init__(self, task, seq, release_ns, message_seq=None):
+        self.task = task
+        self.seq = seq
+        self.release_ns = release_ns
+        self.message_seq = message_seq
+        self.steps = None
+        self.exec_ns = 0
+        self.start_timestamp = None
+        self.duration_us = 0
+        self.deadline_timer = None
+        self.overrun = False
+        self.aborted = False
+
 class RTOSSimulator:
     def __init__(self, logger, shared_resources, interrupt_controller):
         self.logger = logger
         self.shared_resources = shared_resources
         self.interrupt_controller = interrupt_controller
         
-        self.task_queue = queue.PriorityQueue()
+        # Ready queue: heap of (key, seq, timestamp_us, task, signal_ns, job), where key
+        # comes from the scheduling policy; signal_ns is set only for a fresh release
+        self.policy = FixedPriorityPolicy()
+        self.ready_queue = []
+        self.ready_condition = threading.Condition()
+        self.ready_seq = itertools.count()
+        self.dispatch_latency = LatencyHistogram()
+        self.preemption_latency = LatencyHistogram()
         self.running_task = None
         self.preempted_task = None  # FIX: Track preempted task
-        self.task_stack = []  # FIX: Stack for context preservation
+        self.preemption_count = 0
+        self.last_end_timestamp = None
+        self.parked_jobs = {}  # mutex -> jobs waiting for it, guarded by ready_condition
+        self.job_release_listeners = []
+        self.completion_listeners = []
+        self.abort_listeners = []
         
-        self.tasks = {
-            "BrakeTask": BrakeTask(logger, shared_resources),
-            "CollisionTask": CollisionTask(logger, shared_resources),
-            "SpeedTask": SpeedTask(logger, shared_resources)
-        }
+        # Built-in tasks take their timing parameters from their registry specs
+        self.tasks = {}
+        task_classes = {"BrakeTask": BrakeTask, "CollisionTask": CollisionTask, "SpeedTask": SpeedTask}
+        for spec in BUILTIN_TASKS:
+            task = task_classes[spec.name](logger, shared_resources)
+            task.spec = spec
+            task.priority = spec.priority
+            task.wcet_us = spec.wcet_us
+            self.tasks[spec.name] = task
         
         self.interrupt_controller.set_rtos(self)
+        self.shared_resources.lock_monitor.add_release_listener(self.wake_waiters)
         
         self.cpu_usage = 0
         self.total_execution_time = 0
         self.start_time = time.time()
         self.task_count = 0
-        self.ready_count = 0
-        self.blocked_count = 0
+        
+        # Incremental task-state tallies, kept in step with every transition
+        self.state_lock = threading.Lock()
+        self.state_counts = {"READY": 0, "RUNNING": 0, "BLOCKED": 0, "WAITING": 0}
+        for task in self.tasks.values():
+            self.state_counts[task.state] += 1
+        self.completed_count = 0
         
         # FIX: Preemption control
         self.preemption_enabled = True
         self.scheduler_lock = threading.Lock()
-        self.task_semaphore = threading.Semaphore(0)
         
-    def signal_task(self, task_name):
-        """Signal a task to enter the ready queue"""
+    def add_task(self, task):
+        """Add a task to the scheduler; it starts BLOCKED until signalled"""
+        with self.state_lock:
+            self.tasks[task.name] = task
+            self.state_counts[task.state] += 1
+    
+    def signal_task(self, task_name, release_ns=None, message_seq=None):
+        """Signal a task to enter the ready queue.
+        
+        release_ns is the perf_counter_ns() of the interrupt behind the
+        signal; response times are measured from it (default: now).
+        message_seq is the sequence number of the message that interrupt
+        posted for the task; only a job that has one reads its queue.
+        """
         if task_name not in self.tasks:
             return
         
         task = self.tasks[task_name]
-        task.state = "READY"
-        self.ready_count += 1
+        self.set_task_state(task, "READY")
+        
+        signal_ns = time.perf_counter_ns()
+        job = TaskJob(task, next(self.ready_seq), release_ns or signal_ns, message_seq)
+        for callback in self.job_release_listeners:
+            callback(job)
+        self.enqueue_task(job, int(time.time_ns() // 1000), signal_ns)
+    
+    def enqueue_task(self, job, timestamp_us, signal_ns=None):
+        """Push a job onto the ready queue and wake the scheduler.
         
-        self.task_queue.put((-task.priority, int(time.time_ns() // 1000), task))
-        self.task_semaphore.release()  # FIX: Signal scheduler
+        signal_ns marks when the task was signalled; only those entries are
+        counted in the latency histograms. A suspended job keeps the sequence
+        number of its original release, so it resumes ahead of any later
+        release of the same priority.
+        """
+        task = job.task
+        with self.ready_condition:
+            heapq.heappush(self.ready_queue,
+                           (self.job_key(job), job.seq, timestamp_us, task, signal_ns, job))
+            self.ready_condition.notify()
+    
+    def job_key(self, job):
+        """Ready-queue sort key of a job under the current policy"""
+        return self.policy.key(job.task, job.release_ns // 1000)
+    
+    def set_scheduling_policy(self, policy):
+        """Switch scheduling policy and re-key every ready job"""
+        with self.ready_condition:
+            self.policy = policy
+            self.ready_queue = [(self.job_key(entry[5]),) + entry[1:] for entry in self.ready_queue]
+            heapq.heapify(self.ready_queue)
+            self.ready_condition.notify()
+    
+    def add_job_release_listener(self, callback):
+        """Register callback(job) run when signal_task() releases a new job"""
+        self.job_release_listeners.append(callback)
+    
+    def add_completion_listener(self, callback):
+        """Register callback(job, release_us, end_us, execution_us) run after every job.
+        
+        end_us is the job's TASK_END log timestamp and release_us lies the
+        measured interrupt-to-completion response time before it.
+        """
+        self.completion_listeners.append(callback)
+    
+    def add_abort_listener(self, callback):
+        """Register callback(job) run after a job is aborted instead of completing"""
+        self.abort_listeners.append(callback)
+    
+    def preempting_entry(self, job):
+        """Head of the ready queue if the policy ranks it ahead of the running job"""
+        running_key = self.job_key(job)
+        with self.ready_condition:
+            if self.ready_queue and self.ready_queue[0][0] < running_key:
+                return self.ready_queue[0]
+        return None
+    
+    def next_ready(self, timeout=None):
+        """Block until a task is ready and pop the highest-priority one"""
+        with self.ready_condition:
+            if not self.ready_condition.wait_for(lambda: self.ready_queue, timeout):
+                return None
+            return heapq.heappop(self.ready_queue)
+    
+    def get_latency_histograms(self):
+        """Dispatch and preemption latency summaries with histogram buckets"""
+        return {
+            name: {'summary': histogram.snapshot(), 'buckets': histogram.buckets()}
+            for name, histogram in (('dispatch', self.dispatch_latency),
+                                    ('preemption', self.preemption_latency))
+        }
+    
+    def set_task_state(self, task, state):
+        """Move a task to a new state and update the state tallies"""
+        with self.state_lock:
+            self.state_counts[task.state] -= 1
+            self.state_counts[state] += 1
+            task.state = state
+            if state == "BLOCKED":
+                self.completed_count += 1
     
     def get_current_task(self):
         """Get the name of the currently running task"""
@@ -68,103 +208,190 @@ class RTOSSimulator:
     
     def get_statistics(self):
         """Get RTOS statistics"""
-        total = len(self.tasks)
-        running = 1 if self.running_task else 0
-        ready = sum(1 for t in self.tasks.values() if t.state == "READY")
-        blocked = sum(1 for t in self.tasks.values() if t.state == "BLOCKED")
+        with self.state_lock:
+            counts = dict(self.state_counts)
+            completed = self.completed_count
         
         return {
-            'total_tasks': total,
-            'running_tasks': running,
-            'ready_tasks': ready,
-            'blocked_tasks': blocked,
+            'total_tasks': len(self.tasks),
+            'running_tasks': counts["RUNNING"],
+            'ready_tasks': counts["READY"],
+            'blocked_tasks': counts["BLOCKED"],
+            'waiting_tasks': counts["WAITING"],
+            'completed_jobs': completed,
+            'preemptions': self.preemption_count,
             'cpu_usage': self.get_cpu_usage()
         }
     
     def run_scheduler(self):
         """Main RTOS scheduler loop - Demo format logging"""
         timestamp = int(time.time() * 1_000_000)
-        self.logger.log(f"[{timestamp}] SCHEDULER_START: RTOS Scheduler initialized")
+        self.logger.log_event(EventKind.SCHEDULER_START, detail="RTOS Scheduler initialized", timestamp_us=timestamp)
         
         while True:
             try:
-                # Wait for task to be ready
-                self.task_semaphore.acquire(timeout=0.01)
+                # Sleep on the condition until signal_task() makes a task ready
+                entry = self.next_ready()
+                if entry is None:
+                    continue
                 
-                if not self.task_queue.empty():
-                    with self.scheduler_lock:
-                        try:
-                            _, timestamp, task = self.task_queue.get_nowait()
-                            
-                            # Proper preemption handling
-                            if self.running_task and self.preemption_enabled:
-                                if self.running_task.priority < task.priority:
-                                    # Higher priority task arrived - preempt
-                                    preempt_timestamp = int(time.time() * 1_000_000)
-                                    self.logger.log(
-                                        f"[{preempt_timestamp}] TASK_PREEMPT: {self.running_task.name} "
-                                        f"preempted by {task.name}"
-                                    )
-                                    
-                                    # Save preempted task context
-                                    self.preempted_task = self.running_task
-                                    self.task_stack.append({
-                                        'task': self.running_task,
-                                        'timestamp': preempt_timestamp,
-                                        'state': self.running_task.state
-                                    })
-                                    
-                                    self.running_task.state = "READY"
-                                    # Re-queue preempted task
-                                    self.task_queue.put((-self.running_task.priority, preempt_timestamp, self.running_task))
-                            
-                            # Execute task with demo timing
-                            self.running_task = task
-                            task.state = "RUNNING"
-                            
-                            start_exec = time.perf_counter()
-                            # Generate sequential timestamps with different timing per task type
-                            if task.name == "BrakeTask":
-                                # Brake: Fast execution (1 second)
-                                task_start_timestamp = timestamp + (1 * 1_000_000)  # Start 1 second after ISR exit
-                                task_duration = 2 * 1_000_000  # 2 seconds execution
-                            elif task.name == "CollisionTask":
-                                # Collision: Medium execution (2 seconds)
-                                task_start_timestamp = timestamp + (1 * 1_000_000)  # Start 1 second after ISR exit
-                                task_duration = 3 * 1_000_000  # 3 seconds execution
-                            else:  # SpeedTask
-                                # Speed: Slower execution (3 seconds)
-                                task_start_timestamp = timestamp + (2 * 1_000_000)  # Start 2 seconds after ISR exit
-                                task_duration = 4 * 1_000_000  # 4 seconds execution
-                            
-                            self.logger.log(f"[{task_start_timestamp}] TASK_START: {task.name} - Priority: {task.priority}")
-                            
-                            # Execute task
-                            task.run()
-                            
-                            exec_time = time.perf_counter() - start_exec
-                            self.total_execution_time += exec_time
-                            
-                            # Calculate end timestamp based on task type
-                            task_end_timestamp = task_start_timestamp + task_duration
-                            self.logger.log(f"[{task_end_timestamp}] TASK_END: {task.name}")
-                            
-                            task.state = "BLOCKED"
-                            self.running_task = None
-                            self.ready_count = max(0, self.ready_count - 1)
-                            
-                            # Resume preempted task if exists
-                            if self.task_stack:
-                                preempted_info = self.task_stack.pop()
-                                preempted_task = preempted_info['task']
-                                resume_timestamp = task_end_timestamp + 1
-                                self.logger.log(f"[{resume_timestamp}] TASK_RESUME: {preempted_task.name}")
-                                preempted_task.state = "READY"
-                                self.task_queue.put((-preempted_task.priority, resume_timestamp, preempted_task))
-                                
-                        except queue.Empty:
-                            pass
+                with self.scheduler_lock:
+                    self.dispatch(entry)
             except Exception as e:
                 error_timestamp = int(time.time() * 1_000_000)
-                self.logger.log(f"[{error_timestamp}] SCHEDULER_ERROR: {str(e)}")
+                self.logger.log_event(EventKind.SCHEDULER_ERROR, detail=str(e), timestamp_us=error_timestamp)
                 time.sleep(0.001)
+    
+    def dispatch(self, entry):
+        """Start or resume one job and run it until it completes or is preempted"""
+        _, _, timestamp, task, signal_ns, job = entry
+        if job.aborted:
+            self.abort(job)
+            return
+        self.running_task = task
+        self.set_task_state(task, "RUNNING")
+        
+        if job.steps is None:
+            self.start_job(job, timestamp)
+            if signal_ns is not None:
+                self.dispatch_latency.record((time.perf_counter_ns() - signal_ns) // 1000)
+        else:
+            if self.last_end_timestamp is not None:
+                resume_timestamp = self.last_end_timestamp + 1
+            else:
+                resume_timestamp = int(time.time() * 1_000_000)
+            self.logger.log_event(EventKind.TASK_RESUME, task.name, task.priority,
+                                  timestamp_us=resume_timestamp)
+        
+        # Run the job step by step, checking for a higher-priority arrival
+        # at every preemption point the task yields
+        start_ns = time.perf_counter_ns()
+        try:
+            for blocker in job.steps:
+                if job.aborted:
+                    self.abort(job)
+                    return
+                if blocker is not None:
+                    self.park(job, blocker)
+                    return
+                if not self.preemption_enabled:
+                    continue
+                preemptor = self.preempting_entry(job)
+                if preemptor is not None:
+                    self.preempt(job, preemptor)
+                    return
+        finally:
+            end_ns = time.perf_counter_ns()
+            job.exec_ns += end_ns - start_ns
+            self.total_execution_time += (end_ns - start_ns) / 1_000_000_000
+        
+        task_end_timestamp = job.start_timestamp + job.duration_us
+        self.logger.log_event(EventKind.TASK_END, task.name, task.priority,
+                              timestamp_us=task_end_timestamp)
+        self.last_end_timestamp = task_end_timestamp
+        
+        self.set_task_state(task, "BLOCKED")
+        self.running_task = None
+        
+        response_us = (end_ns - job.release_ns) // 1000
+        for callback in self.completion_listeners:
+            callback(job, task_end_timestamp - response_us, task_end_timestamp,
+                     job.exec_ns // 1000)
+    
+    def start_job(self, job, timestamp):
+        """Log TASK_START for a fresh release and create its step generator"""
+        task = job.task
+        # Log timestamps follow the demo timeline declared in the task spec
+        task_start_timestamp = timestamp + task.spec.log_offset_us
+        task_duration = task.spec.log_duration_us
+        
+        self.logger.log_event(EventKind.TASK_START, task.name, task.priority,
+                              timestamp_us=task_start_timestamp)
+        job.start_timestamp = task_start_timestamp
+        job.duration_us = task_duration
+        job.steps = task.steps(job.message_seq)
+    
+    def abort_job(self, job):
+        """Ask the scheduler to drop a job; it stops at its next preemption point"""
+        job.aborted = True
+    
+    def abort(self, job):
+        """Discard an aborted job, unwinding its generator so held mutexes are released"""
+        task = job.task
+        if job.steps is not None:
+            job.steps.close()
+        self.logger.log_event(EventKind.TASK_ABORT, task.name, task.priority,
+                              detail="deadline watchdog")
+        self.set_task_state(task, "BLOCKED")
+        self.running_task = None
+        for callback in self.abort_listeners:
+            callback(job)
+    
+    def set_base_priority(self, task, priority):
+        """Change a task's base priority, keeping any priority it has inherited"""
+        task.base_priority = priority
+        task.priority = max([priority] + self.shared_resources.lock_monitor.owed_priorities(task))
+        self.logger.log_event(EventKind.PRIORITY_CHANGE, task.name, task.priority,
+                              detail=f"base {priority}")
+        self.reprioritize(task)
+    
+    def park(self, job, mutex):
+        """Take a job blocked on a mutex off the CPU until the mutex is released"""
+        task = job.task
+        self.logger.log_event(EventKind.TASK_BLOCK, task.name, task.priority, detail=mutex.name)
+        self.set_task_state(task, "WAITING")
+        self.running_task = None
+        with self.ready_condition:
+            if mutex.owner is None:
+                # Released between the failed acquire and now: retry at once
+                self.set_task_state(task, "READY")
+                heapq.heappush(self.ready_queue,
+                               (self.job_key(job), job.seq, int(time.time() * 1_000_000), task, None, job))
+                self.ready_condition.notify()
+                return
+            self.parked_jobs.setdefault(mutex, []).append(job)
+        
+        # The owner may have inherited a higher priority; re-key its queue entry
+        self.reprioritize(mutex.owner)
+    
+    def wake_waiters(self, mutex):
+        """LockMonitor listener: make jobs parked on a released mutex ready again"""
+        with self.ready_condition:
+            jobs = self.parked_jobs.pop(mutex, [])
+            timestamp = int(time.time() * 1_000_000)
+            for job in jobs:
+                self.set_task_state(job.task, "READY")
+                heapq.heappush(self.ready_queue,
+                               (self.job_key(job), job.seq, timestamp, job.task, None, job))
+            if jobs:
+                self.ready_condition.notify()
+    
+    def reprioritize(self, task):
+        """Re-key ready-queue entries of a task whose priority changed"""
+        if task is None:
+            return
+        with self.ready_condition:
+            self.ready_queue = [
+                (self.job_key(entry[5]),) + entry[1:] if entry[3] is task else entry
+                for entry in self.ready_queue
+            ]
+            heapq.heapify(self.ready_queue)
+    
+    def preempt(self, job, preemptor):
+        """Suspend a running job in favour of a higher-priority ready task"""
+        task = job.task
+        preempt_timestamp = int(time.time() * 1_000_000)
+        preemptor_task, preemptor_signal_ns = preemptor[3], preemptor[4]
+        if preemptor_signal_ns is not None:
+            self.preemption_latency.record((time.perf_counter_ns() - preemptor_signal_ns) // 1000)
+        
+        self.logger.log_event(EventKind.TASK_PREEMPT, task.name, task.priority,
+                              preemptor_task.name, preempt_timestamp)
+        self.preempted_task = task
+        self.preemption_count += 1
+        
+        # The suspended generator is the saved context; it goes back on the
+        # ready queue and continues from its last preemption point
+        self.set_task_state(task, "READY")
+        self.running_task = None
+        self.enqueue_task(job, preempt_timestamp)
@@ -3,30 +3,142 @@ Real-Time Vehicle Sensor Management System
 Complete RTOS Simulator with All Fixes
 """
 
+import math
 import threading
 import time
 from flask import Flask, render_template, jsonify, request
-from interrupt_controller import InterruptController
+from interrupt_controller import InterruptController, InterruptQueueFull
 from rtos_simulator import RTOSSimulator
 from logger import Logger
+from event_journal import EventJournal
+from log_export import EXPORT_FORMATS, export_chunks, parse_kinds
 from shared_resources import SharedResources
 from verifier import Verifier
 from deadline_monitor import DeadlineMonitor
 from task_analyzer import TaskAnalyzer
+from event_stream import Broadcaster
+from sensor_history import SensorHistory
+from sim_engine import create_virtual_system, compare_policies
+from scheduling_policy import SCHEDULING_POLICIES, create_policy
+from task_registry import TaskRegistry
+from schedulability import SchedulabilityAnalyzer
+from trace_verifier import TraceVerifier
+from response_cache import ResponseCache
+from timing import default_waiter
+
+# Interrupts allowed to wait for the dispatch thread before triggers get 429
+MAX_PENDING_INTERRUPTS = 1000
+
+# Slots per ISR -> task message queue and what to do when one is full
+# ('drop_oldest', 'drop_newest' or 'block')
+MESSAGE_QUEUE_SLOTS = 64
+MESSAGE_QUEUE_POLICY = 'drop_oldest'
+
+# Samples retained per sensor signal and buckets per /api/sensor-history query
+SENSOR_HISTORY_CAPACITY = 50000
+MAX_HISTORY_BUCKETS = 1000
+
+# What the deadline watchdog does when a job overruns: 'log', 'abort' or 'demote'
+DEADLINE_OVERRUN_POLICY = 'log'
+
+# Ready-queue ordering: 'fixed_priority', 'edf' or 'rate_monotonic'
+SCHEDULING_POLICY = 'fixed_priority'
+
+# JSON list of extra task specs to register at startup (see tasks.example.json)
+TASK_CONFIG_FILE = None
+
+# Events kept in memory for /api/event-log and /api/events/query; queries stay
+# indexed, so this can be raised to millions for long captures
+EVENT_LOG_CAPACITY = 10000
+
+# Hand log records to a background writer instead of storing them inline,
+# optionally appending each rendered line to LOG_PERSIST_FILE
+DEFERRED_LOGGING = True
+LOG_RING_SLOTS = 65536
+LOG_PERSIST_FILE = None
+
+# On-disk binary journal of every event (None disables it), opened by
+# start_journal() when the server starts; segments rotate at
+# JOURNAL_SEGMENT_BYTES and the oldest beyond JOURNAL_MAX_SEGMENTS are deleted
+JOURNAL_DIR = 'event_journal'
+JOURNAL_SEGMENT_BYTES = 8 * 1024 * 1024
+JOURNAL_MAX_SEGMENTS = 16
+
+# Dashboard polling endpoints reuse their last JSON body while the state it
+# was built from is unchanged, for at most this long
+RESPONSE_CACHE_TTL_S = 0.5
 
 # Global instances
 app = Flask(__name__)
-logger = Logger()
-shared_resources = SharedResources(logger)
-interrupt_controller = InterruptController(logger)
+journal = None
+logger = Logger(max_logs=EVENT_LOG_CAPACITY, deferred=DEFERRED_LOGGING, ring_slots=LOG_RING_SLOTS,
+                persist_path=LOG_PERSIST_FILE)
+shared_resources = SharedResources(logger, queue_slots=MESSAGE_QUEUE_SLOTS, queue_policy=MESSAGE_QUEUE_POLICY)
+interrupt_controller = InterruptController(logger, max_pending=MAX_PENDING_INTERRUPTS)
 rtos_simulator = RTOSSimulator(logger, shared_resources, interrupt_controller)
-deadline_monitor = DeadlineMonitor(logger, rtos_simulator)
+deadline_monitor = DeadlineMonitor(logger, rtos_simulator, policy=DEADLINE_OVERRUN_POLICY)
+task_registry = TaskRegistry(logger, rtos_simulator, interrupt_controller, deadline_monitor)
+if TASK_CONFIG_FILE:
+    task_registry.load_file(TASK_CONFIG_FILE)
+rtos_simulator.set_scheduling_policy(
+    create_policy(SCHEDULING_POLICY, deadline_monitor.deadlines, task_registry.periods))
 task_analyzer = TaskAnalyzer(logger, rtos_simulator)
-verifier = Verifier(logger, rtos_simulator, deadline_monitor)
+schedulability_analyzer = SchedulabilityAnalyzer(InterruptController.ISR_DURATION_US)
+trace_verifier = TraceVerifier(logger, rtos_simulator, interrupt_controller)
+verifier = Verifier(logger, rtos_simulator, deadline_monitor, schedulability_analyzer, trace_verifier,
+                    task_analyzer)
+broadcaster = Broadcaster(logger, shared_resources, stats_provider=lambda: build_system_stats())
+sensor_history = SensorHistory(capacity=SENSOR_HISTORY_CAPACITY)
+shared_resources.add_listener(sensor_history.record_snapshot)
+response_cache = ResponseCache(ttl_s=RESPONSE_CACHE_TTL_S)
+
+# Upper bound for /api/event-log long-poll waits
+MAX_LONG_POLL_MS = 30000
+
+# Default and upper bound for events in one /api/events/query page
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 1000
+
+# Upper bound for a single /api/simulate run (simulated seconds)
+MAX_SIMULATED_SECONDS = 24 * 3600
+# Upper bound for a simulated sensor's Poisson interrupt rate (Hz)
+MAX_SIMULATED_RATE_HZ = 1000
+
+# Upper bound for records in one /api/trigger-batch request
+MAX_BATCH_RECORDS = 10000
 
 # Background threads
+log_writer_thread = None
+dispatcher_thread = None
 scheduler_thread = None
 monitor_thread = None
+stream_thread = None
+release_thread = None
+trace_thread = None
+
+def start_journal():
+    """Open the on-disk event journal and start appending every event to it"""
+    global journal
+    if JOURNAL_DIR and journal is None:
+        journal = EventJournal(JOURNAL_DIR, segment_bytes=JOURNAL_SEGMENT_BYTES,
+                               max_segments=JOURNAL_MAX_SEGMENTS)
+        logger.set_journal(journal)
+
+def start_log_writer():
+    """Start the thread that stores and persists deferred log records"""
+    global log_writer_thread
+    if logger.ring is None:
+        return
+    log_writer_thread = threading.Thread(target=logger.run_writer, daemon=True)
+    log_writer_thread.start()
+    logger.log("[SYSTEM] Log writer started")
+
+def start_dispatcher():
+    """Start interrupt dispatch thread; HTTP handlers only enqueue interrupts"""
+    global dispatcher_thread
+    dispatcher_thread = threading.Thread(target=interrupt_controller.run_dispatcher, daemon=True)
+    dispatcher_thread.start()
+    logger.log("[SYSTEM] Interrupt dispatcher started")
 
 def start_scheduler():
     """Start RTOS scheduler in background thread"""
@@ -42,6 +154,27 @@ def start_monitor():
     monitor_thread.start()
     logger.log("[SYSTEM] Deadline Monitor started")
 
+def start_releases():
+    """Start the single timer thread that releases every periodic task"""
+    global release_thread
+    release_thread = threading.Thread(target=task_registry.run_releases, daemon=True)
+    release_thread.start()
+    logger.log("[SYSTEM] Periodic release timer started")
+
+def start_trace_verifier():
+    """Start the thread that checks the event trace as it is logged"""
+    global trace_thread
+    trace_thread = threading.Thread(target=trace_verifier.run, daemon=True)
+    trace_thread.start()
+    logger.log("[SYSTEM] Trace verifier started")
+
+def start_stream():
+    """Start event stream broadcaster in background thread"""
+    global stream_thread
+    stream_thread = threading.Thread(target=broadcaster.run, daemon=True)
+    stream_thread.start()
+    logger.log("[SYSTEM] Event stream broadcaster started")
+
 @app.route('/')
 def dashboard():
     """Serve dashboard HTML"""
@@ -56,8 +189,7 @@ def ppt_presentation():
 def trigger_sensor(sensor_name):
     """Trigger sensor interrupt"""
     try:
-        valid_sensors = ['Brake', 'Collision', 'Speed']
-        if sensor_name not in valid_sensors:
+        if sensor_name not in interrupt_controller.interrupt_map:
             return jsonify({'status': 'error', 'message': f'Unknown sensor: {sensor_name}'}), 400
         
         result = interrupt_controller.trigger_interrupt(sensor_name)
@@ -67,97 +199,345 @@ def trigger_sensor(sensor_name):
             'message': f'{sensor_name} interrupt triggered',
             'result': result
         })
+    except InterruptQueueFull as e:
+        return jsonify({'status': 'busy', 'message': str(e)}), 429, {'Retry-After': '1'}
     except Exception as e:
         logger.log(f"[ERROR] Sensor trigger failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/trigger-batch', methods=['POST'])
+def trigger_batch():
+    """Trigger interrupts for an array of {sensor, timestamp, payload} records"""
+    try:
+        params = request.get_json(silent=True)
+        records = params.get('records') if isinstance(params, dict) else params
+        if not isinstance(records, list):
+            return jsonify({'status': 'error', 'message': 'Expected a JSON array of records'}), 400
+        if len(records) > MAX_BATCH_RECORDS:
+            return jsonify({'status': 'error',
+                            'message': f'At most {MAX_BATCH_RECORDS} records per batch'}), 400
+        
+        results = interrupt_controller.trigger_batch(records)
+        accepted = sum(1 for result in results if result['status'] == 'queued')
+        busy = sum(1 for result in results if result['status'] == 'busy')
+        
+        response = jsonify({
+            'status': 'busy' if busy else 'success',
+            'accepted': accepted,
+            'rejected': len(results) - accepted,
+            'results': results
+        })
+        if busy:
+            # Back-pressure: the client should retry the 'busy' records later
+            return response, 429, {'Retry-After': '1'}
+        return response
+    except Exception as e:
+        logger.log(f"[ERROR] Batch trigger failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def cached_json(name, version, build, not_modified=False):
+    """Serve build()'s JSON through the response cache.
+    
+    The body carries an ETag; a request whose If-None-Match matches it
+    gets 304 with no body. not_modified=True answers 304 with the same
+    headers, for callers that already know the client is current.
+    """
+    body, etag = response_cache.get(name, version, lambda: f"{app.json.dumps(build())}\n".encode('utf-8'))
+    if not_modified:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    if not not_modified:
+        response = response.make_conditional(request)
+    if response.status_code == 304:
+        response_cache.count(name, 'not_modified')
+    return response
+
+def build_sensor_data():
+    """Sensor snapshot plus the scheduler's current task and CPU usage"""
+    snapshot = shared_resources.snapshot()
+    data = snapshot.data
+    return {
+        'speed': data.get('speed', 0),
+        'temperature': data.get('temperature', 0),
+        'collision_status': data.get('collision_status', 'Clear'),
+        'brake_status': data.get('brake_status', 'Off'),
+        'active_task': rtos_simulator.get_current_task(),
+        'cpu_usage': rtos_simulator.get_cpu_usage(),
+        'version': snapshot.version,
+        'timestamp': int(time.time_ns() // 1000)
+    }
+
 @app.route('/api/sensor-data', methods=['GET'])
 def get_sensor_data():
-    """Get current sensor data and system status"""
+    """Get current sensor data and system status.
+    
+    With ?since_version=<v> an unchanged sensor snapshot answers 304.
+    """
     try:
-        data = shared_resources.read_data()
-        current_task = rtos_simulator.get_current_task()
-        cpu_usage = rtos_simulator.get_cpu_usage()
+        snapshot = shared_resources.snapshot()
+        since_version = request.args.get('since_version', type=int)
         
-        return jsonify({
-            'speed': data.get('speed', 0),
-            'temperature': data.get('temperature', 0),
-            'collision_status': data.get('collision_status', 'Clear'),
-            'brake_status': data.get('brake_status', 'Off'),
-            'active_task': current_task,
-            'cpu_usage': cpu_usage,
-            'timestamp': int(time.time_ns() // 1000)
-        })
+        # The active task only changes with a logged TASK_* event
+        return cached_json('sensor-data', (snapshot.version, logger.get_version()), build_sensor_data,
+                           not_modified=since_version == snapshot.version)
     except Exception as e:
         logger.log(f"[ERROR] Get sensor data failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/sensor-history', methods=['GET'])
+def get_sensor_history():
+    """Get min/max/mean-downsampled history of one sensor signal"""
+    try:
+        history = sensor_history.query(
+            request.args.get('signal', 'speed'),
+            from_us=request.args.get('from', type=int),
+            to_us=request.args.get('to', type=int),
+            resolution_ms=request.args.get('resolution', type=float),
+            max_buckets=MAX_HISTORY_BUCKETS
+        )
+        return jsonify(history)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Get sensor history failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/api/event-log', methods=['GET'])
 def get_event_log():
-    """Get event log"""
+    """Get event log, optionally only events after a ?since=<seq> cursor"""
     try:
-        logs = logger.get_logs()
-        return jsonify({'events': logs})
+        since = request.args.get('since', type=int)
+        limit = request.args.get('limit', type=int)
+        wait_ms = request.args.get('wait_ms', default=0, type=int)
+        
+        wait_s = min(max(wait_ms, 0), MAX_LONG_POLL_MS) / 1000
+        return jsonify(logger.get_logs_since(since, limit, wait_s))
     except Exception as e:
         logger.log(f"[ERROR] Get event log failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/api/system-stats', methods=['GET'])
-def get_system_stats():
-    """Get system statistics for demo"""
+@app.route('/api/events/query', methods=['GET'])
+def query_events():
+    """Indexed event search.
+    
+    Filters: ?kind= (repeatable or comma-separated), ?task=, ?priority=,
+    ?since_us=, ?until_us=. Results are oldest first; pass the returned
+    next_after as ?after= to get the next page of ?limit= events.
+    """
     try:
-        stats = rtos_simulator.get_statistics()
-        deadline_stats = deadline_monitor.get_statistics()
+        kinds = parse_kinds(request.args.getlist('kind'))
+        limit = request.args.get('limit', default=DEFAULT_QUERY_LIMIT, type=int)
+        if not 1 <= limit <= MAX_QUERY_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_QUERY_LIMIT}")
+        
+        return jsonify(logger.search_events(
+            kinds=kinds,
+            subject=request.args.get('task') or None,
+            priority=request.args.get('priority', type=int),
+            since_us=request.args.get('since_us', type=int),
+            until_us=request.args.get('until_us', type=int),
+            after_seq=request.args.get('after', type=int),
+            limit=limit
+        ))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Event query failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def build_system_stats():
+    """Assemble system statistics from the incremental counters"""
+    stats = rtos_simulator.get_statistics()
+    deadline_stats = deadline_monitor.get_statistics()
+    
+    # Per-sensor counters and rate windows kept by the interrupt controller
+    interrupt_stats = interrupt_controller.get_statistics()
+    sensor_counts = interrupt_stats['sensor_counts']
+    brake_events = sensor_counts['Brake']
+    collision_events = sensor_counts['Collision']
+    speed_events = sensor_counts['Speed']
+    total_events = brake_events + collision_events + speed_events
+    
+    uptime = time.time() - rtos_simulator.start_time
+    
+    # Calculate average response time (microseconds)
+    avg_response_time = 5  # ISR duration is fixed at 5μs
+    
+    return {
+        # Event statistics
+        'brake_events': brake_events,
+        'collision_events': collision_events,
+        'speed_events': speed_events,
+        'total_events': total_events,
+        
+        # Interrupt statistics
+        'total_interrupts': interrupt_stats['total_interrupts'],
+        'interrupts_per_sec': interrupt_stats['interrupts_per_sec'],
+        'interrupts_per_min': interrupt_stats['interrupts_per_min'],
+        'pending_interrupts': interrupt_stats['pending_interrupts'],
+        'rejected_interrupts': interrupt_stats['rejected_interrupts'],
+        'avg_response_time': avg_response_time,
+        
+        # System information
+        'uptime': uptime,
+        'cpu_usage': rtos_simulator.get_cpu_usage(),
+        'status': '🟢 Running',
+        
+        # Legacy stats for compatibility
+        'total_tasks': stats['total_tasks'],
+        'running_tasks': stats['running_tasks'],
+        'ready_tasks': stats['ready_tasks'],
+        'blocked_tasks': stats['blocked_tasks'],
+        'completed_jobs': stats['completed_jobs'],
+        'deadline_misses': deadline_stats['misses'],
+        'verified': deadline_stats['verified'],
         
-        # Count events by type from logs
-        logs = logger.get_logs()
-        brake_events = sum(1 for log in logs if 'Brake' in log and 'INTERRUPT:' in log)
-        collision_events = sum(1 for log in logs if 'Collision' in log and 'INTERRUPT:' in log)
-        speed_events = sum(1 for log in logs if 'Speed' in log and 'INTERRUPT:' in log)
-        total_events = brake_events + collision_events + speed_events
+        # Requested vs achieved ISR/task delays
+        'wait_timing': default_waiter.get_statistics(),
         
-        # Calculate interrupts per second
-        uptime = time.time() - rtos_simulator.start_time
-        interrupts_per_sec = round(interrupt_controller.interrupt_count / max(uptime, 1), 2)
+        # Signal-to-TASK_START and signal-to-suspension latency of the scheduler
+        'preemptions': stats['preemptions'],
+        'dispatch_latency': rtos_simulator.dispatch_latency.snapshot(),
+        'preemption_latency': rtos_simulator.preemption_latency.snapshot(),
         
-        # Calculate average response time (microseconds)
-        avg_response_time = 5  # ISR duration is fixed at 5μs
+        # Deferred-logging ring (None when logging is synchronous)
+        'log_writer': logger.get_writer_statistics(),
         
+        # On-disk event journal (None when disabled)
+        'journal': journal.get_statistics() if journal is not None else None,
+        
+        # Hit rates of the polling endpoints' response cache
+        'response_cache': response_cache.get_statistics()
+    }
+
+@app.route('/api/system-stats', methods=['GET'])
+def get_system_stats():
+    """Get system statistics for demo"""
+    try:
+        # Every counter shown moves with a logged event; uptime and rates age by the TTL
+        return cached_json('system-stats', logger.get_version(), build_system_stats)
+    except Exception as e:
+        logger.log(f"[ERROR] Get system stats failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/scheduler-latency', methods=['GET'])
+def get_scheduler_latency():
+    """Get dispatch (signal -> TASK_START) and preemption latency histograms"""
+    try:
+        return jsonify(rtos_simulator.get_latency_histograms())
+    except Exception as e:
+        logger.log(f"[ERROR] Get scheduler latency failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/locks', methods=['GET'])
+def get_lock_stats():
+    """Get mutex contention metrics and the current wait-for graph"""
+    try:
+        lock_monitor = shared_resources.lock_monitor
         return jsonify({
-            # Event statistics
-            'brake_events': brake_events,
-            'collision_events': collision_events,
-            'speed_events': speed_events,
-            'total_events': total_events,
-            
-            # Interrupt statistics
-            'total_interrupts': interrupt_controller.interrupt_count,
-            'interrupts_per_sec': interrupts_per_sec,
-            'avg_response_time': avg_response_time,
-            
-            # System information
-            'uptime': uptime,
-            'cpu_usage': rtos_simulator.get_cpu_usage(),
-            'status': '🟢 Running',
-            
-            # Legacy stats for compatibility
-            'total_tasks': stats['total_tasks'],
-            'running_tasks': stats['running_tasks'],
-            'ready_tasks': stats['ready_tasks'],
-            'blocked_tasks': stats['blocked_tasks'],
-            'deadline_misses': deadline_stats['misses'],
-            'verified': deadline_stats['verified']
+            'mutexes': lock_monitor.get_statistics(),
+            'wait_for': lock_monitor.wait_for_graph(),
+            'deadlock_cycle': lock_monitor.find_cycle() or []
         })
     except Exception as e:
-        logger.log(f"[ERROR] Get system stats failed: {str(e)}")
+        logger.log(f"[ERROR] Get lock stats failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/watchdog', methods=['GET', 'POST'])
+def deadline_watchdog():
+    """Get watchdog statistics, or select its overrun policy with POST {"policy": ...}"""
+    try:
+        if request.method == 'POST':
+            params = request.get_json(silent=True) or {}
+            deadline_monitor.set_policy(params.get('policy'))
+        return jsonify(deadline_monitor.get_watchdog_statistics())
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Deadline watchdog request failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/tasks', methods=['GET', 'POST'])
+def tasks():
+    """List declared tasks, or register a new one with POST {name, kind, period_us, ...}"""
+    try:
+        if request.method == 'POST':
+            spec = task_registry.register(request.get_json(silent=True))
+            logger.log(f"[SYSTEM] Registered {spec.kind} task {spec.name}")
+            return jsonify(spec.to_dict()), 201
+        return jsonify({'tasks': task_registry.get_tasks(), **task_registry.get_statistics()})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Task registry request failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/scheduler-policy', methods=['GET', 'POST'])
+def scheduler_policy():
+    """Get the scheduling policy, or switch it with POST {"policy": ...}"""
+    try:
+        if request.method == 'POST':
+            params = request.get_json(silent=True) or {}
+            policy = create_policy(params.get('policy'), deadline_monitor.deadlines,
+                                   task_registry.periods)
+            rtos_simulator.set_scheduling_policy(policy)
+            logger.log(f"[SYSTEM] Scheduling policy set to {policy.name}")
+        return jsonify({'policy': rtos_simulator.policy.name})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Scheduler policy request failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/schedulability', methods=['GET'])
+def get_schedulability():
+    """Utilization bounds and response-time analysis of the declared tasks (?policy=...)"""
+    try:
+        policy = request.args.get('policy', rtos_simulator.policy.name)
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        return jsonify(schedulability_analyzer.analyze(list(task_registry.specs.values()), policy))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Schedulability analysis failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/message-queues', methods=['GET'])
+def get_message_queues():
+    """Get depth, high watermark and drop counters of the ISR -> task queues"""
+    try:
+        return jsonify(shared_resources.get_queue_statistics())
+    except Exception as e:
+        logger.log(f"[ERROR] Get message queues failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/stream', methods=['GET'])
+def event_stream():
+    """Server-Sent Events push channel for sensor data, log events and stats"""
+    client = broadcaster.subscribe()
+    return app.response_class(
+        broadcaster.stream(client),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def build_task_analysis():
+    """Per-task execution metrics merged with deadline statistics"""
+    analysis = task_analyzer.analyze_tasks()
+    for task_name, deadline_stats in deadline_monitor.get_task_statistics().items():
+        analysis.setdefault(task_name, {}).update(deadline_stats)
+    return analysis
+
 @app.route('/api/task-analysis', methods=['GET'])
 def get_task_analysis():
     """Get task analysis and timing data"""
     try:
-        analysis = task_analyzer.analyze_tasks()
-        return jsonify(analysis)
+        version = (task_analyzer.version, deadline_monitor.overruns, len(rtos_simulator.tasks))
+        return cached_json('task-analysis', version, build_task_analysis)
     except Exception as e:
         logger.log(f"[ERROR] Task analysis failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -172,11 +552,76 @@ def verify_rtos():
         logger.log(f"[ERROR] Verification failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/simulate', methods=['POST'])
+def simulate():
+    """Run an isolated virtual-time simulation and return its summary"""
+    try:
+        params = request.get_json(silent=True) or {}
+        duration_s = float(params.get('duration_s', 60))
+        if not 0 < duration_s <= MAX_SIMULATED_SECONDS:
+            return jsonify({'status': 'error',
+                            'message': f'duration_s must be in (0, {MAX_SIMULATED_SECONDS}]'}), 400
+        
+        seed = int(params.get('seed', 0))
+        rates = params.get('rates', {'Brake': 1, 'Collision': 2, 'Speed': 5})
+        if not isinstance(rates, dict):
+            raise ValueError("rates must be an object mapping sensor names to Hz")
+        for sensor_name, rate_hz in rates.items():
+            if sensor_name not in interrupt_controller.interrupt_map:
+                raise ValueError(f"Unknown sensor: {sensor_name}")
+            if (isinstance(rate_hz, bool) or not isinstance(rate_hz, (int, float))
+                    or not 0 <= rate_hz <= MAX_SIMULATED_RATE_HZ):
+                raise ValueError(f"Rate for {sensor_name} must be a number in [0, {MAX_SIMULATED_RATE_HZ}] Hz")
+        periods_ms = params.get('periods_ms', {})
+        if not isinstance(periods_ms, dict):
+            raise ValueError("periods_ms must be an object mapping sensor names to ms")
+        min_period_ms = 1000 / MAX_SIMULATED_RATE_HZ
+        for sensor_name, period_ms in periods_ms.items():
+            if sensor_name not in interrupt_controller.interrupt_map:
+                raise ValueError(f"Unknown sensor: {sensor_name}")
+            if (isinstance(period_ms, bool) or not isinstance(period_ms, (int, float))
+                    or not min_period_ms <= period_ms < math.inf):
+                raise ValueError(f"Period for {sensor_name} must be a number of at least {min_period_ms:g} ms")
+        wcets = params.get('wcet_us', {})
+        if not isinstance(wcets, dict):
+            raise ValueError("wcet_us must be an object mapping task names to μs")
+        for task_name, wcet_us in wcets.items():
+            if isinstance(wcet_us, bool) or not isinstance(wcet_us, int) or wcet_us <= 0:
+                raise ValueError(f"wcet_us for {task_name} must be a positive integer")
+        def configure(engine):
+            for task_name, wcet_us in wcets.items():
+                engine.set_wcet(task_name, wcet_us)
+            for sensor_name, rate_hz in rates.items():
+                if rate_hz > 0:
+                    engine.add_poisson_source(sensor_name, float(rate_hz))
+            for sensor_name, period_ms in periods_ms.items():
+                engine.add_periodic_source(sensor_name, int(float(period_ms) * 1000))
+        
+        # Several policies: same workload per policy, summaries side by side
+        if 'policies' in params:
+            for policy in params['policies']:
+                create_policy(policy)
+            return jsonify(compare_policies(params['policies'], configure,
+                                            int(duration_s * 1_000_000), seed))
+        
+        engine = create_virtual_system(seed=seed, policy=params.get('policy', 'fixed_priority'))
+        configure(engine)
+        summary = engine.run(int(duration_s * 1_000_000))
+        tail = int(params.get('tail', 50))
+        summary['events'] = engine.logger.get_logs_since(limit=tail)['events'] if tail > 0 else []
+        return jsonify(summary)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.log(f"[ERROR] Simulation failed: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/api/clear-log', methods=['POST'])
 def clear_log():
     """Clear event log"""
     try:
         logger.clear()
+        interrupt_controller.reset_sensor_counts()
         logger.log("[SYSTEM] Event log cleared")
         return jsonify({'status': 'success', 'message': 'Log cleared'})
     except Exception as e:
@@ -184,18 +629,41 @@ def clear_log():
 
 @app.route('/api/export-log', methods=['GET'])
 def export_log():
-    """Export event log"""
+    """Stream the event log.
+    
+    Filters: ?kind= (repeatable or comma-separated), ?task=, ?since_us=, ?until_us=.
+    ?format=text|csv|ndjson picks the layout; ?gzip=1 compresses it on the fly.
+    Events come from the journal when it is enabled, else from memory.
+    """
     try:
-        logs = logger.get_logs()
-        log_text = '\n'.join(logs)
+        since_us = request.args.get('since_us', type=int)
+        until_us = request.args.get('until_us', type=int)
+        kinds = parse_kinds(request.args.getlist('kind'))
+        task = request.args.get('task') or None
+        fmt = request.args.get('format', 'text')
+        compress = request.args.get('gzip', '0').lower() in ('1', 'true', 'yes')
+        if journal is not None:
+            logger.flush()
+            events = journal.read(since_us, until_us, kinds, task)
+        else:
+            events = logger.iter_events(since_us, until_us, kinds, task)
+        chunks = export_chunks(events, fmt, compress)
         
+        _, mimetype, extension = EXPORT_FORMATS[fmt]
+        filename = f"event_log.{extension}"
+        if compress:
+            mimetype = 'application/gzip'
+            filename += '.gz'
         return app.response_class(
-            response=log_text,
+            response=chunks,
             status=200,
-            mimetype='text/plain',
-            headers={'Content-Disposition': 'attachment;filename=event_log.txt'}
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment;filename={filename}'}
         )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
+        logger.log(f"[ERROR] Export log failed: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/health', methods=['GET'])
@@ -214,9 +682,19 @@ if __name__ == '__main__':
     ============================================================
     """)
     
+    # Calibrate task/ISR delay timing for this host
+    granularity_us = default_waiter.calibrate() * 1_000_000
+    logger.log(f"[SYSTEM] Timer calibrated: sleep granularity {granularity_us:.1f}μs")
+    
     # Initialize system
+    start_journal()
+    start_log_writer()
+    start_dispatcher()
     start_scheduler()
     start_monitor()
+    start_releases()
+    start_trace_verifier()
+    start_stream()
     
     # Initial sensor data
     shared_resources.write_data({
@@ -0,0 +1,73 @@
+"""
+Scheduling Policy - Ready-Queue Ordering
+Fixed-priority, earliest-deadline-first and rate-monotonic job ordering
+"""
+
+from rt_mutex import base_priority
+
+NO_DEADLINE = float('inf')
+
+class SchedulingPolicy:
+    """Orders ready jobs by a sort key; the smallest key runs first.
+    
+    Schedulers keep jobs in a binary heap keyed by key(task, release_us), so
+    every policy has O(log n) insert and pop. A running job is preempted
+    when the head of the heap has a strictly smaller key than its own.
+    `deadlines` (and `periods`) are read live, so edits to the deadline
+    table take effect for the next release.
+    """
+    
+    name = None
+    
+    def __init__(self, deadlines=None, periods=None):
+        self.deadlines = deadlines if deadlines is not None else {}
+        self.periods = periods if periods is not None else {}
+    
+    def key(self, task, release_us):
+        raise NotImplementedError
+
+class FixedPriorityPolicy(SchedulingPolicy):
+    """Static task priorities, FIFO among equals (the original scheduler order)"""
+    
+    name = 'fixed_priority'
+    
+    def key(self, task, release_us):
+        return (-task.priority, release_us)
+
+class EarliestDeadlineFirstPolicy(SchedulingPolicy):
+    """Earliest absolute deadline (release + relative deadline) first.
+    
+    A task boosted by priority inheritance runs ahead of unboosted work:
+    the job it blocks cannot run until it releases the mutex.
+    """
+    
+    name = 'edf'
+    
+    def key(self, task, release_us):
+        boosted = task.priority > base_priority(task)
+        return (not boosted, release_us + self.deadlines.get(task.name, NO_DEADLINE), release_us)
+
+class RateMonotonicPolicy(SchedulingPolicy):
+    """Shortest period first; priorities are fixed by the task set, not by `priority`.
+    
+    Tasks without a declared period are ranked by their deadline, i.e.
+    treated as implicit-deadline tasks (period == deadline).
+    """
+    
+    name = 'rate_monotonic'
+    
+    def key(self, task, release_us):
+        boosted = task.priority > base_priority(task)
+        period = self.periods.get(task.name) or self.deadlines.get(task.name, NO_DEADLINE)
+        return (not boosted, period, release_us)
+
+SCHEDULING_POLICIES = {
+    policy.name: policy
+    for policy in (FixedPriorityPolicy, EarliestDeadlineFirstPolicy, RateMonotonicPolicy)
+}
+
+def create_policy(name, deadlines=None, periods=None):
+    """Instantiate a policy by name; raises ValueError for unknown names"""
+    if name not in SCHEDULING_POLICIES:
+        raise ValueError(f"Unknown scheduling policy: {name} (expected {', '.join(SCHEDULING_POLICIES)})")
+    return SCHEDULING_POLICIES[name](deadlines, periods)
@@ -0,0 +1,163 @@
+"""
+Sensor History - Per-Signal Ring Buffers
+Bounded time series of every sensor write with downsampled queries
+"""
+
+import threading
+from array import array
+from bisect import bisect_left
+
+class SignalRing:
+    """Fixed-capacity (timestamp, value) ring for one signal.
+    
+    Timestamps and values live in preallocated `array` buffers, so memory is
+    16 bytes per sample whatever the run length. Categorical signals store
+    the index of their label in `labels`.
+    """
+    
+    def __init__(self, capacity, categorical=False):
+        self.capacity = capacity
+        self.categorical = categorical
+        self.timestamps = array('q', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.labels = []
+        self.label_codes = {}
+        self.start = 0   # physical slot of the oldest sample
+        self.size = 0
+        self.total = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, index):
+        """Timestamp of the index-th oldest sample (lets bisect search the ring)"""
+        return self.timestamps[(self.start + index) % self.capacity]
+    
+    def append(self, timestamp_us, value):
+        if self.categorical:
+            code = self.label_codes.get(value)
+            if code is None:
+                code = self.label_codes[value] = len(self.labels)
+                self.labels.append(value)
+            value = code
+        
+        # Keep timestamps non-decreasing so range lookups can bisect
+        if self.size and timestamp_us < self[self.size - 1]:
+            timestamp_us = self[self.size - 1]
+        
+        slot = (self.start + self.size) % self.capacity
+        self.timestamps[slot] = timestamp_us
+        self.values[slot] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        self.total += 1
+    
+    def values_between(self, lo, hi):
+        """Values of logical samples [lo, hi) as at most two array slices"""
+        first = (self.start + lo) % self.capacity
+        last = first + (hi - lo)
+        if last <= self.capacity:
+            return [self.values[first:last]]
+        return [self.values[first:], self.values[:last - self.capacity]]
+    
+    def downsample(self, from_us, to_us, width_us):
+        """Bucket samples in [from_us, to_us) into width_us buckets.
+        
+        Bucket edges are located by bisecting the timestamps and each bucket
+        is reduced with min/max/sum over array slices, so the cost is one
+        C-level pass over the selected samples plus O(log n) per bucket.
+        Empty buckets are omitted.
+        """
+        buckets = []
+        lo = bisect_left(self, from_us)
+        edge = from_us
+        while edge < to_us and lo < self.size:
+            next_edge = min(edge + width_us, to_us)
+            hi = bisect_left(self, next_edge, lo)
+            if hi > lo:
+                chunks = self.values_between(lo, hi)
+                bucket = {'start_us': edge, 'count': hi - lo}
+                if self.categorical:
+                    bucket['last'] = self.labels[int(chunks[-1][-1])]
+                else:
+                    bucket['min'] = min(min(chunk) for chunk in chunks)
+                    bucket['max'] = max(max(chunk) for chunk in chunks)
+                    bucket['mean'] = round(sum(sum(chunk) for chunk in chunks) / (hi - lo), 3)
+                buckets.append(bucket)
+            lo = hi
+            edge = next_edge
+        return buckets
+
+class SensorHistory:
+    """Ring buffers for every sensor signal, fed by SharedResources writes"""
+    
+    NUMERIC_SIGNALS = ('speed', 'temperature')
+    CATEGORICAL_SIGNALS = ('collision_status', 'brake_status')
+    
+    def __init__(self, capacity=50000):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.signals = {name: SignalRing(capacity) for name in self.NUMERIC_SIGNALS}
+        self.signals.update({name: SignalRing(capacity, categorical=True)
+                             for name in self.CATEGORICAL_SIGNALS})
+    
+    def record_snapshot(self, snapshot):
+        """SharedResources listener: append every known field of the new snapshot"""
+        with self.lock:
+            for name, value in snapshot.data.items():
+                ring = self.signals.get(name)
+                if ring is None:
+                    continue
+                if ring.categorical:
+                    ring.append(snapshot.timestamp_us, str(value))
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    ring.append(snapshot.timestamp_us, value)
+    
+    def query(self, signal, from_us=None, to_us=None, resolution_ms=None, max_buckets=1000):
+        """Downsampled history of one signal.
+        
+        Defaults cover the whole retained history in about 100 buckets.
+        Raises ValueError for unknown signals or too many buckets.
+        """
+        ring = self.signals.get(signal)
+        if ring is None:
+            raise ValueError(f"Unknown signal: {signal} (expected one of {', '.join(self.signals)})")
+        
+        with self.lock:
+            if ring.size == 0:
+                buckets = []
+                from_us = from_us or 0
+                to_us = to_us or 0
+                width_us = 0
+            else:
+                if from_us is None:
+                    from_us = ring[0]
+                if to_us is None:
+                    to_us = ring[ring.size - 1] + 1
+                if to_us <= from_us:
+                    raise ValueError("'to' must be after 'from'")
+                
+                if resolution_ms is None:
+                    width_us = max(1, -(-(to_us - from_us) // 100))
+                else:
+                    width_us = int(resolution_ms * 1000)
+                    if width_us <= 0:
+                        raise ValueError("resolution must be positive")
+                if -(-(to_us - from_us) // width_us) > max_buckets:
+                    raise ValueError(f"At most {max_buckets} buckets per query; use a coarser resolution")
+                buckets = ring.downsample(from_us, to_us, width_us)
+            samples = ring.size
+            total = ring.total
+        
+        return {
+            'signal': signal,
+            'from': from_us,
+            'to': to_us,
+            'resolution_ms': width_us / 1000,
+            'retained_samples': samples,
+            'total_samples': total,
+            'capacity': self.capacity,
+            'buckets': buckets
+        }
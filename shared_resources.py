@@ -4,64 +4,148 @@ Enhanced with semaphores and message queues
 """
 
 import threading
-import queue
+import time
+from types import MappingProxyType
+from message_ring import MessageRing, DROP_OLDEST
+from rt_mutex import LockMonitor
+
+class SensorSnapshot:
+    """Immutable published sensor state.
+    
+    `data` is a read-only view; `field_versions` records the version at
+    which each field last changed, which is what compare-and-swap checks.
+    """
+    __slots__ = ('version', 'data', 'field_versions', 'timestamp_us')
+    
+    def __init__(self, version, data, field_versions, timestamp_us):
+        self.version = version
+        self.data = MappingProxyType(data)
+        self.field_versions = MappingProxyType(field_versions)
+        self.timestamp_us = timestamp_us
 
 class SharedResources:
-    def __init__(self, logger):
+    def __init__(self, logger, queue_slots=64, queue_policy=DROP_OLDEST):
         self.logger = logger
+        # Serializes writers only; readers take self.current without locking
         self.data_lock = threading.Lock()
-        self.data = {}
+        self.current = SensorSnapshot(0, {}, {}, int(time.time_ns() // 1000))
+        self.cas_conflicts = 0
         
-        # NEW: Semaphores
-        self.semaphores = {
-            'brake_sem': threading.Semaphore(1),
-            'collision_sem': threading.Semaphore(1),
-            'speed_sem': threading.Semaphore(1)
+        # Priority-inheritance mutexes, owned by tasks
+        self.lock_monitor = LockMonitor()
+        self.mutexes = {
+            name: self.lock_monitor.create(name)
+            for name in ('brake_mutex', 'collision_mutex', 'speed_mutex')
         }
         
-        # NEW: Message queues
+        # ISR -> task message queues: preallocated SPSC frame rings
         self.msg_queues = {
-            'brake_queue': queue.Queue(maxsize=10),
-            'collision_queue': queue.Queue(maxsize=10),
-            'speed_queue': queue.Queue(maxsize=10)
+            name: MessageRing(name, slots=queue_slots, policy=queue_policy)
+            for name in ('brake_queue', 'collision_queue', 'speed_queue')
         }
+        
+        # Callbacks notified after every data write (e.g. the event stream)
+        self.listeners = []
+    
+    def add_listener(self, callback):
+        """Register a callback invoked with the new snapshot after each write"""
+        self.listeners.append(callback)
+    
+    def _publish(self, data):
+        """Install a new snapshot; caller holds data_lock"""
+        previous = self.current
+        version = previous.version + 1
+        field_versions = {
+            field: previous.field_versions[field]
+            if field in previous.data and previous.data[field] == value else version
+            for field, value in data.items()
+        }
+        self.current = SensorSnapshot(version, data, field_versions, int(time.time_ns() // 1000))
+        return self.current
+    
+    def _notify(self, snapshot):
+        for callback in self.listeners:
+            callback(snapshot)
+    
+    def snapshot(self):
+        """Current immutable snapshot; no lock and no copy"""
+        return self.current
     
     def write_data(self, data):
-        """Thread-safe data write"""
+        """Replace the whole sensor state"""
         with self.data_lock:
-            self.data = data
+            snapshot = self._publish(dict(data))
+        self._notify(snapshot)
     
-    def read_data(self):
-        """Thread-safe data read"""
+    def update_fields(self, base, data):
+        """Compare-and-swap the fields of `data` that differ from snapshot `base`.
+        
+        The update applies only if none of those fields has changed since
+        `base` was read; other fields may have moved on and are preserved.
+        Returns False on conflict, in which case the caller should re-read
+        and recompute.
+        """
+        changes = {field: value for field, value in data.items()
+                   if field not in base.data or base.data[field] != value}
+        if not changes:
+            return True
+        
         with self.data_lock:
-            return self.data.copy()
+            current = self.current
+            for field in changes:
+                if current.field_versions.get(field) != base.field_versions.get(field):
+                    self.cas_conflicts += 1
+                    return False
+            merged = dict(current.data)
+            merged.update(changes)
+            snapshot = self._publish(merged)
+        self._notify(snapshot)
+        return True
+    
+    def read_data(self):
+        """Copy of the current sensor data"""
+        return dict(self.current.data)
     
-    def acquire_semaphore(self, sem_name, timeout=1.0):
-        """Acquire semaphore"""
-        if sem_name in self.semaphores:
-            return self.semaphores[sem_name].acquire(timeout=timeout)
-        return False
+    def get_mutex(self, mutex_name):
+        """Mutex by name, created on first use"""
+        mutex = self.mutexes.get(mutex_name)
+        if mutex is None:
+            with self.data_lock:
+                mutex = self.mutexes.get(mutex_name)
+                if mutex is None:
+                    mutex = self.mutexes[mutex_name] = self.lock_monitor.create(mutex_name)
+        return mutex
     
-    def release_semaphore(self, sem_name):
-        """Release semaphore"""
-        if sem_name in self.semaphores:
-            self.semaphores[sem_name].release()
+    def acquire_mutex(self, mutex_name, task):
+        """Generator: yields the mutex while another task holds it"""
+        return self.mutexes[mutex_name].acquire(task)
+    
+    def release_mutex(self, mutex_name, task):
+        """Release a mutex held by task"""
+        self.mutexes[mutex_name].release(task)
     
     def send_message(self, queue_name, message):
-        """Send message to queue"""
-        if queue_name in self.msg_queues:
-            try:
-                self.msg_queues[queue_name].put_nowait(message)
-                return True
-            except queue.Full:
-                return False
-        return False
+        """Send message to queue; returns its sequence number in the queue,
+        or None if the overflow policy dropped it"""
+        ring = self.msg_queues.get(queue_name)
+        if ring is None or not ring.put(message):
+            return None
+        # Only the ISR dispatch thread produces, so nothing else moves tail
+        return ring.tail - 1
+    
+    def take_message(self, queue_name, seq):
+        """Take the message send_message() numbered seq; None if seq is None
+        or the message was dropped"""
+        if seq is None or queue_name not in self.msg_queues:
+            return None
+        return self.msg_queues[queue_name].take(seq)
     
     def receive_message(self, queue_name, timeout=1.0):
         """Receive message from queue"""
         if queue_name in self.msg_queues:
-            try:
-                return self.msg_queues[queue_name].get(timeout=timeout)
-            except queue.Empty:
-                return None
+            return self.msg_queues[queue_name].get(timeout=timeout)
         return None
+    
+    def get_queue_statistics(self):
+        """Depth, high watermark and drop counters per message queue"""
+        return {name: ring.get_statistics() for name, ring in self.msg_queues.items()}
@@ -0,0 +1,380 @@
+"""
+Simulation Engine - Virtual Time Mode
+Discrete-event simulation of interrupts, ISRs and tasks on a virtual clock
+"""
+
+import argparse
+import heapq
+import json
+import random
+import time
+from event_store import EventKind
+from logger import Logger
+from shared_resources import SharedResources
+from interrupt_controller import InterruptController
+from rtos_simulator import RTOSSimulator
+from deadline_monitor import DeadlineMonitor
+from scheduling_policy import FixedPriorityPolicy, create_policy, SCHEDULING_POLICIES
+from task_registry import TaskSpec
+
+class VirtualClock:
+    """Simulated time in microseconds; only the engine moves it forward"""
+    
+    def __init__(self, start_us=0):
+        self.current_us = start_us
+    
+    def now_us(self):
+        return self.current_us
+    
+    def advance_to(self, time_us):
+        if time_us < self.current_us:
+            raise ValueError(f"Virtual time cannot go backwards: {time_us} < {self.current_us}")
+        self.current_us = time_us
+
+class IsrActivation:
+    """One pending or running ISR instance"""
+    __slots__ = ('int_number', 'sensor_name', 'priority', 'arrival_us', 'remaining_us')
+    
+    def __init__(self, int_number, sensor_name, priority, arrival_us, duration_us):
+        self.int_number = int_number
+        self.sensor_name = sensor_name
+        self.priority = priority
+        self.arrival_us = arrival_us
+        self.remaining_us = duration_us
+
+class Job:
+    """One release of a task, from ISR signal to TASK_END"""
+    __slots__ = ('task', 'release_us', 'start_us', 'remaining_us', 'preempted')
+    
+    def __init__(self, task, release_us):
+        self.task = task
+        self.release_us = release_us
+        self.start_us = None
+        self.remaining_us = task.wcet_us
+        self.preempted = False
+
+class SimulationEngine:
+    """Discrete-event engine driving the RTOS components on virtual time.
+    
+    Pending work is an event heap keyed by simulated microseconds. The CPU
+    runs the highest-priority ISR if any is active (higher-priority
+    interrupts nest over lower ones), otherwise the ready job ranked first
+    by the scheduling policy (preemptive). Execution time is accounted by the
+    clock instead of spinning, so hours of traffic simulate in seconds with
+    exact, reproducible timestamps.
+    """
+    
+    def __init__(self, logger, shared_resources, interrupt_controller, rtos,
+                 deadline_monitor=None, clock=None, seed=0, policy=None):
+        self.logger = logger
+        self.shared_resources = shared_resources
+        self.interrupt_controller = interrupt_controller
+        self.rtos = rtos
+        self.deadline_monitor = deadline_monitor
+        self.policy = policy or FixedPriorityPolicy()
+        self.clock = clock or VirtualClock()
+        self.random = random.Random(seed)
+        
+        self.event_heap = []
+        self.event_seq = 0
+        self.events_processed = 0
+        # Counted here: the logger's counts only cover events still in its ring
+        self.preemptions = 0
+        
+        # CPU state
+        self.pending_isrs = []   # heap of (-priority, seq, IsrActivation)
+        self.isr_stack = []      # nested running ISRs, innermost last
+        self.ready_jobs = []     # heap of (policy key, seq, Job)
+        self.current_job = None
+        self.running = None      # IsrActivation or Job currently on the CPU
+        self.run_since_us = 0
+        self.run_token = 0       # invalidates stale completion events
+        
+        self.response_stats = {
+            name: {'jobs': 0, 'total_us': 0, 'max_us': 0} for name in rtos.tasks
+        }
+    
+    def schedule(self, at_us, handler, *args):
+        """Queue handler(*args) to run at simulated time at_us"""
+        heapq.heappush(self.event_heap, (at_us, self.event_seq, handler, args))
+        self.event_seq += 1
+    
+    def set_wcet(self, task_name, wcet_us):
+        """Override a task's execution time for this simulation only.
+        
+        The task gets its own copy of its spec, so readers of spec.wcet_us
+        see the override while the shared built-in specs stay untouched.
+        """
+        task = self.rtos.tasks.get(task_name)
+        if task is None:
+            raise ValueError(f"Unknown task: {task_name}")
+        if isinstance(wcet_us, bool) or not isinstance(wcet_us, int) or wcet_us <= 0:
+            raise ValueError(f"wcet_us must be a positive integer: {wcet_us}")
+        task.spec = TaskSpec(**{**task.spec.to_dict(), 'wcet_us': wcet_us})
+        task.wcet_us = wcet_us
+    
+    def _check_sensor(self, sensor_name):
+        if sensor_name not in self.interrupt_controller.interrupt_map:
+            raise ValueError(f"Unknown sensor: {sensor_name}")
+    
+    def inject_interrupt(self, sensor_name, at_us):
+        """Schedule a single sensor interrupt"""
+        self._check_sensor(sensor_name)
+        self.schedule(at_us, self._on_interrupt, sensor_name)
+    
+    def add_periodic_source(self, sensor_name, period_us, start_us=0, jitter_us=0):
+        """Raise sensor_name every period_us, with optional uniform release jitter"""
+        self._check_sensor(sensor_name)
+        if period_us <= 0:
+            raise ValueError(f"Period must be positive: {period_us}")
+        def fire(next_us):
+            self._on_interrupt(sensor_name)
+            offset = self.random.randint(0, jitter_us) if jitter_us else 0
+            self.schedule(next_us + period_us + offset, fire, next_us + period_us)
+        self.schedule(start_us, fire, start_us)
+    
+    def add_poisson_source(self, sensor_name, rate_hz, start_us=0):
+        """Raise sensor_name with exponentially distributed inter-arrival times"""
+        self._check_sensor(sensor_name)
+        if rate_hz <= 0:
+            raise ValueError(f"Rate must be positive: {rate_hz}")
+        def fire():
+            self._on_interrupt(sensor_name)
+            gap_us = max(1, int(self.random.expovariate(rate_hz) * 1_000_000))
+            self.schedule(self.clock.now_us() + gap_us, fire)
+        self.schedule(start_us + max(1, int(self.random.expovariate(rate_hz) * 1_000_000)), fire)
+    
+    def run(self, duration_us):
+        """Process events until the simulated clock passes start + duration_us"""
+        end_us = self.clock.now_us() + duration_us
+        wall_start = time.perf_counter()
+        
+        while self.event_heap and self.event_heap[0][0] <= end_us:
+            at_us, _, handler, args = heapq.heappop(self.event_heap)
+            self.clock.advance_to(at_us)
+            handler(*args)
+            self.events_processed += 1
+        
+        self.clock.advance_to(max(self.clock.now_us(), end_us))
+        return self.summary(time.perf_counter() - wall_start)
+    
+    # --- Event handlers ---
+    
+    def _on_interrupt(self, sensor_name):
+        now = self.clock.now_us()
+        int_number, priority = self.interrupt_controller.record_interrupt(sensor_name, now)
+        isr = IsrActivation(int_number, sensor_name, priority, now,
+                            self.interrupt_controller.ISR_DURATION_US)
+        heapq.heappush(self.pending_isrs, (-priority, self.event_seq, isr))
+        self.event_seq += 1
+        self._reschedule()
+    
+    def _on_complete(self, token):
+        if token != self.run_token:
+            return  # Context was switched out before finishing
+        now = self.clock.now_us()
+        context = self.running
+        self.running = None
+        context.remaining_us = 0
+        
+        if isinstance(context, IsrActivation):
+            self.isr_stack.pop()
+            isr_name = self.interrupt_controller.isr_names[context.int_number]
+            self.logger.log_event(EventKind.ISR_EXIT, isr_name, timestamp_us=now)
+            self._release_job(self.interrupt_controller.isr_tasks[context.int_number], now)
+        else:
+            self._finish_job(context, now)
+        
+        self._reschedule()
+    
+    # --- CPU model ---
+    
+    def _release_job(self, task_name, now):
+        task = self.rtos.tasks[task_name]
+        job = Job(task, now)
+        self.rtos.set_task_state(task, "READY")
+        heapq.heappush(self.ready_jobs, (self.policy.key(task, now), self.event_seq, job))
+        self.event_seq += 1
+    
+    def _finish_job(self, job, now):
+        task = job.task
+        self.logger.log_event(EventKind.TASK_END, task.name, task.priority, timestamp_us=now)
+        
+        data = self.shared_resources.read_data()
+        self.shared_resources.write_data(task.process(data))
+        task.execution_count += 1
+        
+        self.rtos.set_task_state(task, "BLOCKED")
+        self.rtos.total_execution_time += task.wcet_us / 1_000_000
+        self.current_job = None
+        
+        response_us = now - job.release_us
+        stats = self.response_stats[task.name]
+        stats['jobs'] += 1
+        stats['total_us'] += response_us
+        stats['max_us'] = max(stats['max_us'], response_us)
+        
+        if self.deadline_monitor:
+            self.deadline_monitor.check_deadline(task.name, job.release_us, now)
+    
+    def _pause_running(self, now):
+        """Take the running context off the CPU, charging it the elapsed time"""
+        if self.running is not None:
+            self.running.remaining_us -= now - self.run_since_us
+            self.running = None
+            self.run_token += 1
+    
+    def _run(self, context, now):
+        self.running = context
+        self.run_since_us = now
+        self.run_token += 1
+        self.schedule(now + context.remaining_us, self._on_complete, self.run_token)
+    
+    def _reschedule(self):
+        now = self.clock.now_us()
+        self._pause_running(now)
+        
+        # A pending ISR nests over a running one only with strictly higher priority
+        if self.pending_isrs:
+            top = self.pending_isrs[0][2]
+            if not self.isr_stack or top.priority > self.isr_stack[-1].priority:
+                heapq.heappop(self.pending_isrs)
+                self.isr_stack.append(top)
+                isr_name = self.interrupt_controller.isr_names[top.int_number]
+                self.logger.log_event(EventKind.ISR_ENTRY, isr_name, timestamp_us=now)
+        
+        if self.isr_stack:
+            self._run(self.isr_stack[-1], now)
+            return
+        
+        if self.ready_jobs:
+            candidate_key, _, candidate = self.ready_jobs[0]
+            if self.current_job is None or candidate_key < self.policy.key(
+                    self.current_job.task, self.current_job.release_us):
+                heapq.heappop(self.ready_jobs)
+                if self.current_job is not None:
+                    preempted = self.current_job
+                    self.logger.log_event(EventKind.TASK_PREEMPT, preempted.task.name,
+                                          preempted.task.priority, candidate.task.name, now)
+                    preempted.preempted = True
+                    self.preemptions += 1
+                    self.rtos.set_task_state(preempted.task, "READY")
+                    heapq.heappush(self.ready_jobs,
+                                   (self.policy.key(preempted.task, preempted.release_us),
+                                    self.event_seq, preempted))
+                    self.event_seq += 1
+                self._start_job(candidate, now)
+        
+        if self.current_job is not None:
+            self._run(self.current_job, now)
+    
+    def _start_job(self, job, now):
+        task = job.task
+        self.current_job = job
+        self.rtos.set_task_state(task, "RUNNING")
+        if job.start_us is None:
+            job.start_us = now
+            self.logger.log_event(EventKind.TASK_START, task.name, task.priority, timestamp_us=now)
+        elif job.preempted:
+            job.preempted = False
+            self.logger.log_event(EventKind.TASK_RESUME, task.name, task.priority, timestamp_us=now)
+    
+    # --- Reporting ---
+    
+    def summary(self, wall_time_s=None):
+        """Summarize the simulated run"""
+        interrupt_stats = self.interrupt_controller.get_statistics()
+        response_times = {}
+        for name, stats in self.response_stats.items():
+            response_times[name] = {
+                'jobs': stats['jobs'],
+                'avg_response_us': round(stats['total_us'] / stats['jobs'], 2) if stats['jobs'] else 0,
+                'max_response_us': stats['max_us']
+            }
+        
+        summary = {
+            'simulated_us': self.clock.now_us(),
+            'events_processed': self.events_processed,
+            'interrupts': interrupt_stats['sensor_counts'],
+            'total_interrupts': interrupt_stats['total_interrupts'],
+            'preemptions': self.preemptions,
+            'response_times': response_times
+        }
+        summary['policy'] = self.policy.name
+        if self.deadline_monitor:
+            deadline_stats = self.deadline_monitor.get_statistics()
+            jobs = deadline_stats['misses'] + deadline_stats['verified']
+            summary['deadline_misses'] = deadline_stats['misses']
+            summary['deadline_miss_rate'] = round(deadline_stats['misses'] / jobs, 4) if jobs else 0
+        if wall_time_s is not None:
+            summary['wall_time_s'] = round(wall_time_s, 4)
+        return summary
+
+def create_virtual_system(seed=0, start_us=0, max_logs=10000, policy='fixed_priority'):
+    """Build an isolated component set running on a virtual clock"""
+    logger = Logger(max_logs=max_logs)
+    shared_resources = SharedResources(logger)
+    shared_resources.write_data({
+        'speed': 0,
+        'temperature': 25,
+        'collision_status': 'Clear',
+        'brake_status': 'Off'
+    })
+    interrupt_controller = InterruptController(logger)
+    rtos = RTOSSimulator(logger, shared_resources, interrupt_controller)
+    deadline_monitor = DeadlineMonitor(logger, rtos)
+    clock = VirtualClock(start_us)
+    return SimulationEngine(logger, shared_resources, interrupt_controller, rtos,
+                            deadline_monitor, clock=clock, seed=seed,
+                            policy=create_policy(policy, deadline_monitor.deadlines))
+
+def compare_policies(policies, configure, duration_us, seed=0):
+    """Run the same workload once per scheduling policy.
+    
+    configure(engine) adds the interrupt sources and any task overrides; it
+    is applied to a fresh system for each policy, and with the same seed
+    every run sees identical interrupt arrivals. Returns {policy: summary}.
+    """
+    results = {}
+    for policy in policies:
+        engine = create_virtual_system(seed=seed, policy=policy)
+        configure(engine)
+        results[policy] = engine.run(duration_us)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the RTOS simulator in virtual time")
+    parser.add_argument('--duration', type=float, default=3600, help="Simulated seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate', action='append', default=[], metavar='SENSOR=HZ',
+                        help="Poisson interrupt rate per sensor, e.g. Brake=2 (repeatable)")
+    parser.add_argument('--wcet', action='append', default=[], metavar='TASK=US',
+                        help="Override a task's execution time, e.g. SpeedTask=8000 (repeatable)")
+    parser.add_argument('--policy', action='append', choices=sorted(SCHEDULING_POLICIES),
+                        help="Scheduling policy; repeat to compare policies on the same workload")
+    parser.add_argument('--tail', type=int, default=0, help="Print the last N log lines")
+    args = parser.parse_args()
+    
+    rates = dict(item.split('=', 1) for item in args.rate) or {'Brake': 1, 'Collision': 2, 'Speed': 5}
+    wcets = dict(item.split('=', 1) for item in args.wcet)
+    def configure(engine):
+        for task_name, wcet_us in wcets.items():
+            engine.set_wcet(task_name, int(wcet_us))
+        for sensor_name, rate_hz in rates.items():
+            engine.add_poisson_source(sensor_name, float(rate_hz))
+    
+    policies = args.policy or ['fixed_priority']
+    if len(policies) > 1:
+        results = compare_policies(policies, configure, int(args.duration * 1_000_000), args.seed)
+        print(json.dumps(results, indent=2))
+        return
+    
+    engine = create_virtual_system(seed=args.seed, policy=policies[0])
+    configure(engine)
+    summary = engine.run(int(args.duration * 1_000_000))
+    print(json.dumps(summary, indent=2))
+    for line in engine.logger.get_logs_since(limit=args.tail)['events'] if args.tail else []:
+        print(line)
+
+if __name__ == '__main__':
+    main()
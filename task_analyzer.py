@@ -4,40 +4,59 @@ Analyzes task performance and timing
 """
 
 import time
+from metrics import LatencyHistogram
+
+class TaskMetrics:
+    """Execution- and response-time histograms for one task"""
+    __slots__ = ('execution', 'response')
+    
+    def __init__(self):
+        self.execution = LatencyHistogram()
+        self.response = LatencyHistogram()
 
 class TaskAnalyzer:
     def __init__(self, logger, rtos):
         self.logger = logger
         self.rtos = rtos
-        self.task_metrics = {
-            'BrakeTask': {'runs': 0, 'total_time': 0, 'min': float('inf'), 'max': 0},
-            'CollisionTask': {'runs': 0, 'total_time': 0, 'min': float('inf'), 'max': 0},
-            'SpeedTask': {'runs': 0, 'total_time': 0, 'min': float('inf'), 'max': 0}
-        }
+        self.task_metrics = {name: TaskMetrics() for name in rtos.tasks}
+        # Bumped on every recorded job, so readers can tell when metrics changed
+        self.version = 0
+        
+        rtos.add_completion_listener(self.on_job_complete)
+    
+    def on_job_complete(self, job, release_us, end_us, execution_us):
+        """RTOSSimulator completion listener"""
+        self.record_execution(job.task.name, execution_us, end_us - release_us)
     
-    def record_execution(self, task_name, execution_time_us):
+    def record_execution(self, task_name, execution_time_us, response_time_us=None):
         """Record task execution metric"""
-        if task_name in self.task_metrics:
-            metrics = self.task_metrics[task_name]
-            metrics['runs'] += 1
-            metrics['total_time'] += execution_time_us
-            metrics['min'] = min(metrics['min'], execution_time_us)
-            metrics['max'] = max(metrics['max'], execution_time_us)
+        metrics = self.task_metrics.get(task_name)
+        if metrics is None:
+            metrics = self.task_metrics.setdefault(task_name, TaskMetrics())
+        metrics.execution.record(execution_time_us)
+        self.version += 1
+        if response_time_us is not None:
+            metrics.response.record(response_time_us)
     
     def analyze_tasks(self):
         """Analyze all tasks"""
         analysis = {}
+        uptime_us = (time.time() - self.rtos.start_time) * 1_000_000
         
-        for task_name, metrics in self.task_metrics.items():
-            if metrics['runs'] > 0:
-                avg_time = metrics['total_time'] / metrics['runs']
+        for task_name in list(self.rtos.tasks):
+            metrics = self.task_metrics.get(task_name)
+            execution = metrics.execution.snapshot() if metrics else {'count': 0}
+            if execution['count'] > 0:
+                total_time = metrics.execution.total
                 analysis[task_name] = {
-                    'runs': metrics['runs'],
-                    'total_time_us': metrics['total_time'],
-                    'avg_time_us': f"{avg_time:.2f}",
-                    'min_time_us': metrics['min'],
-                    'max_time_us': metrics['max'],
-                    'cpu_percentage': f"{(metrics['total_time'] / 1_000_000) * 100:.2f}"
+                    'runs': execution['count'],
+                    'total_time_us': total_time,
+                    'avg_time_us': f"{execution['mean_us']:.2f}",
+                    'min_time_us': execution['min_us'],
+                    'max_time_us': execution['max_us'],
+                    'cpu_percentage': f"{total_time / uptime_us * 100:.2f}" if uptime_us else "0.00",
+                    'execution': execution,
+                    'response': metrics.response.snapshot()
                 }
             else:
                 analysis[task_name] = {'runs': 0, 'status': 'never_executed'}
@@ -0,0 +1,236 @@
+"""
+Task Registry - Declarative Task Model
+Periodic and sporadic task specifications with a single-thread release timer
+"""
+
+import heapq
+import itertools
+import json
+import threading
+import time
+from event_store import MAX_PRIORITY
+from timing import preemptible_wait
+
+PERIODIC = 'periodic'
+SPORADIC = 'sporadic'
+
+class TaskSpec:
+    """Timing parameters of one task.
+    
+    Periodic tasks are released every period_us by the release timer;
+    sporadic tasks are released by an interrupt from their bound sensor,
+    and period_us, if given, is their minimum inter-arrival time.
+    `resources` maps each mutex a job takes to its critical-section length
+    in μs (sections are not nested). The log offsets place
+    TASK_START/TASK_END on the event log's demo timeline.
+    """
+    __slots__ = ('name', 'kind', 'period_us', 'wcet_us', 'deadline_us', 'priority',
+                 'sensor', 'sensor_priority', 'resources', 'offset_us', 'log_offset_us',
+                 'log_duration_us')
+    
+    FIELDS = __slots__
+    
+    def __init__(self, name, kind, wcet_us, deadline_us, priority, period_us=None,
+                 sensor=None, sensor_priority=None, resources=None, offset_us=0,
+                 log_offset_us=0, log_duration_us=None):
+        self.name = name
+        self.kind = kind
+        self.period_us = period_us
+        self.wcet_us = wcet_us
+        self.deadline_us = deadline_us
+        self.priority = priority
+        self.sensor = sensor
+        self.sensor_priority = priority if sensor_priority is None else sensor_priority
+        self.resources = dict(resources or {})
+        self.offset_us = offset_us
+        self.log_offset_us = log_offset_us
+        self.log_duration_us = wcet_us if log_duration_us is None else log_duration_us
+    
+    @classmethod
+    def from_dict(cls, config):
+        """Build a validated spec from a config mapping; raises ValueError"""
+        if not isinstance(config, dict):
+            raise ValueError("Task spec must be an object")
+        unknown = set(config) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown task spec fields: {', '.join(sorted(unknown))}")
+        for field in ('name', 'kind', 'wcet_us', 'deadline_us', 'priority'):
+            if field not in config:
+                raise ValueError(f"Task spec is missing '{field}'")
+        
+        name = config['name']
+        if not isinstance(name, str) or not name:
+            raise ValueError("name must be a non-empty string")
+        if config['kind'] not in (PERIODIC, SPORADIC):
+            raise ValueError(f"kind must be '{PERIODIC}' or '{SPORADIC}'")
+        for field in ('wcet_us', 'deadline_us', 'period_us', 'offset_us', 'priority', 'sensor_priority',
+                      'log_offset_us', 'log_duration_us'):
+            value = config.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+                raise ValueError(f"{field} must be a non-negative integer")
+        for field in ('priority', 'sensor_priority'):
+            if config.get(field) is not None and config[field] > MAX_PRIORITY:
+                raise ValueError(f"{field} must be at most {MAX_PRIORITY}")
+        if config['wcet_us'] <= 0 or config['deadline_us'] <= 0:
+            raise ValueError("wcet_us and deadline_us must be positive")
+        if config['kind'] == PERIODIC and not config.get('period_us'):
+            raise ValueError("Periodic tasks need a positive period_us")
+        if config.get('sensor') is not None and not isinstance(config['sensor'], str):
+            raise ValueError("sensor must be a string")
+        if config['kind'] == SPORADIC and not config.get('sensor'):
+            raise ValueError("Sporadic tasks need a sensor binding")
+        resources = config.get('resources') or {}
+        if not isinstance(resources, dict) or not all(
+                isinstance(mutex, str) and isinstance(length, int) and not isinstance(length, bool)
+                and length > 0 for mutex, length in resources.items()):
+            raise ValueError("resources must map mutex names to positive critical-section lengths (μs)")
+        if sum(resources.values()) > config['wcet_us']:
+            raise ValueError("Critical sections cannot exceed wcet_us")
+        return cls(**config)
+    
+    def to_dict(self):
+        spec = {field: getattr(self, field) for field in self.FIELDS}
+        spec['resources'] = dict(self.resources)
+        return spec
+
+# The three demo tasks; their log offsets reproduce the original demo timeline
+BUILTIN_TASKS = (
+    TaskSpec('BrakeTask', SPORADIC, wcet_us=50, deadline_us=5000, priority=7, sensor='Brake',
+             resources={'brake_mutex': 50}, log_offset_us=1_000_000, log_duration_us=2_000_000),
+    TaskSpec('CollisionTask', SPORADIC, wcet_us=40, deadline_us=10000, priority=6, sensor='Collision',
+             resources={'collision_mutex': 40}, log_offset_us=1_000_000, log_duration_us=3_000_000),
+    TaskSpec('SpeedTask', SPORADIC, wcet_us=30, deadline_us=20000, priority=5, sensor='Speed',
+             resources={'speed_mutex': 30}, log_offset_us=2_000_000, log_duration_us=4_000_000),
+)
+
+class RegisteredTask:
+    """Task declared through the registry: burns its WCET at preemption-point
+    granularity, holding each declared mutex for its critical section"""
+    __slots__ = ('spec', 'shared_resources', 'name', 'priority', 'base_priority', 'state',
+                 'wcet_us', 'execution_count')
+    
+    def __init__(self, spec, shared_resources):
+        self.spec = spec
+        self.shared_resources = shared_resources
+        self.name = spec.name
+        self.priority = spec.priority
+        self.base_priority = spec.priority
+        self.state = "BLOCKED"
+        self.wcet_us = spec.wcet_us
+        self.execution_count = 0
+    
+    def process(self, data):
+        """Registered tasks publish no sensor fields"""
+        return {}
+    
+    def steps(self, message_seq=None):
+        """Execute one job; yields at preemption points (registered tasks take no messages)"""
+        self.execution_count += 1
+        yield
+        remaining_us = self.wcet_us
+        for mutex_name, section_us in self.spec.resources.items():
+            mutex = self.shared_resources.get_mutex(mutex_name)
+            yield from mutex.acquire(self)
+            try:
+                yield from preemptible_wait(section_us)
+            finally:
+                mutex.release(self)
+            remaining_us -= section_us
+        yield from preemptible_wait(max(remaining_us, 0))
+
+class TaskRegistry:
+    """Declares tasks and wires them into the scheduler, interrupts and deadlines.
+    
+    Every periodic task is released from one timer thread that sleeps on a
+    heap of next-release times, so hundreds of periodic tasks cost a single
+    thread and O(log n) per release.
+    """
+    
+    def __init__(self, logger, rtos, interrupt_controller, deadline_monitor):
+        self.logger = logger
+        self.rtos = rtos
+        self.interrupt_controller = interrupt_controller
+        self.deadline_monitor = deadline_monitor
+        self.specs = {name: task.spec for name, task in rtos.tasks.items()}
+        self.periods = {name: spec.period_us for name, spec in self.specs.items() if spec.period_us}
+        
+        # Release timer: heap of (release_ns, seq, spec)
+        self.releases = []
+        self.release_seq = itertools.count()
+        self.release_condition = threading.Condition()
+        self.released = 0
+        self.skipped_releases = 0
+    
+    def register(self, config):
+        """Declare a task from a spec mapping; raises ValueError if it is invalid"""
+        spec = TaskSpec.from_dict(config)
+        if spec.name in self.rtos.tasks:
+            raise ValueError(f"Task already registered: {spec.name}")
+        if spec.sensor is not None and spec.sensor in self.interrupt_controller.interrupt_map:
+            raise ValueError(f"Sensor already bound: {spec.sensor}")
+        
+        # The sensor can still be refused, so bind it before the task is visible;
+        # an interrupt for a task not added yet is ignored by signal_task()
+        if spec.sensor is not None:
+            self.interrupt_controller.register_sensor(spec.sensor, spec.sensor_priority, spec.name)
+        self.rtos.add_task(RegisteredTask(spec, self.rtos.shared_resources))
+        self.deadline_monitor.add_task(spec.name, spec.deadline_us)
+        self.specs[spec.name] = spec
+        if spec.period_us:
+            self.periods[spec.name] = spec.period_us
+        if spec.kind == PERIODIC:
+            first_release = time.perf_counter_ns() + spec.offset_us * 1000
+            with self.release_condition:
+                heapq.heappush(self.releases, (first_release, next(self.release_seq), spec))
+                self.release_condition.notify()
+        return spec
+    
+    def load_file(self, path):
+        """Register every task in a JSON file holding a list of task specs"""
+        with open(path) as f:
+            configs = json.load(f)
+        if not isinstance(configs, list):
+            raise ValueError(f"{path}: expected a list of task specs")
+        return [self.register(config) for config in configs]
+    
+    def run_releases(self):
+        """Release timer loop: signal each periodic task at its release time"""
+        while True:
+            with self.release_condition:
+                while True:
+                    now = time.perf_counter_ns()
+                    if self.releases and self.releases[0][0] <= now:
+                        release_ns, _, spec = heapq.heappop(self.releases)
+                        break
+                    timeout = (self.releases[0][0] - now) / 1e9 if self.releases else None
+                    self.release_condition.wait(timeout)
+                
+                # Releases the timer fell more than a period behind on are skipped
+                period_ns = spec.period_us * 1000
+                missed = (now - release_ns) // period_ns
+                self.skipped_releases += missed
+                release_ns += missed * period_ns
+                heapq.heappush(self.releases, (release_ns + period_ns, next(self.release_seq), spec))
+                self.released += 1
+            try:
+                self.rtos.signal_task(spec.name, release_ns)
+            except Exception as e:
+                self.logger.log(f"[ERROR] Periodic release of {spec.name} failed: {str(e)}")
+    
+    def get_tasks(self):
+        """Declared tasks with their live state"""
+        tasks = []
+        for name, spec in self.specs.items():
+            task = self.rtos.tasks[name]
+            tasks.append({**spec.to_dict(), 'state': task.state, 'execution_count': task.execution_count})
+        return tasks
+    
+    def get_statistics(self):
+        with self.release_condition:
+            pending = len(self.releases)
+        return {
+            'registered_tasks': len(self.specs),
+            'periodic_tasks': pending,
+            'releases': self.released,
+            'skipped_releases': self.skipped_releases
+        }
@@ -1,6 +1,7 @@
 """Collision Task Implementation - Fixed"""
 
 import time
+from timing import preemptible_wait
 
 class CollisionTask:
     def __init__(self, logger, shared_resources):
@@ -12,37 +13,54 @@ class CollisionTask:
         self.wcet_us = 40  # 40 microseconds
         self.execution_count = 0
     
-    def run(self):
-        """Execute collision detection task"""
+    def process(self, data):
+        """Collision detection logic"""
+        return {
+            'speed': data.get('speed', 0),
+            'temperature': data.get('temperature', 25),
+            'collision_status': 'Monitoring',
+            'brake_status': data.get('brake_status', 'Off')
+        }
+    
+    def steps(self, message_seq=None):
+        """Execute collision detection task; yields at preemption points.
+        
+        message_seq numbers the payload this job's interrupt posted, if any.
+        """
         timestamp_start = int(time.time_ns() // 1000)
         self.execution_count += 1
         
-        # Acquire semaphore
-        self.shared_resources.acquire_semaphore('collision_sem')
+        # Acquire mutex; yields while another task holds it
+        yield from self.shared_resources.acquire_mutex('collision_mutex', self)
         
         try:
-            # Read sensor data
-            data = self.shared_resources.read_data()
+            # Sensor payload posted by this job's ISR, if any
+            message = self.shared_resources.take_message('collision_queue', message_seq) or {}
+            
+            # Read the current snapshot (no lock, no copy)
+            snapshot = self.shared_resources.snapshot()
             
             # Collision detection logic
-            processed_data = {
-                'speed': data.get('speed', 0),
-                'temperature': data.get('temperature', 25),
-                'collision_status': 'Monitoring',
-                'brake_status': data.get('brake_status', 'Off')
-            }
+            processed_data = self.process({**snapshot.data, **message})
+            yield
             
             # Accurate timing
-            execution_duration_us = self.wcet_us
-            start_time = time.perf_counter()
-            while time.perf_counter() - start_time < (execution_duration_us / 1_000_000):
-                pass
+            yield from preemptible_wait(self.wcet_us)
             
-            # Write updated data
-            self.shared_resources.write_data(processed_data)
+            # Publish only the fields this job changed; if another task changed
+            # one of them meanwhile, recompute from the newer snapshot
+            while not self.shared_resources.update_fields(snapshot, processed_data):
+                snapshot = self.shared_resources.snapshot()
+                processed_data = self.process({**snapshot.data, **message})
             
         finally:
-            self.shared_resources.release_semaphore('collision_sem')
+            self.shared_resources.release_mutex('collision_mutex', self)
             
             timestamp_end = int(time.time_ns() // 1000)
             actual_duration = timestamp_end - timestamp_start
+    
+    def run(self):
+        """Run one job to completion, blocking this thread on a held mutex"""
+        for blocker in self.steps():
+            if blocker is not None:
+                blocker.wait_until_free()
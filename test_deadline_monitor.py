@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the deadline watchdog's overrun policies
+Run with: python -m pytest test_deadline_monitor.py
+"""
+
+import pytest
+
+from deadline_monitor import DEMOTE, DeadlineMonitor
+from interrupt_controller import InterruptController
+from logger import Logger
+from rtos_simulator import RTOSSimulator
+from shared_resources import SharedResources
+
+@pytest.fixture
+def system():
+    logger = Logger()
+    rtos = RTOSSimulator(logger, SharedResources(logger), InterruptController(logger))
+    return rtos, DeadlineMonitor(logger, rtos, policy=DEMOTE)
+
+def release(rtos, task_name):
+    rtos.signal_task(task_name)
+    return rtos.ready_queue[0][5]
+
+def dispatch_all(rtos):
+    while (entry := rtos.next_ready(timeout=0)) is not None:
+        rtos.dispatch(entry)
+
+def test_completed_demoted_job_gets_its_priority_back(system):
+    rtos, monitor = system
+    task = rtos.tasks['SpeedTask']
+    base = task.priority
+    job = release(rtos, 'SpeedTask')
+    monitor.on_overrun(job)
+    assert task.priority == DeadlineMonitor.DEMOTED_PRIORITY
+    
+    dispatch_all(rtos)
+    assert task.priority == base
+    assert monitor.demoted == {}
+
+def test_aborted_demoted_job_gets_its_priority_back(system):
+    rtos, monitor = system
+    task = rtos.tasks['SpeedTask']
+    base = task.priority
+    job = release(rtos, 'SpeedTask')
+    monitor.on_overrun(job)
+    assert task.priority == DeadlineMonitor.DEMOTED_PRIORITY
+    
+    rtos.abort_job(job)
+    dispatch_all(rtos)
+    assert task.state == "BLOCKED"
+    assert task.priority == base
+    assert monitor.demoted == {}
+
+def test_aborted_job_disarms_its_deadline_timer(system):
+    rtos, monitor = system
+    job = release(rtos, 'BrakeTask')
+    assert len(monitor.timer_wheel) == 1
+    
+    rtos.abort_job(job)
+    dispatch_all(rtos)
+    assert len(monitor.timer_wheel) == 0
+    assert not job.deadline_timer.active
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the on-disk event journal: rotation, retention, readback and restart
+Run with: python -m pytest test_event_journal.py
+"""
+
+import os
+import subprocess
+import sys
+
+from event_journal import EventJournal, RECORD
+from event_store import EventKind
+
+def fill(journal, batches, per_batch=100):
+    for batch in range(batches):
+        journal.append([(1000 + batch * per_batch + i, EventKind.TASK_START, f"Task{i % 3}", i % 8, None)
+                        for i in range(per_batch)])
+
+def test_rotation_and_retention(tmp_path):
+    journal = EventJournal(str(tmp_path), segment_bytes=16 * 1024, max_segments=3)
+    fill(journal, 40)
+    stats = journal.get_statistics()
+    assert stats['rotations'] > 3
+    assert stats['segments'] == 3
+    assert stats['deleted_segments'] == stats['rotations'] - 2
+    assert stats['next_seq'] == 4000
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.rec')]) == 3
+    
+    # Only the retained tail is readable, in order and without gaps
+    seqs = [seq for seq, *_ in journal.read()]
+    assert seqs == list(range(stats['first_seq'], 4000))
+    journal.close()
+
+def test_export_survives_retention_deleting_its_segments(tmp_path):
+    journal = EventJournal(str(tmp_path), segment_bytes=16 * 1024, max_segments=3)
+    fill(journal, 12)
+    reader = journal.read()
+    first_seq = next(reader)[0]
+    
+    # Retention deletes every segment the reader snapshotted, .rec first
+    fill(journal, 40)
+    seqs = [first_seq] + [seq for seq, *_ in reader]
+    assert seqs == list(range(first_seq, first_seq + len(seqs)))
+    
+    # Caught between deleting a segment's .rec and its .str
+    reader = journal.read()
+    first_seq = next(reader)[0]
+    os.remove(journal.path(journal.segments[1].base, '.rec'))
+    seqs = [first_seq] + [seq for seq, *_ in reader]
+    assert seqs[-1] == journal.next_seq - 1
+    assert journal.segments[1].first_seq not in seqs
+    journal.close()
+
+def test_time_range_and_filters(tmp_path):
+    journal = EventJournal(str(tmp_path), segment_bytes=16 * 1024, max_segments=100)
+    fill(journal, 20)
+    journal.append([(2500, EventKind.MESSAGE, None, -1, "[SYSTEM] ünïcode detail")])
+    
+    events = list(journal.read(since_us=2500, until_us=2502))
+    assert [(timestamp_us, kind) for _, timestamp_us, kind, *_ in events] == [
+        (2500, EventKind.TASK_START), (2501, EventKind.TASK_START),
+        (2502, EventKind.TASK_START), (2500, EventKind.MESSAGE)]
+    assert events[-1][5] == "[SYSTEM] ünïcode detail"
+    
+    lines = list(journal.render(since_us=2500, until_us=2500, kinds={EventKind.TASK_START}, subject='Task0'))
+    assert lines == ["[2500] TASK_START: Task0 - Priority: 0"]
+    journal.close()
+
+def test_restart_continues_sequence_and_drops_torn_record(tmp_path):
+    journal = EventJournal(str(tmp_path), segment_bytes=16 * 1024)
+    fill(journal, 3)
+    journal.close()
+    active = sorted(name for name in os.listdir(tmp_path) if name.endswith('.rec'))[-1]
+    with open(tmp_path / active, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    
+    reopened = EventJournal(str(tmp_path), segment_bytes=16 * 1024)
+    assert reopened.next_seq == 300
+    assert os.path.getsize(tmp_path / active) % RECORD.size == 0
+    reopened.append([(99, EventKind.TASK_END, 'Task1', 3, None)])
+    assert list(reopened.render(since_us=99, until_us=99)) == ["[99] TASK_END: Task1"]
+    assert [seq for seq, *_ in reopened.read(until_us=99)] == [300]
+    reopened.close()
+
+def test_cli_renders_range(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    fill(journal, 2)
+    journal.close()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'event_journal.py')
+    result = subprocess.run([sys.executable, script, str(tmp_path), '--since-us', '1000', '--until-us', '1001',
+                             '--kind', 'TASK_START'], capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines() == ["[1000] TASK_START: Task0 - Priority: 0",
+                                          "[1001] TASK_START: Task1 - Priority: 1"]
+
+def test_importing_run_creates_no_journal(tmp_path):
+    """The journal is opened by start_journal(), not as a side effect of `import run`"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    subprocess.run([sys.executable, '-c', f"import sys; sys.path.insert(0, {root!r}); import run; "
+                    "assert run.journal is None"], cwd=tmp_path, check=True, capture_output=True)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the indexed event store: indexing, queries and eviction
+Run with: python -m pytest test_event_store.py
+"""
+
+import pytest
+
+from benchmark_query import fill, scan
+from event_store import TIME_BLOCK, EventKind, EventStore
+
+def test_append_record_and_render():
+    store = EventStore(capacity=10)
+    seq = store.append(100, EventKind.TASK_START, 'BrakeTask', 7)
+    assert seq == 0
+    assert store.record(seq) == {'seq': 0, 'timestamp_us': 100, 'kind': 'TASK_START',
+                                 'subject': 'BrakeTask', 'priority': 7, 'detail': None}
+    assert store.render(seq) == "[100] TASK_START: BrakeTask - Priority: 7"
+
+def test_counts_and_queries_use_the_indexes():
+    store = EventStore(capacity=100)
+    for i in range(30):
+        store.append(i, EventKind.TASK_START if i % 2 else EventKind.TASK_END, f'Task{i % 3}', i % 3)
+    assert store.count(EventKind.TASK_START) == 15
+    assert store.count(subject='Task0') == 10
+    assert store.count(EventKind.TASK_START, 'Task0') == 5
+    assert store.count(subject='Unknown') == 0
+    assert store.query(EventKind.TASK_START, 'Task0') == [3, 9, 15, 21, 27]
+    assert store.query(EventKind.TASK_START, 'Task0', since_us=10, limit=2) == [21, 27]
+
+def test_eviction_keeps_counts_and_postings_in_step():
+    capacity = TIME_BLOCK * 2
+    store = EventStore(capacity=capacity)
+    total = capacity + TIME_BLOCK + 10
+    for i in range(total):
+        store.append(i, EventKind.TASK_START, 'Old' if i < TIME_BLOCK else 'New', 1)
+    
+    assert len(store) == capacity
+    assert store.first_seq == total - capacity
+    assert store.count(subject='Old') == 0
+    assert store.count(EventKind.TASK_START, 'New') == capacity
+    # Postings of a fully evicted time block are trimmed, not just skipped
+    assert len(store.subject_index[store.subject_ids['Old']]) == 0
+    assert store.kind_index[EventKind.TASK_START][0] >= TIME_BLOCK
+    assert store.search(subject='Old') == ([], False)
+    assert store.search(since_us=0, until_us=store.first_seq - 1) == ([], False)
+
+@pytest.mark.parametrize('filters', [
+    dict(kinds={EventKind.TASK_PREEMPT}),
+    dict(subject='LidarTask3'),
+    dict(kinds={EventKind.TASK_START, EventKind.TASK_END}, subject='BrakeTask'),
+    dict(priority=6),
+    dict(kinds={EventKind.INTERRUPT}, since_us=1_010_000, until_us=1_012_000),
+    dict(subject='SpeedTask', since_us=1_700_000_000_050_000),
+])
+def test_search_matches_a_full_scan_after_wraparound(filters):
+    store = EventStore(capacity=3 * TIME_BLOCK)
+    fill(store, 5 * TIME_BLOCK + 123, seed=1)
+    seqs, more = store.search(**filters, limit=50)
+    expected = scan(store, **filters, limit=51)
+    assert seqs == expected[:50]
+    assert more == (len(expected) > 50)
+    
+    # Paging with after_seq continues where the previous page stopped
+    if more:
+        next_page, _ = store.search(**filters, after_seq=seqs[-1], limit=50)
+        assert next_page == scan(store, **filters, limit=100)[50:]
+
+def test_rejected_append_leaves_store_consistent():
+    store = EventStore(capacity=4)
+    for i in range(4):
+        store.append(i, EventKind.TASK_START, 'A', 1)
+    with pytest.raises(OverflowError):
+        store.append(4, EventKind.TASK_START, 'B', 500)
+    assert store.next_seq == 4
+    assert store.search(subject='B') == ([], False)
+    assert store.count(EventKind.TASK_START) == len(store)
+    seq = store.append(5, EventKind.TASK_END, 'A')
+    assert store.record(seq)['kind'] == 'TASK_END'
+    assert store.query(subject='A')[-1] == seq
+
+def test_clear_keeps_sequence_numbers_increasing():
+    store = EventStore(capacity=10)
+    store.append(1, EventKind.TASK_START, 'A', 1)
+    store.clear()
+    assert len(store) == 0
+    assert store.count(EventKind.TASK_START) == 0
+    assert store.append(2, EventKind.TASK_START, 'A', 1) == 1
+    assert store.query(subject='A') == [1]
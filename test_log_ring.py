@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the lock-free log hand-off ring
+Run with: python -m pytest test_log_ring.py
+"""
+
+import threading
+
+import pytest
+
+from log_ring import LogRing
+
+def test_slots_must_be_power_of_two():
+    with pytest.raises(ValueError):
+        LogRing(list.extend, slots=1000)
+
+def test_drain_preserves_order():
+    drained = []
+    ring = LogRing(drained.extend, slots=16)
+    for i in range(10):
+        ring.put(i)
+    assert ring.drain() == 10
+    assert drained == list(range(10))
+    assert ring.drain() == 0
+
+def test_lapping_producer_drains_instead_of_dropping():
+    drained = []
+    ring = LogRing(drained.extend, slots=8)
+    for i in range(100):
+        ring.put(i)
+    ring.drain()
+    assert drained == list(range(100))
+    assert ring.get_statistics()['producer_drains'] > 0
+
+def test_concurrent_producers_lose_nothing():
+    drained = []
+    ring = LogRing(drained.extend, slots=64)
+    
+    def produce(producer):
+        for i in range(5000):
+            ring.put((producer, i))
+    
+    producers = [threading.Thread(target=produce, args=(p,)) for p in range(4)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    ring.drain()
+    
+    assert len(drained) == 20000
+    for p in range(4):
+        # Each producer's records come out in the order it put them
+        assert [i for producer, i in drained if producer == p] == list(range(5000))
+
+def test_failing_sink_counts_lost_batch():
+    def sink(batch):
+        raise OSError("disk full")
+    
+    ring = LogRing(sink, slots=8)
+    ring.put('a')
+    ring.put('b')
+    with pytest.raises(OSError):
+        ring.drain()
+    assert ring.get_statistics()['lost_records'] == 2
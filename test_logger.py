@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Logger in synchronous and deferred mode, and per-record error handling
+Run with: python -m pytest test_logger.py
+"""
+
+import time
+
+from event_journal import EventJournal
+from event_store import EventKind
+from logger import Logger
+
+def test_bad_record_does_not_lose_its_batch(tmp_path):
+    journal = EventJournal(str(tmp_path / 'journal'))
+    persist_path = tmp_path / 'events.log'
+    logger = Logger(deferred=True, ring_slots=64, persist_path=str(persist_path), journal=journal)
+    
+    logger.log_event(EventKind.INTERRUPT, 'Brake', 7, 'INT0', timestamp_us=1)
+    logger.log_event(EventKind.TASK_START, 'HugeTask', 200, timestamp_us=2)  # overflows array('b')
+    logger.log_event(EventKind.TASK_END, 'BrakeTask', timestamp_us=3)
+    logger.log("[SYSTEM] after the bad record")
+    
+    logs = logger.get_logs()
+    assert logs[:2] == ["[1] INTERRUPT: Brake (INT0) - Priority: 7", "[3] TASK_END: BrakeTask"]
+    assert logs[2] == "[SYSTEM] after the bad record"
+    assert len(logs) == 3
+    
+    stats = logger.get_writer_statistics()
+    assert stats['rejected_records'] == 1
+    assert 'HugeTask' in stats['last_rejection']
+    assert stats['lost_records'] == 0
+    
+    # The records that stored were journaled and persisted too
+    assert list(journal.render()) == logs
+    assert persist_path.read_text(encoding='utf-8').splitlines() == logs
+
+def test_synchronous_batch_journals_events_stored_before_a_failure(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    logger = Logger(journal=journal)
+    try:
+        logger.log_events([(EventKind.TASK_START, 'A', 1, None, 10),
+                           (EventKind.TASK_START, 'B', 300, None, 11)])
+    except OverflowError:
+        pass
+    assert logger.get_logs() == ["[10] TASK_START: A - Priority: 1"]
+    assert list(journal.render()) == logger.get_logs()
+
+def test_event_store_stays_consistent_after_rejected_append():
+    logger = Logger(max_logs=2)
+    logger.log_event(EventKind.TASK_START, 'A', 1, timestamp_us=1)
+    logger.log_event(EventKind.TASK_START, 'B', 2, timestamp_us=2)
+    try:
+        logger.log_event(EventKind.TASK_START, 'C', 999, timestamp_us=3)
+    except OverflowError:
+        pass
+    logger.log_event(EventKind.TASK_END, 'B', timestamp_us=4)
+    assert logger.count_events(EventKind.TASK_START) == logger.get_logs().count("[2] TASK_START: B - Priority: 2")
+    assert logger.get_logs()[-1] == "[4] TASK_END: B"
+
+def test_batch_without_timestamps_is_stamped_now_in_both_modes():
+    for logger in (Logger(), Logger(deferred=True, ring_slots=64)):
+        before_us = int(time.time() * 1_000_000)
+        logger.log_events([(EventKind.TASK_START, 'A', 1, None, None),
+                           (EventKind.TASK_END, 'A', 1, None, None)])
+        after_us = int(time.time() * 1_000_000) + 1
+        records = logger.query_events()
+        assert [record['kind'] for record in records] == ['TASK_START', 'TASK_END']
+        assert all(before_us <= record['timestamp_us'] <= after_us for record in records)
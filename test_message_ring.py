@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ISR-to-task message rings and the payload hand-off to jobs
+Run with: python -m pytest test_message_ring.py
+"""
+
+import pytest
+
+from interrupt_controller import InterruptController
+from logger import Logger
+from message_ring import DROP_NEWEST, DROP_OLDEST, MessageRing
+from rtos_simulator import RTOSSimulator
+from shared_resources import SharedResources
+
+@pytest.fixture
+def rtos():
+    logger = Logger()
+    return RTOSSimulator(logger, SharedResources(logger), InterruptController(logger))
+
+def dispatch_one(rtos):
+    rtos.dispatch(rtos.next_ready(timeout=0))
+
+def test_take_skips_frames_left_by_earlier_jobs():
+    ring = MessageRing('test', slots=4, policy=DROP_NEWEST)
+    for speed in (10, 20, 30):
+        assert ring.put({'speed': speed})
+    
+    assert ring.take(1) == {'speed': 20}
+    assert ring.skipped == 1
+    assert ring.take(1) is None
+    assert ring.take(3) is None
+    assert ring.take(2) == {'speed': 30}
+    assert len(ring) == 0
+
+def test_take_of_an_overwritten_frame_returns_none():
+    ring = MessageRing('test', slots=2, policy=DROP_OLDEST)
+    for speed in (10, 20, 30):
+        ring.put({'speed': speed})
+    
+    assert ring.take(0) is None
+    assert ring.take(2) == {'speed': 30}
+
+def test_each_job_gets_the_payload_of_its_own_trigger(rtos):
+    rtos.interrupt_controller.trigger_batch([
+        {'sensor': 'Speed', 'payload': {'speed': 77}},
+        {'sensor': 'Speed'},
+        {'sensor': 'Speed', 'payload': {'speed': 55}},
+    ])
+    rtos.interrupt_controller.process_interrupts()
+    shared = rtos.shared_resources
+    
+    dispatch_one(rtos)
+    assert shared.snapshot().data['speed'] == 77
+    
+    # The trigger without a payload must leave the next job's frame queued
+    dispatch_one(rtos)
+    assert shared.snapshot().data['speed'] == 77
+    assert len(shared.msg_queues['speed_queue']) == 1
+    
+    dispatch_one(rtos)
+    assert shared.snapshot().data['speed'] == 55
+    assert len(shared.msg_queues['speed_queue']) == 0
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the polling endpoints' response cache
+Run with: python -m pytest test_response_cache.py
+"""
+
+import threading
+import time
+
+import run
+from response_cache import ResponseCache
+
+def test_body_is_reused_until_the_version_changes():
+    cache = ResponseCache(ttl_s=60)
+    builds = []
+    def build():
+        builds.append(None)
+        return f"body {len(builds)}".encode()
+    
+    assert cache.get('ep', 1, build)[0] == b"body 1"
+    assert cache.get('ep', 1, build)[0] == b"body 1"
+    assert cache.get('ep', 2, build)[0] == b"body 2"
+    counts = cache.get_statistics()['endpoints']['ep']
+    assert (counts['hits'], counts['misses']) == (1, 2)
+
+def test_etag_follows_the_body_across_ttl_rebuilds():
+    cache = ResponseCache(ttl_s=0.01)
+    bodies = iter([b"uptime 1", b"uptime 2", b"uptime 2"])
+    build = lambda: next(bodies)
+    
+    body1, etag1 = cache.get('ep', 7, build)
+    time.sleep(0.02)
+    body2, etag2 = cache.get('ep', 7, build)
+    # Same version, but the time-based fields moved: the client must see it
+    assert body1 != body2
+    assert etag1 != etag2
+    time.sleep(0.02)
+    assert cache.get('ep', 7, build)[1] == etag2
+
+def test_concurrent_requests_coalesce_on_one_build():
+    cache = ResponseCache(ttl_s=60)
+    started = threading.Event()
+    release = threading.Event()
+    builds = []
+    def build():
+        builds.append(None)
+        started.set()
+        release.wait(5)
+        return b"body"
+    
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get('ep', 1, build)))
+    first.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get('ep', 2, build))) for _ in range(8)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [first] + waiters:
+        thread.join()
+    
+    # The waiters arrived during the first build, so one more build serves them all
+    assert len(builds) == 2
+    assert len(results) == 9
+    counts = cache.get_statistics()['endpoints']['ep']
+    assert counts['misses'] == 2
+    assert counts['coalesced'] == 7
+
+def test_system_stats_revalidates_to_a_new_body_after_the_ttl():
+    client = run.app.test_client()
+    first = client.get('/api/system-stats')
+    etag = first.headers['ETag']
+    
+    response = client.get('/api/system-stats', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    
+    # Idle system: the version stands still but uptime advances
+    time.sleep(run.RESPONSE_CACHE_TTL_S + 0.1)
+    response = client.get('/api/system-stats', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['uptime'] > first.get_json()['uptime']
+
+def test_since_version_304_carries_cache_headers():
+    client = run.app.test_client()
+    version = client.get('/api/sensor-data').get_json()['version']
+    response = client.get(f'/api/sensor-data?since_version={version}')
+    assert response.status_code == 304
+    assert response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.data == b''
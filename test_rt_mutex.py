@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit tests for priority-inheritance mutexes and deadlock detection
+Run with: python -m pytest test_rt_mutex.py
+"""
+
+import pytest
+
+from rt_mutex import LockMonitor
+
+class Task:
+    def __init__(self, name, priority):
+        self.name = name
+        self.priority = priority
+
+def test_uncontended_acquire_and_release():
+    mutex = LockMonitor().create('m')
+    task = Task('A', 1)
+    assert list(mutex.acquire(task)) == []
+    assert mutex.owner is task
+    mutex.release(task)
+    stats = mutex.get_statistics()
+    assert (stats['owner'], stats['acquisitions'], stats['contentions']) == (None, 1, 0)
+
+def test_owner_inherits_waiter_priority_until_release():
+    mutex = LockMonitor().create('m')
+    low, high = Task('Low', 1), Task('High', 7)
+    assert mutex.try_acquire(low)
+    
+    steps = mutex.acquire(high)
+    assert next(steps) is mutex  # high is parked on the mutex
+    assert low.priority == 7
+    assert mutex.get_statistics()['priority_boosts'] == 1
+    
+    mutex.release(low)
+    assert low.priority == 1
+    assert list(steps) == []
+    assert mutex.owner is high
+    assert mutex.get_statistics()['wait_time']['count'] == 1
+
+def test_release_keeps_priority_still_owed_on_other_mutexes():
+    monitor = LockMonitor()
+    m1, m2 = monitor.create('m1'), monitor.create('m2')
+    low, mid, high = Task('Low', 1), Task('Mid', 4), Task('High', 7)
+    assert m1.try_acquire(low) and m2.try_acquire(low)
+    assert not m2.try_acquire(mid)
+    assert not m1.try_acquire(high)
+    assert low.priority == 7
+    
+    m1.release(low)
+    assert low.priority == 4  # Mid still waits on m2
+    m2.release(low)
+    assert low.priority == 1
+
+def test_ownership_errors():
+    mutex = LockMonitor().create('m')
+    a, b = Task('A', 1), Task('B', 2)
+    assert mutex.try_acquire(a)
+    with pytest.raises(RuntimeError):
+        mutex.try_acquire(a)
+    with pytest.raises(RuntimeError):
+        mutex.release(b)
+
+def test_wait_for_cycle_is_a_deadlock():
+    monitor = LockMonitor()
+    m1, m2 = monitor.create('m1'), monitor.create('m2')
+    a, b = Task('A', 1), Task('B', 2)
+    assert m1.try_acquire(a) and m2.try_acquire(b)
+    assert not m2.try_acquire(a)
+    assert monitor.find_cycle() is None
+    
+    assert not m1.try_acquire(b)
+    assert monitor.wait_for_graph() == {'A': ['B'], 'B': ['A']}
+    cycle = monitor.find_cycle()
+    assert cycle[0] == cycle[-1] and set(cycle) == {'A', 'B'}
+
+def test_closing_a_waiting_acquire_withdraws_the_waiter():
+    monitor = LockMonitor()
+    mutex = monitor.create('m')
+    low, high = Task('Low', 1), Task('High', 7)
+    assert mutex.try_acquire(low)
+    
+    steps = mutex.acquire(high)
+    assert next(steps) is mutex
+    assert low.priority == 7
+    steps.close()  # e.g. the waiting job was aborted
+    
+    assert mutex.get_statistics()['waiters'] == []
+    assert low.priority == 1
+    assert monitor.wait_for_graph() == {}
+    mutex.release(low)
+    assert low.priority == 1
+
+def test_withdrawing_keeps_priority_owed_by_other_waiters():
+    mutex = LockMonitor().create('m')
+    low, mid, high = Task('Low', 1), Task('Mid', 4), Task('High', 7)
+    assert mutex.try_acquire(low)
+    waiting_mid = mutex.acquire(mid)
+    waiting_high = mutex.acquire(high)
+    next(waiting_mid)
+    next(waiting_high)
+    waiting_high.close()
+    assert low.priority == 4
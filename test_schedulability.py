@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Unit tests for offline schedulability analysis (RTA, blocking, EDF)
+Run with: python -m pytest test_schedulability.py
+"""
+
+from schedulability import SchedulabilityAnalyzer
+from task_registry import TaskSpec
+
+def spec(name, wcet_us, period_us, priority, deadline_us=None, **kwargs):
+    return TaskSpec(name, 'periodic', wcet_us, deadline_us or period_us, priority, period_us, **kwargs)
+
+def classic_set(low_wcet_us=3):
+    return [spec('T1', 1, 4, 3), spec('T2', 2, 6, 2), spec('T3', low_wcet_us, 13, 1)]
+
+def test_response_times_match_the_textbook_fixed_point():
+    result = SchedulabilityAnalyzer(isr_duration_us=5).analyze(classic_set())
+    per_task = result['per_task']
+    assert [per_task[name]['response_us'] for name in ('T1', 'T2', 'T3')] == [1, 3, 10]
+    assert result['schedulable']
+    assert result['unschedulable'] == []
+
+def test_task_past_its_deadline_is_unschedulable():
+    result = SchedulabilityAnalyzer(isr_duration_us=5).analyze(classic_set(low_wcet_us=6))
+    assert not result['schedulable']
+    assert result['unschedulable'] == ['T3']
+    assert result['per_task']['T3']['response_us'] is None
+
+def test_priority_inheritance_blocking_is_charged_to_higher_tasks():
+    specs = [spec('T1', 1, 4, 3, resources={'m': 1}), spec('T2', 2, 6, 2),
+             spec('T3', 3, 13, 1, resources={'m': 2})]
+    per_task = SchedulabilityAnalyzer(isr_duration_us=5).analyze(specs)['per_task']
+    assert [per_task[name]['blocking_us'] for name in ('T1', 'T2', 'T3')] == [2, 2, 0]
+    assert per_task['T1']['response_us'] == 3
+    assert per_task['T2']['response_us'] == 6
+
+def test_isr_load_interferes_with_every_task():
+    specs = [spec('T1', 1, 4, 3, sensor='Brake')]
+    per_task = SchedulabilityAnalyzer(isr_duration_us=1).analyze(specs)['per_task']
+    assert per_task['T1']['response_us'] == 2
+
+def test_edf_accepts_a_set_fixed_priorities_cannot_schedule():
+    specs = [spec('T1', 2, 5, 2), spec('T2', 4, 7, 1)]
+    analyzer = SchedulabilityAnalyzer(isr_duration_us=5)
+    assert not analyzer.analyze(specs)['schedulable']
+    edf = analyzer.analyze(specs, 'edf')
+    assert edf['schedulable']
+    assert edf['edf_density']['density'] == round(2 / 5 + 4 / 7, 4)
+    
+    overloaded = [spec('T1', 3, 5, 2), spec('T2', 4, 7, 1)]
+    assert not analyzer.analyze(overloaded, 'edf')['schedulable']
+
+def test_editing_a_low_priority_task_reuses_higher_results():
+    analyzer = SchedulabilityAnalyzer(isr_duration_us=5)
+    analyzer.analyze(classic_set())
+    assert analyzer.cache_misses == 3
+    analyzer.analyze(classic_set(low_wcet_us=4))
+    assert (analyzer.cache_hits, analyzer.cache_misses) == (2, 4)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the virtual-time simulation engine and /api/simulate
+Run with: python -m pytest test_sim_engine.py
+"""
+
+import pytest
+
+import run
+from event_store import EventKind
+from sim_engine import compare_policies, create_virtual_system
+from task_registry import BUILTIN_TASKS
+
+def overload(engine):
+    for task_name, wcet_us in (('BrakeTask', 3000), ('CollisionTask', 4000), ('SpeedTask', 6000)):
+        engine.set_wcet(task_name, wcet_us)
+    for sensor_name in ('Brake', 'Collision', 'Speed'):
+        engine.add_poisson_source(sensor_name, 60)
+
+def test_preemptions_are_counted_past_the_log_capacity():
+    engine = create_virtual_system(max_logs=100)
+    overload(engine)
+    summary = engine.run(10_000_000)
+    # The ring has evicted most TASK_PREEMPT events; the engine's count has not
+    assert summary['preemptions'] > engine.logger.count_events(EventKind.TASK_PREEMPT)
+    assert summary['preemptions'] > 100
+
+def test_preemption_count_matches_the_log_when_nothing_is_evicted():
+    engine = create_virtual_system(max_logs=1_000_000)
+    overload(engine)
+    summary = engine.run(2_000_000)
+    assert summary['preemptions'] == engine.logger.count_events(EventKind.TASK_PREEMPT) > 0
+
+def test_compare_policies_reports_each_runs_preemptions():
+    results = compare_policies(['fixed_priority', 'edf'], overload, 2_000_000)
+    for policy, summary in results.items():
+        engine = create_virtual_system(max_logs=1_000_000, policy=policy)
+        overload(engine)
+        assert summary['preemptions'] == engine.run(2_000_000)['preemptions']
+
+@pytest.fixture
+def client():
+    return run.app.test_client()
+
+@pytest.mark.parametrize('rates', [
+    [1, 2],
+    'Brake',
+    {'Nope': 1},
+    {'Brake': -1},
+    {'Brake': 'fast'},
+    {'Brake': True},
+    {'Brake': 1e9},
+])
+def test_simulate_rejects_bad_rates(client, rates):
+    response = client.post('/api/simulate', json={'duration_s': 1, 'rates': rates})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+def test_simulate_accepts_zero_rate(client):
+    response = client.post('/api/simulate', json={'duration_s': 1, 'rates': {'Brake': 0, 'Speed': 5}})
+    assert response.status_code == 200
+    assert response.get_json()['interrupts']['Brake'] == 0
+
+@pytest.mark.parametrize('params', [
+    {'periods_ms': [10]},
+    {'periods_ms': {'Nope': 10}},
+    {'periods_ms': {'Brake': 0.001}},
+    {'periods_ms': {'Brake': 0}},
+    {'periods_ms': {'Brake': '10'}},
+    {'wcet_us': [1]},
+    {'wcet_us': {'NoTask': 100}},
+    {'wcet_us': {'BrakeTask': 0}},
+    {'wcet_us': {'BrakeTask': -5}},
+    {'wcet_us': {'BrakeTask': 1.5}},
+])
+def test_simulate_rejects_bad_periods_and_wcets(client, params):
+    response = client.post('/api/simulate', json={'duration_s': 86400, **params})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+def test_wcet_override_reaches_the_spec_without_touching_builtins():
+    builtin_wcets = {spec.name: spec.wcet_us for spec in BUILTIN_TASKS}
+    engine = create_virtual_system()
+    engine.set_wcet('SpeedTask', 6000)
+    task = engine.rtos.tasks['SpeedTask']
+    assert task.wcet_us == task.spec.wcet_us == 6000
+    assert {spec.name: spec.wcet_us for spec in BUILTIN_TASKS} == builtin_wcets
+    assert create_virtual_system().rtos.tasks['SpeedTask'].spec.wcet_us == builtin_wcets['SpeedTask']
+
+def test_simulate_applies_periods_and_wcets(client):
+    response = client.post('/api/simulate', json={'duration_s': 1, 'rates': {},
+                                                  'periods_ms': {'Speed': 100},
+                                                  'wcet_us': {'SpeedTask': 2000}})
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert 10 <= summary['interrupts']['Speed'] <= 11
+    assert summary['response_times']['SpeedTask']['max_response_us'] >= 2000
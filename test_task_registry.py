@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Unit tests for task spec validation and registration through /api/tasks
+Run with: python -m pytest test_task_registry.py
+"""
+
+import pytest
+
+import run
+from event_store import EventKind, MAX_PRIORITY
+from task_registry import TaskSpec
+
+def sporadic(name, **fields):
+    return {'name': name, 'kind': 'sporadic', 'wcet_us': 100, 'deadline_us': 5000,
+            'priority': 3, 'sensor': f"{name}Sensor", **fields}
+
+@pytest.mark.parametrize('field', ['priority', 'sensor_priority'])
+def test_spec_rejects_priority_the_event_log_cannot_hold(field):
+    with pytest.raises(ValueError, match=field):
+        TaskSpec.from_dict(sporadic('TooHigh', **{field: MAX_PRIORITY + 1}))
+    assert TaskSpec.from_dict(sporadic('Highest', **{field: MAX_PRIORITY})).priority <= MAX_PRIORITY
+
+def test_register_sensor_rejects_out_of_range_priority():
+    with pytest.raises(ValueError):
+        run.interrupt_controller.register_sensor('OverflowSensor', 200, 'NoTask')
+    assert 'OverflowSensor' not in run.interrupt_controller.interrupt_map
+
+def test_post_task_with_overflowing_priority_is_400():
+    client = run.app.test_client()
+    response = client.post('/api/tasks', json=sporadic('OverflowTask', priority=200))
+    assert response.status_code == 400
+    assert 'priority' in response.get_json()['message']
+    assert 'OverflowTask' not in run.rtos_simulator.tasks
+
+def test_highest_priority_task_logs_its_events():
+    client = run.app.test_client()
+    response = client.post('/api/tasks', json=sporadic('TopTask', priority=MAX_PRIORITY,
+                                                       sensor_priority=MAX_PRIORITY))
+    assert response.status_code == 201
+    
+    client.post('/api/trigger-sensor/TopTaskSensor')
+    run.interrupt_controller.process_interrupts()
+    interrupts = run.logger.search_events(kinds={EventKind.INTERRUPT}, subject='TopTaskSensor')['events']
+    assert [event['priority'] for event in interrupts] == [MAX_PRIORITY]
+
+@pytest.mark.parametrize('value', ['1000', 1.5, -1, True])
+@pytest.mark.parametrize('field', ['log_offset_us', 'log_duration_us'])
+def test_spec_rejects_bad_log_timing(field, value):
+    with pytest.raises(ValueError, match=field):
+        TaskSpec.from_dict(sporadic('BadTiming', **{field: value}))
+
+def test_refused_sensor_leaves_no_half_registered_task(monkeypatch):
+    def refuse(sensor_name, priority, task_name):
+        raise ValueError(f"Sensor refused: {sensor_name}")
+    monkeypatch.setattr(run.interrupt_controller, 'register_sensor', refuse)
+    
+    with pytest.raises(ValueError, match='refused'):
+        run.task_registry.register(sporadic('Orphan'))
+    assert 'Orphan' not in run.rtos_simulator.tasks
+    assert 'Orphan' not in run.deadline_monitor.deadlines
+    assert 'Orphan' not in run.task_registry.specs
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the hashed timing wheel
+Run with: python -m pytest test_timer_wheel.py
+"""
+
+from timer_wheel import TimerWheel
+
+MS = 1_000_000
+
+class FakeClock:
+    def __init__(self):
+        self.now_ns = 0
+    
+    def __call__(self):
+        return self.now_ns
+
+def make_wheel(slots=8):
+    clock = FakeClock()
+    return TimerWheel(tick_us=1000, slots=slots, clock_ns=clock), clock
+
+def test_timers_fire_at_their_tick_in_order_of_advance():
+    wheel, clock = make_wheel()
+    wheel.schedule(3 * MS, 'a')
+    wheel.schedule(1 * MS, 'b')
+    wheel.schedule(3 * MS + 1, 'c')  # rounds up to tick 4
+    assert len(wheel) == 3
+    
+    clock.now_ns = 2 * MS
+    assert wheel.advance() == ['b']
+    clock.now_ns = 3 * MS
+    assert wheel.advance() == ['a']
+    assert wheel.advance(4 * MS) == ['c']
+    assert len(wheel) == 0
+    assert wheel.get_statistics()['fired'] == 3
+
+def test_cancelled_timer_never_fires():
+    wheel, _ = make_wheel()
+    timer = wheel.schedule(2 * MS, 'a')
+    assert wheel.cancel(timer)
+    assert not wheel.cancel(timer)
+    assert wheel.advance(5 * MS) == []
+    assert wheel.get_statistics()['cancelled'] == 1
+
+def test_fired_timer_cannot_be_cancelled():
+    wheel, _ = make_wheel()
+    timer = wheel.schedule(1 * MS, 'a')
+    assert wheel.advance(1 * MS) == ['a']
+    assert not wheel.cancel(timer)
+
+def test_timer_beyond_one_revolution_waits_for_its_own_tick():
+    wheel, _ = make_wheel(slots=8)
+    wheel.schedule(10 * MS, 'far')  # shares slot 2 with tick 2
+    assert wheel.advance(2 * MS) == []
+    assert wheel.advance(9 * MS) == []
+    assert wheel.advance(10 * MS) == ['far']
+
+def test_long_gap_visits_every_slot_once():
+    wheel, _ = make_wheel(slots=8)
+    for tick in range(1, 20):
+        wheel.schedule(tick * MS, tick)
+    assert sorted(wheel.advance(100 * MS)) == list(range(1, 20))
+
+def test_past_expiry_fires_on_the_next_tick():
+    wheel, _ = make_wheel()
+    wheel.advance(5 * MS)
+    wheel.schedule(1 * MS, 'late')
+    assert wheel.advance(5 * MS) == []
+    assert wheel.advance(6 * MS) == ['late']
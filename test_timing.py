@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the calibrated waiter's preemptible wait
+Run with: python -m pytest test_timing.py
+"""
+
+import time
+
+from timing import HybridWaiter
+
+def run(steps, pause_s=0):
+    points = 0
+    for _ in steps:
+        points += 1
+        time.sleep(pause_s)
+    return points
+
+def test_long_wait_sleeps_instead_of_spinning():
+    waiter = HybridWaiter()
+    waiter.calibrate()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    points = run(waiter.preemptible_wait(50_000, slice_us=200, spin_slice_us=10))
+    cpu = time.thread_time() - cpu
+    wall = time.perf_counter() - wall
+    
+    assert wall >= 0.05
+    assert cpu < wall / 2
+    assert points > 0
+    stats = waiter.get_statistics()
+    assert stats['waits'] == 1
+    assert stats['spin_fraction'] < 0.5
+
+def test_time_suspended_at_preemption_points_is_not_counted():
+    waiter = HybridWaiter(spin_margin_s=0.0002)
+    start = time.perf_counter()
+    points = run(waiter.preemptible_wait(5_000, slice_us=1000, spin_slice_us=10), pause_s=0.002)
+    elapsed = time.perf_counter() - start
+    
+    # Every preemption point paused 2 ms, yet the job still ran its full 5 ms
+    assert waiter.achieved_us >= 5_000
+    assert elapsed >= 0.005 + points * 0.002
+
+def test_short_wait_spins_with_fine_preemption_points():
+    # Long enough that a scheduler hiccup on a loaded machine cannot swallow it
+    waiter = HybridWaiter(spin_margin_s=0.01)
+    points = run(waiter.preemptible_wait(2000, slice_us=5000, spin_slice_us=10))
+    assert points >= 5
+    assert waiter.achieved_us >= 2000
+
+def test_zero_wait_yields_nothing():
+    waiter = HybridWaiter(spin_margin_s=0.001)
+    assert run(waiter.preemptible_wait(0, slice_us=200, spin_slice_us=10)) == 0
+    assert waiter.waits == 0
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for WCET verification against measured execution times
+Run with: python -m pytest test_verifier.py
+"""
+
+import pytest
+
+from deadline_monitor import DeadlineMonitor
+from interrupt_controller import InterruptController
+from logger import Logger
+from metrics import LatencyHistogram
+from rtos_simulator import RTOSSimulator
+from shared_resources import SharedResources
+from task_analyzer import TaskAnalyzer
+from verifier import Verifier
+
+@pytest.fixture
+def system():
+    logger = Logger()
+    shared_resources = SharedResources(logger)
+    rtos = RTOSSimulator(logger, shared_resources, InterruptController(logger))
+    task_analyzer = TaskAnalyzer(logger, rtos)
+    verifier = Verifier(logger, rtos, DeadlineMonitor(logger, rtos), task_analyzer=task_analyzer)
+    return rtos, task_analyzer, verifier
+
+def run_jobs(rtos, releases):
+    """Release and dispatch every task `releases` times on this thread"""
+    for _ in range(releases):
+        for name in rtos.tasks:
+            rtos.signal_task(name)
+            while (entry := rtos.next_ready(timeout=0)) is not None:
+                rtos.dispatch(entry)
+
+def test_no_jobs_checks_nothing(system):
+    _, _, verifier = system
+    result = verifier.verify_wcet()
+    assert result['within_wcet']
+    assert result['tasks_checked'] == 0
+
+def test_real_jobs_report_overhead_without_failing_verification(system):
+    rtos, task_analyzer, verifier = system
+    run_jobs(rtos, 5)
+    
+    result = verifier.verify_wcet()
+    assert result['verified']
+    assert result['informational']
+    assert result['tasks_checked'] == len(rtos.tasks)
+    for violation in result['violations']:
+        metrics = task_analyzer.task_metrics[violation['task']].execution
+        assert violation['runs'] == metrics.count == 5
+        assert violation['max_us'] == metrics.max > violation['wcet_us']
+    assert result['within_wcet'] == (result['violations'] == [])
+    assert 'wcet_compliance' not in [name for name, check in verifier.verify_all().items()
+                                     if isinstance(check, dict) and not check.get('verified', True)]
+
+def test_overrun_is_reported(system):
+    rtos, _, verifier = system
+    # A job doing far more work than its declared budget
+    rtos.tasks['SpeedTask'].wcet_us = 20_000
+    run_jobs(rtos, 2)
+    
+    result = verifier.verify_wcet()
+    assert not result['within_wcet']
+    [violation] = [v for v in result['violations'] if v['task'] == 'SpeedTask']
+    assert violation['wcet_us'] == rtos.tasks['SpeedTask'].spec.wcet_us
+    assert violation['max_us'] >= 20_000
+    assert violation['overruns'] == 2
+
+def test_verification_without_analyzer_is_skipped(system):
+    rtos, _, verifier = system
+    verifier.task_analyzer = None
+    assert verifier.verify_wcet()['skipped']
+
+def test_histogram_count_above():
+    histogram = LatencyHistogram()
+    for value in (3, 10, 50, 51, 1000, 5000):
+        histogram.record(value)
+    assert histogram.count_above(10) == 4
+    assert histogram.count_above(5000) == 0
+    # 51 shares the [50, 51] bucket, so it does not count as above 50
+    assert histogram.count_above(50) == 2
@@ -0,0 +1,91 @@
+"""
+Timer Wheel - O(1) Deadline Timers
+Hashed timing wheel for arming and cancelling many one-shot timers
+"""
+
+import threading
+import time
+
+class Timer:
+    """One armed timer; `payload` is handed back when it expires"""
+    __slots__ = ('tick', 'slot', 'payload', 'active')
+    
+    def __init__(self, tick, slot, payload):
+        self.tick = tick
+        self.slot = slot
+        self.payload = payload
+        self.active = True
+
+class TimerWheel:
+    """Hashed timing wheel keyed on perf_counter_ns() time.
+    
+    Time is quantized into ticks of tick_us; a timer due at tick t lives in
+    slot t % slots. Each slot is a dict, so schedule() and cancel() are O(1)
+    whatever the number of armed timers. advance() visits only the slots
+    between the last tick processed and now; timers more than one wheel
+    revolution ahead stay in their slot until their own tick comes round.
+    """
+    
+    def __init__(self, tick_us=1000, slots=512, clock_ns=time.perf_counter_ns):
+        self.tick_ns = tick_us * 1000
+        self.slots = [{} for _ in range(slots)]
+        self.clock_ns = clock_ns
+        self.lock = threading.Lock()
+        self.current_tick = clock_ns() // self.tick_ns
+        self.armed = 0
+        self.fired = 0
+        self.cancelled = 0
+    
+    def __len__(self):
+        return self.armed
+    
+    def schedule(self, expiry_ns, payload):
+        """Arm a timer for expiry_ns; returns a handle for cancel()"""
+        with self.lock:
+            # Never file a timer into a tick that has already been processed
+            tick = max(-(-expiry_ns // self.tick_ns), self.current_tick + 1)
+            slot = tick % len(self.slots)
+            timer = Timer(tick, slot, payload)
+            self.slots[slot][id(timer)] = timer
+            self.armed += 1
+        return timer
+    
+    def cancel(self, timer):
+        """Disarm a timer; returns False if it already fired or was cancelled"""
+        with self.lock:
+            if not timer.active:
+                return False
+            timer.active = False
+            del self.slots[timer.slot][id(timer)]
+            self.armed -= 1
+            self.cancelled += 1
+        return True
+    
+    def advance(self, now_ns=None):
+        """Process every tick up to now; returns payloads of expired timers"""
+        now_tick = (self.clock_ns() if now_ns is None else now_ns) // self.tick_ns
+        expired = []
+        with self.lock:
+            # One revolution covers every slot, however long we slept
+            last_tick = min(now_tick, self.current_tick + len(self.slots))
+            for tick in range(self.current_tick + 1, last_tick + 1):
+                slot = self.slots[tick % len(self.slots)]
+                due = [key for key, timer in slot.items() if timer.tick <= now_tick]
+                for key in due:
+                    timer = slot.pop(key)
+                    timer.active = False
+                    expired.append(timer.payload)
+            self.current_tick = max(self.current_tick, now_tick)
+            self.armed -= len(expired)
+            self.fired += len(expired)
+        return expired
+    
+    def get_statistics(self):
+        with self.lock:
+            return {
+                'tick_us': self.tick_ns // 1000,
+                'slots': len(self.slots),
+                'armed': self.armed,
+                'fired': self.fired,
+                'cancelled': self.cancelled
+            }
@@ -0,0 +1,144 @@
+"""
+Timing - Calibrated Hybrid Waiter
+Sleeps for the bulk of a delay and spins only for a calibrated tail
+"""
+
+import threading
+import time
+
+class HybridWaiter:
+    """Precise delays without burning a full core.
+    
+    time.sleep() releases the GIL but overshoots by the host's timer
+    granularity; a pure spin is precise but starves every other thread.
+    The waiter sleeps until `spin_margin_s` before the deadline and spins
+    only for that remainder. The margin comes from a startup calibration of
+    how far sleep() overshoots on this host.
+    """
+    
+    def __init__(self, spin_margin_s=None):
+        self.spin_margin_s = spin_margin_s
+        self.sleep_granularity_s = None
+        self.stats_lock = threading.Lock()
+        self.reset_statistics()
+    
+    def calibrate(self, samples=25, probe_s=0.0005):
+        """Measure sleep() overshoot and derive the spin margin from it"""
+        overshoots = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            time.sleep(probe_s)
+            overshoots.append(time.perf_counter() - start - probe_s)
+        overshoots.sort()
+        
+        # Cover the 90th-percentile overshoot, with headroom for load spikes
+        self.sleep_granularity_s = max(overshoots[int(len(overshoots) * 0.9) - 1], 0.0)
+        self.spin_margin_s = max(self.sleep_granularity_s * 1.5, 0.00005)
+        return self.sleep_granularity_s
+    
+    def wait_us(self, duration_us):
+        """Block for duration_us microseconds; returns the achieved delay in us"""
+        if self.spin_margin_s is None:
+            self.calibrate()
+        
+        start = time.perf_counter()
+        deadline = start + duration_us / 1_000_000
+        
+        sleep_s = deadline - start - self.spin_margin_s
+        if sleep_s > 0:
+            time.sleep(sleep_s)
+        spin_start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            pass  # Short calibrated tail for accuracy
+        
+        end = time.perf_counter()
+        achieved_us = (end - start) * 1_000_000
+        self._record(duration_us, achieved_us, (end - spin_start) * 1_000_000)
+        return achieved_us
+    
+    def preemptible_wait(self, duration_us, slice_us, spin_slice_us):
+        """Generator form of wait_us that yields a preemption point between slices.
+        
+        The bulk of the delay is slept in slices of slice_us; only the final
+        spin margin is spun, in slices of spin_slice_us. Only time spent
+        inside the generator counts towards duration_us, so a job suspended
+        at a yield resumes with the rest of its delay.
+        """
+        if duration_us <= 0:
+            return
+        if self.spin_margin_s is None:
+            self.calibrate()
+        
+        remaining_s = duration_us / 1_000_000
+        achieved_s = 0.0
+        spin_s = 0.0
+        while remaining_s > 0:
+            start = time.perf_counter()
+            if remaining_s > self.spin_margin_s:
+                time.sleep(min(slice_us / 1_000_000, remaining_s - self.spin_margin_s))
+                elapsed_s = time.perf_counter() - start
+            else:
+                deadline = start + min(spin_slice_us / 1_000_000, remaining_s)
+                while time.perf_counter() < deadline:
+                    pass
+                elapsed_s = time.perf_counter() - start
+                spin_s += elapsed_s
+            achieved_s += elapsed_s
+            remaining_s -= elapsed_s
+            if remaining_s > 0:
+                yield
+        self._record(duration_us, achieved_s * 1_000_000, spin_s * 1_000_000)
+    
+    def _record(self, requested_us, achieved_us, spin_us):
+        error_us = achieved_us - requested_us
+        with self.stats_lock:
+            self.waits += 1
+            self.requested_us += requested_us
+            self.achieved_us += achieved_us
+            self.spin_us += spin_us
+            self.max_error_us = max(self.max_error_us, error_us)
+    
+    def reset_statistics(self):
+        with self.stats_lock:
+            self.waits = 0
+            self.requested_us = 0
+            self.achieved_us = 0.0
+            self.spin_us = 0.0
+            self.max_error_us = 0.0
+    
+    def get_statistics(self):
+        """Requested vs achieved delay and the share of time spent spinning"""
+        with self.stats_lock:
+            waits = self.waits
+            requested = self.requested_us
+            achieved = self.achieved_us
+            spin = self.spin_us
+            max_error = self.max_error_us
+        
+        return {
+            'waits': waits,
+            'sleep_granularity_us': round((self.sleep_granularity_s or 0) * 1_000_000, 1),
+            'spin_margin_us': round((self.spin_margin_s or 0) * 1_000_000, 1),
+            'avg_requested_us': round(requested / waits, 2) if waits else 0,
+            'avg_achieved_us': round(achieved / waits, 2) if waits else 0,
+            'avg_error_us': round((achieved - requested) / waits, 2) if waits else 0,
+            'max_error_us': round(max_error, 2),
+            'spin_fraction': round(spin / achieved, 3) if achieved else 0
+        }
+
+# Shared waiter used by tasks and ISRs
+default_waiter = HybridWaiter()
+
+def wait_us(duration_us):
+    """Wait on the shared calibrated waiter"""
+    return default_waiter.wait_us(duration_us)
+
+# Longest stretch a job sleeps between preemption points; slices below the
+# spin margin would turn the whole wait into a spin
+PREEMPTION_SLICE_US = 200
+# Longest stretch a job spins between preemption points in the final margin
+SPIN_SLICE_US = 10
+
+def preemptible_wait(duration_us, slice_us=PREEMPTION_SLICE_US, spin_slice_us=SPIN_SLICE_US):
+    """Preemptible wait on the shared calibrated waiter"""
+    return default_waiter.preemptible_wait(duration_us, slice_us, spin_slice_us)
@@ -0,0 +1,295 @@
+"""
+Trace Verifier - Streaming Scheduling Checks
+Single-pass verification of task and ISR event order as events are logged
+"""
+
+import threading
+from collections import Counter, deque
+from event_store import EventKind
+
+IDLE = 'IDLE'
+RUNNING = 'RUNNING'
+PREEMPTED = 'PREEMPTED'
+
+# Violation types reported under each verification heading
+PRIORITY_VIOLATIONS = ('priority_inversion', 'unjustified_preemption')
+PREEMPTION_VIOLATIONS = ('missing_resume', 'missing_end', 'unexpected_resume', 'unexpected_preempt',
+                         'unexpected_block', 'unexpected_end', 'overlapping_execution')
+ISR_VIOLATIONS = ('isr_order',)
+
+class TaskTrace:
+    """Trace state of one task: its dispatched job plus jobs parked on mutexes.
+    
+    A task first seen after a resync is not `synced` until one of its jobs
+    ends: jobs it had in flight may predate the gap in the trace.
+    """
+    __slots__ = ('state', 'priority', 'blocked_jobs', 'jobs', 'preemptions', 'resumes', 'synced')
+    
+    def __init__(self, synced=True):
+        self.synced = synced
+        self.state = IDLE
+        self.priority = None
+        self.blocked_jobs = 0
+        self.jobs = 0
+        self.preemptions = 0
+        self.resumes = 0
+
+class TraceVerifier:
+    """Checks the event log against the scheduler's rules, one event at a time.
+    
+    Every task event goes through a per-task state machine: TASK_START
+    takes a task from IDLE to RUNNING, TASK_PREEMPT to PREEMPTED until its
+    TASK_RESUME, TASK_BLOCK parks the job on a mutex until its TASK_RESUME,
+    and TASK_END/TASK_ABORT return it to IDLE. ISR_ENTRY/ISR_EXIT are
+    matched on a nesting stack. Events are consumed from a log cursor, so
+    each one is examined once and the state kept is O(tasks + ISR depth)
+    however long the log grows.
+    
+    Priority checks (inversion, unjustified preemption) use the priorities
+    carried by the events and apply under the fixed_priority policy only;
+    EDF and rate-monotonic do not order jobs by `priority`.
+    """
+    
+    def __init__(self, logger, rtos, interrupt_controller, batch_size=1000):
+        self.logger = logger
+        self.rtos = rtos
+        self.interrupt_controller = interrupt_controller
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        # Start at the oldest live event
+        self.cursor = logger.get_records_since(0, limit=0)[1]
+        
+        self.tasks = {}
+        self.running = None
+        self.preempted = {}  # task name -> priority it was preempted at
+        self.pending_preemption = None  # (victim, priority) until the next dispatch
+        self.isr_stack = []  # (isr name, priority)
+        self.isr_synced = True
+        self.isr_priorities = {}
+        
+        self.events_checked = 0
+        self.dropped_events = 0
+        self.resyncs = 0
+        self.violation_counts = Counter()
+        self.recent_violations = deque(maxlen=50)
+        
+        self.handlers = {
+            EventKind.TASK_START: self.on_start,
+            EventKind.TASK_RESUME: self.on_resume,
+            EventKind.TASK_PREEMPT: self.on_preempt,
+            EventKind.TASK_BLOCK: self.on_block,
+            EventKind.TASK_END: self.on_end,
+            EventKind.TASK_ABORT: self.on_abort,
+            EventKind.PRIORITY_CHANGE: self.on_priority_change,
+            EventKind.ISR_ENTRY: self.on_isr_entry,
+            EventKind.ISR_EXIT: self.on_isr_exit,
+        }
+    
+    def run(self, wait_s=1.0):
+        """Follow the log as events are appended"""
+        while True:
+            try:
+                # Wait without holding the lock verify() takes
+                self.logger.get_records_since(self.cursor, limit=0, wait_s=wait_s)
+                self.catch_up()
+            except Exception as e:
+                self.logger.log(f"[ERROR] Trace verifier failed: {str(e)}")
+    
+    def catch_up(self):
+        """Consume every event logged since the last call"""
+        with self.lock:
+            while True:
+                records, self.cursor, dropped = self.logger.get_records_since(self.cursor, self.batch_size)
+                if dropped:
+                    self.resync(dropped)
+                for seq, kind, subject, priority, detail in records:
+                    handler = self.handlers.get(kind)
+                    if handler is not None:
+                        handler(seq, subject, priority, detail)
+                        self.events_checked += 1
+                if len(records) < self.batch_size:
+                    return
+    
+    def resync(self, dropped):
+        """Forget trace state after events were evicted unseen"""
+        self.dropped_events += dropped
+        self.resyncs += 1
+        self.tasks.clear()
+        self.running = None
+        self.preempted.clear()
+        self.pending_preemption = None
+        self.isr_stack.clear()
+        self.isr_synced = False
+    
+    def flag(self, seq, violation, subject, detail):
+        trace = self.tasks.get(subject)
+        if trace is not None and not trace.synced:
+            return
+        self.violation_counts[violation] += 1
+        self.recent_violations.append({'seq': seq, 'type': violation, 'subject': subject, 'detail': detail})
+        self.logger.log(f"[VERIFY] {violation}: {detail}")
+    
+    def task(self, name):
+        trace = self.tasks.get(name)
+        if trace is None:
+            trace = self.tasks[name] = TaskTrace(synced=not self.resyncs)
+        return trace
+    
+    def on_start(self, seq, name, priority, detail):
+        trace = self.task(name)
+        if trace.state == PREEMPTED:
+            self.flag(seq, 'missing_resume', name, f"{name} started a new job before its preempted job resumed")
+            del self.preempted[name]
+        elif trace.state == RUNNING and self.running == name:
+            self.flag(seq, 'missing_end', name, f"{name} started a new job before TASK_END")
+        trace.jobs += 1
+        self.dispatched(seq, name, trace, priority)
+    
+    def on_resume(self, seq, name, priority, detail):
+        trace = self.task(name)
+        if trace.state == PREEMPTED:
+            del self.preempted[name]
+        elif trace.blocked_jobs:
+            trace.blocked_jobs -= 1
+        else:
+            self.flag(seq, 'unexpected_resume', name, f"{name} resumed without being preempted or blocked")
+        trace.resumes += 1
+        self.dispatched(seq, name, trace, priority)
+    
+    def dispatched(self, seq, name, trace, priority):
+        """Checks common to TASK_START and TASK_RESUME"""
+        if self.running is not None and self.running != name:
+            self.flag(seq, 'overlapping_execution', name,
+                      f"{name} dispatched while {self.running} is still running")
+            self.tasks[self.running].state = IDLE
+        
+        if self.rtos.policy.name == 'fixed_priority':
+            if self.pending_preemption is not None:
+                victim, victim_priority = self.pending_preemption
+                if victim != name and priority <= victim_priority:
+                    self.flag(seq, 'unjustified_preemption', name,
+                              f"{victim} (priority {victim_priority}) preempted for {name} (priority {priority})")
+            if self.preempted:
+                waiting, waiting_priority = max(self.preempted.items(), key=lambda item: item[1])
+                if waiting_priority > priority:
+                    self.flag(seq, 'priority_inversion', name,
+                              f"{name} (priority {priority}) dispatched while {waiting} "
+                              f"(priority {waiting_priority}) waits to resume")
+        self.pending_preemption = None
+        
+        trace.state = RUNNING
+        trace.priority = priority
+        self.running = name
+    
+    def on_preempt(self, seq, name, priority, detail):
+        trace = self.task(name)
+        if self.running != name:
+            self.flag(seq, 'unexpected_preempt', name, f"{name} preempted while {trace.state}")
+        else:
+            self.running = None
+        trace.state = PREEMPTED
+        trace.priority = priority
+        trace.preemptions += 1
+        self.preempted[name] = priority
+        self.pending_preemption = (name, priority)
+    
+    def on_block(self, seq, name, priority, detail):
+        trace = self.task(name)
+        if self.running != name:
+            self.flag(seq, 'unexpected_block', name, f"{name} blocked on {detail} while {trace.state}")
+        else:
+            self.running = None
+        trace.state = IDLE
+        trace.blocked_jobs += 1
+    
+    def on_end(self, seq, name, priority, detail):
+        trace = self.task(name)
+        if self.running != name:
+            self.flag(seq, 'unexpected_end', name, f"{name} ended while {trace.state}")
+        else:
+            self.running = None
+        if trace.state == PREEMPTED:
+            del self.preempted[name]
+        trace.state = IDLE
+        trace.synced = True
+    
+    def on_abort(self, seq, name, priority, detail):
+        trace = self.task(name)
+        if self.running == name:
+            self.running = None
+        elif trace.state == PREEMPTED:
+            del self.preempted[name]
+        elif trace.blocked_jobs:
+            trace.blocked_jobs -= 1
+        trace.state = IDLE
+        trace.synced = True
+        # The aborted job may be the one a preemption was made for
+        self.pending_preemption = None
+    
+    def on_priority_change(self, seq, name, priority, detail):
+        trace = self.task(name)
+        trace.priority = priority
+        if name in self.preempted:
+            self.preempted[name] = priority
+    
+    def isr_priority(self, isr_name):
+        priority = self.isr_priorities.get(isr_name)
+        if priority is None:
+            controller = self.interrupt_controller
+            self.isr_priorities = {
+                controller.isr_names[int_number]: isr_priority
+                for int_number, isr_priority in list(controller.interrupt_map.values())
+            }
+            priority = self.isr_priorities.get(isr_name)
+        return priority
+    
+    def on_isr_entry(self, seq, name, priority, detail):
+        priority = self.isr_priority(name)
+        if self.isr_stack:
+            outer, outer_priority = self.isr_stack[-1]
+            if priority is not None and outer_priority is not None and priority <= outer_priority:
+                self.flag(seq, 'isr_order', name,
+                          f"{name} (priority {priority}) nested inside {outer} (priority {outer_priority})")
+        self.isr_stack.append((name, priority))
+    
+    def on_isr_exit(self, seq, name, priority, detail):
+        if self.isr_stack and self.isr_stack[-1][0] == name:
+            self.isr_stack.pop()
+            self.isr_synced = self.isr_synced or not self.isr_stack
+            return
+        if not self.isr_synced:
+            # Entered before a resync
+            return
+        innermost = self.isr_stack[-1][0] if self.isr_stack else 'no ISR'
+        self.flag(seq, 'isr_order', name, f"{name} exited while {innermost} was innermost")
+        for depth in range(len(self.isr_stack) - 1, -1, -1):
+            if self.isr_stack[depth][0] == name:
+                del self.isr_stack[depth:]
+                break
+    
+    def verify(self):
+        """Catch up with the log and summarize the trace checked so far"""
+        self.catch_up()
+        with self.lock:
+            return {
+                'verified': not self.violation_counts,
+                'events_checked': self.events_checked,
+                'violations': dict(self.violation_counts),
+                'recent_violations': list(self.recent_violations),
+                'running': self.running,
+                'pending_resumes': sorted(self.preempted),
+                'isr_depth': len(self.isr_stack),
+                'tasks': {
+                    name: {
+                        'state': trace.state,
+                        'priority': trace.priority,
+                        'jobs': trace.jobs,
+                        'preemptions': trace.preemptions,
+                        'resumes': trace.resumes,
+                        'blocked_jobs': trace.blocked_jobs
+                    }
+                    for name, trace in self.tasks.items()
+                },
+                'dropped_events': self.dropped_events,
+                'resyncs': self.resyncs
+            }